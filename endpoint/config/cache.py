@@ -10,3 +10,5 @@ DASHBOARD_CACHE_TIMEOUT = int(get_config("DASHBOARD_CACHE_TIMEOUT"))
 ALLDATA_CACHE_TIMEOUT = int(get_config("ALLDATA_CACHE_TIMEOUT"))
 
 DB_CACHE_TIMEOUT = int(get_config("DB_CACHE_TIMEOUT"))  # database calls cache
+
+COALESCE_TIMEOUT = int(get_config("COALESCE_TIMEOUT"))  # seconds waiting for a coalesced computation
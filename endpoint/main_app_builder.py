@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import time
 from fastapi import Request
@@ -9,6 +10,15 @@ from sources.web3.endpoint.app import create_app as create_web3_endpoint
 from sources.mongo.endpoint.app import create_app as create_mongo_endpoint
 from sources.internal.endpoint.app import create_app as create_internal_endpoint
 
+from sources.common.database.common.db_managers import (
+    get_mongo_client,
+    close_mongo_clients,
+)
+from sources.common.database.common.db_indexes import bootstrap_indexes
+from sources.subgraph.bins.subgraphs import GQL_SESSIONS
+from sources.web3.bins.w3.providers import W3_PROVIDER_POOL
+from sources.subgraph.bins.config import MONGO_DB_URL
+
 logging.basicConfig(
     format="[%(asctime)s:%(levelname)s:%(name)s]:%(message)s",
     datefmt="%Y/%m/%d %I:%M:%S",
@@ -59,6 +69,38 @@ app.mount(
 # Add globals ---------------------------------
 
 
+@app.on_event("startup")
+async def startup_database_pool():
+    # create the worker's pooled mongo client ( shared by all database managers )
+    get_mongo_client(url=MONGO_DB_URL)
+    # create database indexes once per worker, out of the request path
+    app.state.index_bootstrap = asyncio.create_task(bootstrap_database_indexes())
+
+
+async def bootstrap_database_indexes():
+    try:
+        await asyncio.to_thread(bootstrap_indexes, url=MONGO_DB_URL)
+    except Exception as e:
+        logging.getLogger(__name__).warning(
+            f" Unable to bootstrap database indexes  err:{e}"
+        )
+
+
+@app.on_event("shutdown")
+async def shutdown_database_pool():
+    close_mongo_clients()
+
+
+@app.on_event("shutdown")
+async def shutdown_subgraph_sessions():
+    await GQL_SESSIONS.close()
+
+
+@app.on_event("shutdown")
+async def shutdown_web3_sessions():
+    await W3_PROVIDER_POOL.close()
+
+
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
     start_time = time.time()
@@ -0,0 +1,171 @@
+import asyncio
+import inspect
+import logging
+from functools import wraps
+from typing import Any, Callable
+
+from fastapi import HTTPException, Response, status
+from fastapi_cache import FastAPICache
+
+from endpoint.config.cache import COALESCE_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+
+class RequestCoalescer:
+    """Single-flight execution of route computations.
+
+    Concurrent calls sharing a key ( the fastapi-cache key of the route ) wait for one
+    running computation instead of executing it again. Errors are propagated to every
+    waiter and never kept: the next call after a failure computes again.
+    """
+
+    def __init__(self, timeout: float):
+        """
+        Args:
+            timeout (float): seconds each caller waits for the result before getting a 504 error
+                             ( the computation keeps running for the rest of waiters )
+        """
+        self.timeout = timeout
+        # running computations:  { <key>: (<task>, <leader response>) }
+        self._inflight: dict[str, tuple[asyncio.Task, Response | None]] = {}
+        # counters by route name
+        self._stats: dict[str, dict[str, int]] = {}
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Counters by route name:  calls, executions, coalesced, timeouts and errors"""
+        return {k: v.copy() for k, v in self._stats.items()}
+
+    def _count(self, name: str, field: str):
+        stats = self._stats.setdefault(
+            name,
+            {"calls": 0, "executions": 0, "coalesced": 0, "timeouts": 0, "errors": 0},
+        )
+        stats[field] += 1
+
+    async def run(
+        self,
+        key: str,
+        name: str,
+        func: Callable,
+        args: tuple,
+        kwargs: dict,
+        response: Response | None = None,
+        timeout: float | None = None,
+    ) -> Any:
+        """Execute func or wait for the running execution with the same key
+
+        Args:
+            key (str): computation key
+            name (str): route name ( metrics )
+            func (Callable): coroutine function
+            args (tuple): func positional arguments
+            kwargs (dict): func keyword arguments
+            response (Response | None, optional): caller's response, updated with the computation status code. Defaults to None.
+            timeout (float | None, optional): seconds to wait. Defaults to the coalescer timeout.
+
+        Returns:
+            Any: func result
+        """
+        self._count(name, "calls")
+
+        inflight = self._inflight.get(key)
+        if inflight and inflight[0].get_loop() is asyncio.get_running_loop():
+            task, leader_response = inflight
+            self._count(name, "coalesced")
+            logger.debug(f" {name} call coalesced with a running computation")
+        else:
+            task = asyncio.create_task(func(*args, **kwargs))
+            leader_response = response
+            self._inflight[key] = (task, leader_response)
+            task.add_done_callback(lambda _: self._release(key, task))
+            self._count(name, "executions")
+
+        try:
+            result = await asyncio.wait_for(
+                asyncio.shield(task), timeout=timeout or self.timeout
+            )
+        except asyncio.TimeoutError as e:
+            self._count(name, "timeouts")
+            logger.warning(
+                f" {name} call timed out after {timeout or self.timeout} seconds waiting for its computation"
+            )
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail="Timed out waiting for the result",
+            ) from e
+        except Exception:
+            self._count(name, "errors")
+            raise
+
+        # followers get the status code set by the computation
+        if response is not None and leader_response not in (None, response):
+            response.status_code = leader_response.status_code
+
+        return result
+
+    def _release(self, key: str, task: asyncio.Task):
+        if (inflight := self._inflight.get(key)) and inflight[0] is task:
+            self._inflight.pop(key, None)
+        # mark errors as retrieved when every waiter timed out
+        if not task.cancelled():
+            task.exception()
+
+
+REQUEST_COALESCER = RequestCoalescer(timeout=COALESCE_TIMEOUT)
+
+
+def coalesce(
+    timeout: float | None = None, namespace: str = ""
+) -> Callable[[Callable], Callable]:
+    """Coalesce concurrent calls of a route computation.
+        Place it below fastapi-cache's @cache so both use the same key:
+
+            @cache(expire=APY_CACHE_TIMEOUT)
+            @coalesce()
+            async def route(self, response: Response, ...):
+
+    Args:
+        timeout (float | None, optional): seconds each caller waits. Defaults to COALESCE_TIMEOUT.
+        namespace (str, optional): fastapi-cache namespace used by @cache. Defaults to "".
+    """
+
+    def wrapper(func: Callable) -> Callable:
+        @wraps(func)
+        async def inner(*args, **kwargs):
+            key_kwargs = kwargs.copy()
+            key_kwargs.pop("request", None)
+            response = key_kwargs.pop("response", None)
+
+            key = await _cache_key(
+                func=inner, namespace=namespace, args=args, kwargs=key_kwargs
+            )
+
+            return await REQUEST_COALESCER.run(
+                key=key,
+                name=func.__qualname__,
+                func=func,
+                args=args,
+                kwargs=kwargs,
+                response=response,
+                timeout=timeout,
+            )
+
+        return inner
+
+    return wrapper
+
+
+async def _cache_key(func: Callable, namespace: str, args: tuple, kwargs: dict) -> str:
+    """fastapi-cache key of a call ( module, name and arguments when cache is not initialized )"""
+    try:
+        key_builder = FastAPICache.get_key_builder()
+        if inspect.iscoroutinefunction(key_builder):
+            return await key_builder(
+                func, namespace, request=None, response=None, args=args, kwargs=kwargs
+            )
+        return key_builder(
+            func, namespace, request=None, response=None, args=args, kwargs=kwargs
+        )
+    except Exception:
+        return f"{func.__module__}:{func.__name__}:{args}:{kwargs}"
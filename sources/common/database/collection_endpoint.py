@@ -61,6 +61,26 @@ class database_global(db_collections_common):
         }
         await self.save_item_to_database(data=data, collection_name="blocks")
 
+    async def set_blocks(self, network: str, blocks: list[tuple[int, int]]):
+        """save multiple blocks
+
+        Args:
+            network (str):
+            blocks (list[tuple[int, int]]): [(<block>, <timestamp>), ...]
+        """
+        await self.save_items_to_database(
+            data=[
+                {
+                    "id": f"{network}_{block}",
+                    "network": network,
+                    "block": block,
+                    "timestamp": timestamp,
+                }
+                for block, timestamp in blocks
+            ],
+            collection_name="blocks",
+        )
+
     async def get_unique_prices_addressBlock(self, network: str) -> list:
         """get addresses and blocks already present in database
             with price greater than zero.
@@ -96,6 +116,46 @@ class database_global(db_collections_common):
             find={"network": network, "block": block, "address": address},
         )
 
+    async def get_prices_usd(self, items: list[tuple[str, int, str]]) -> list[dict]:
+        """get multiple usd prices greater than zero with one query
+
+        Args:
+            items (list[tuple[str, int, str]]): [(<network>, <block>, <address>), ...]
+
+        Returns:
+            list[dict]: list of price dict obj found
+        """
+        return await self.get_items_from_database(
+            collection_name="usd_prices",
+            find={
+                "id": {
+                    "$in": [
+                        f"{network}_{block}_{address}"
+                        for network, block, address in items
+                    ]
+                },
+                "price": {"$gt": 0},
+            },
+        )
+
+    async def get_last_prices_usd(self, network: str, addresses: list[str]) -> dict:
+        """get the latest usd price of multiple tokens with one query
+
+        Args:
+            network (str):
+            addresses (list[str]): token addresses
+
+        Returns:
+            dict: { <address>: {"block": <block>, "price": <price>} }
+        """
+        return {
+            x["address"]: {"block": x["block"], "price": x["price"]}
+            for x in await self.query_items_from_database(
+                query=self.query_last_prices(network=network, addresses=addresses),
+                collection_name="usd_prices",
+            )
+        }
+
     async def get_price_usd_closestBlock(
         self,
         network: str,
@@ -148,6 +208,50 @@ class database_global(db_collections_common):
             collection_name="blocks",
         )
 
+    async def get_block_before_timestamp(
+        self, network: str, timestamp: int, inclusive: bool = False
+    ) -> list[dict]:
+        """get the last block with a timestamp lower than <timestamp>
+
+        Args:
+            network (str):
+            timestamp (int):
+            inclusive (bool, optional): include blocks with equal timestamp. Defaults to False.
+
+        Returns:
+            list[dict]: empty or one block item
+        """
+        return await self.query_items_from_database(
+            query=self.query_blocks_sorted(
+                network=network,
+                condition={"$lte" if inclusive else "$lt": timestamp},
+                sort=-1,
+            ),
+            collection_name="blocks",
+        )
+
+    async def get_block_after_timestamp(
+        self, network: str, timestamp: int, inclusive: bool = False
+    ) -> list[dict]:
+        """get the first block with a timestamp greater than <timestamp>
+
+        Args:
+            network (str):
+            timestamp (int):
+            inclusive (bool, optional): include blocks with equal timestamp. Defaults to False.
+
+        Returns:
+            list[dict]: empty or one block item
+        """
+        return await self.query_items_from_database(
+            query=self.query_blocks_sorted(
+                network=network,
+                condition={"$gte" if inclusive else "$gt": timestamp},
+                sort=1,
+            ),
+            collection_name="blocks",
+        )
+
     async def get_all_block_timestamp(self, network: str) -> list:
         """get all blocks and timestamps from database
             sorted by block
@@ -175,6 +279,50 @@ class database_global(db_collections_common):
             {"$match": {"network": network, "price": {"$gt": 0}}},
         ]
 
+    @staticmethod
+    def query_last_prices(network: str, addresses: list[str]) -> list[dict]:
+        """latest usd price of each address
+
+        Args:
+            network (str):
+            addresses (list[str]):
+
+        Returns:
+            list[dict]:
+        """
+        return [
+            {"$match": {"network": network, "address": {"$in": addresses}}},
+            {"$sort": {"address": 1, "block": -1}},
+            {
+                "$group": {
+                    "_id": "$address",
+                    "address": {"$first": "$address"},
+                    "block": {"$first": "$block"},
+                    "price": {"$first": "$price"},
+                }
+            },
+            {"$project": {"_id": 0}},
+        ]
+
+    @staticmethod
+    def query_blocks_sorted(network: str, condition: dict, sort: int) -> list[dict]:
+        """first block item matching a timestamp condition
+
+        Args:
+            network (str):
+            condition (dict): timestamp condition like {"$lt": <timestamp>}
+            sort (int): 1 for the lowest block, -1 for the highest
+
+        Returns:
+            list[dict]:
+        """
+        return [
+            {"$match": {"network": network, "timestamp": condition}},
+            {"$sort": {"timestamp": sort, "block": sort}},
+            {"$limit": 1},
+            {"$project": {"_id": 0, "block": 1, "timestamp": 1}},
+        ]
+
     @staticmethod
     def query_blocks_closest(
         network: str, block: int = 0, timestamp: int = 0
@@ -2,10 +2,13 @@ from decimal import Decimal, localcontext
 import logging
 import asyncio
 from math import log
+from typing import Any, Callable
 
 from bson.decimal128 import Decimal128, create_decimal128_context
+from pymongo.errors import BulkWriteError
 
 from sources.common.database.common.db_managers import MongoDbManager
+from sources.subgraph.bins.config import MONGO_DB_BULK_BATCH_SIZE
 
 logger = logging.getLogger(__name__)
 
@@ -21,25 +24,108 @@ class db_collections_common:
         self._db_name = db_name
         self._db_collections = db_collections
 
+    def create_db_manager(self) -> MongoDbManager:
+        """Create a database manager using the process-wide pooled client"""
+        return MongoDbManager(
+            url=self._db_mongo_url,
+            db_name=self._db_name,
+            collections=self._db_collections,
+        )
+
+    async def _run_with_manager(self, func: Callable[[MongoDbManager], Any]) -> Any:
+        """Run a blocking database operation in a worker thread so the event loop is not blocked
+
+        Args:
+            func (Callable[[MongoDbManager], Any]): function receiving a db manager
+
+        Returns:
+            Any: func result
+        """
+
+        def _worker():
+            with self.create_db_manager() as _db_manager:
+                return func(_db_manager)
+
+        return await asyncio.to_thread(_worker)
+
     # actual db saving
     async def save_items_to_database(
         self,
-        data: dict,
+        data: dict | list[dict],
         collection_name: str,
-    ):
-        """Save dictionary values to the database collection replacing any equal id defined
+        batch_size: int = MONGO_DB_BULK_BATCH_SIZE,
+        replace: bool = False,
+    ) -> list[dict]:
+        """Save dictionary values to the database collection replacing any equal id defined.
+            Items are upserted in unordered bulk writes of <batch_size> items
 
         Args:
-            data (list): data list following tool_mongodb_general class to be saved to database in a dict format
+            data (dict | list[dict]): data following tool_mongodb_general class to be saved to database in a dict format
+                                      { <key>: <item>, ... } or [<item>, ...]
             collection_name (str): collection name to save data to
+            batch_size (int, optional): items per bulk write. Defaults to MONGO_DB_BULK_BATCH_SIZE.
+            replace (bool, optional): replace whole documents instead of updating fields. Defaults to False.
+
+        Returns:
+            list[dict]: per batch result  [{"items":, "matched":, "modified":, "upserted":, "errors":}, ...]
         """
-        # add item by item to database
-        requests = [
-            self.save_item_to_database(data=item, collection_name=collection_name)
-            for key, item in data.items()
-        ]
+        items = list(data.values()) if isinstance(data, dict) else list(data)
+        batch_size = max(1, batch_size)
+
+        results = []
+        for idx in range(0, len(items), batch_size):
+            batch = items[idx : idx + batch_size]
+            results.append(
+                await self._save_items_batch(
+                    items=batch, collection_name=collection_name, replace=replace
+                )
+            )
+
+        if results:
+            logger.debug(
+                f" Saved {len(items)} items to mongo's {collection_name} collection in {len(results)} batches: matched {sum(x['matched'] for x in results)} upserted {sum(x['upserted'] for x in results)} errors {sum(x['errors'] for x in results)}"
+            )
+        return results
+
+    async def _save_items_batch(
+        self, items: list[dict], collection_name: str, replace: bool = False
+    ) -> dict:
+        """Save one batch of items using a single bulk write
 
-        await asyncio.gather(*requests)
+        Returns:
+            dict: {"items":, "matched":, "modified":, "upserted":, "errors":}
+        """
+        result = {
+            "items": len(items),
+            "matched": 0,
+            "modified": 0,
+            "upserted": 0,
+            "errors": 0,
+        }
+        try:
+            bulk_result = await self._run_with_manager(
+                lambda _db_manager: _db_manager.add_items(
+                    coll_name=collection_name, items=items, replace=replace
+                )
+            )
+            result["matched"] = bulk_result.matched_count
+            result["modified"] = bulk_result.modified_count
+            result["upserted"] = bulk_result.upserted_count
+        except BulkWriteError as e:
+            # unordered: the rest of the batch was written
+            result["matched"] = e.details.get("nMatched", 0)
+            result["modified"] = e.details.get("nModified", 0)
+            result["upserted"] = e.details.get("nUpserted", 0)
+            result["errors"] = len(e.details.get("writeErrors", []))
+            logger.error(
+                f" {result['errors']} errors saving a {len(items)} items batch to mongo's {collection_name} collection.  first error-> {e.details.get('writeErrors', [{}])[0].get('errmsg')}"
+            )
+        except Exception as e:
+            result["errors"] = len(items)
+            logger.exception(
+                f" Unable to save a {len(items)} items batch to mongo's {collection_name} collection.  error-> {e}"
+            )
+        return result
 
     async def save_item_to_database(
         self,
@@ -53,15 +139,12 @@ class db_collections_common:
             collection_name (str): collection name to save data to
         """
         try:
-            with MongoDbManager(
-                url=self._db_mongo_url,
-                db_name=self._db_name,
-                collections=self._db_collections,
-            ) as _db_manager:
-                # add to mongodb
-                _db_manager.add_item(
+            # add to mongodb
+            await self._run_with_manager(
+                lambda _db_manager: _db_manager.add_item(
                     coll_name=collection_name, dbFilter={"id": data["id"]}, data=data
                 )
+            )
         except Exception as e:
             logging.getLogger(__name__).exception(
                 f" Unable to save data to mongo's {collection_name} collection.  error-> {e}"
@@ -73,15 +156,12 @@ class db_collections_common:
         collection_name: str,
     ):
         try:
-            with MongoDbManager(
-                url=self._db_mongo_url,
-                db_name=self._db_name,
-                collections=self._db_collections,
-            ) as _db_manager:
-                # add to mongodb
-                _db_manager.replace_item(
+            # add to mongodb
+            await self._run_with_manager(
+                lambda _db_manager: _db_manager.replace_item(
                     coll_name=collection_name, dbFilter={"id": data["id"]}, data=data
                 )
+            )
         except Exception as e:
             logging.getLogger(__name__).exception(
                 f" Unable to replace data in mongo's {collection_name} collection.  error-> {e}"
@@ -92,42 +172,29 @@ class db_collections_common:
         query: list[dict],
         collection_name: str,
     ) -> list:
-        # db_manager = self.create_db_manager()
-        with MongoDbManager(
-            url=self._db_mongo_url,
-            db_name=self._db_name,
-            collections=self._db_collections,
-        ) as _db_manager:
-            result = list(
+        return await self._run_with_manager(
+            lambda _db_manager: list(
                 _db_manager.get_items(coll_name=collection_name, aggregate=query)
             )
-        return result
+        )
 
     async def get_items_from_database(self, collection_name: str, **kwargs) -> list:
-        with MongoDbManager(
-            url=self._db_mongo_url,
-            db_name=self._db_name,
-            collections=self._db_collections,
-        ) as _db_manager:
-            result = _db_manager.get_items(coll_name=collection_name, **kwargs)
-            result = list(result)
-        return result
+        return await self._run_with_manager(
+            lambda _db_manager: list(
+                _db_manager.get_items(coll_name=collection_name, **kwargs)
+            )
+        )
 
     async def get_distinct_items_from_database(
         self, field: str, collection_name: str, condition: dict = None
     ) -> list:
-        with MongoDbManager(
-            url=self._db_mongo_url,
-            db_name=self._db_name,
-            collections=self._db_collections,
-        ) as _db_manager:
-            result = list(
+        return await self._run_with_manager(
+            lambda _db_manager: list(
                 _db_manager.get_distinct(
                     coll_name=collection_name, field=field, condition=condition or {}
                 )
             )
-
-        return result
+        )
 
     # TOOLING
     @staticmethod
@@ -0,0 +1,215 @@
+import logging
+import threading
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo import errors as MongoErrors
+
+from sources.common.database.common.db_managers import get_mongo_client
+
+logger = logging.getLogger(__name__)
+
+
+# Declared index specifications, per database and collection.
+#   Compound indexes follow the $match/$sort stages of the aggregation pipelines
+#   used by db_returns_manager.query_* ( gamma_db_v1 ) and database_local.query_* ( <chain>_gamma )
+
+# gamma_db_v1 database ( subgraph feeders )
+GAMMA_DB_INDEXES = {
+    "static": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("chain", ASCENDING), ("protocol", ASCENDING)]),
+    ],
+    "returns": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        # query_hypervisors_average, query_last_returns, query_impermanentDivergence
+        IndexModel([("chain", ASCENDING), ("period", ASCENDING), ("block", ASCENDING)]),
+        # query_return_impermanent, query_return_imperm_rewards2_flat
+        IndexModel(
+            [
+                ("chain", ASCENDING),
+                ("period", ASCENDING),
+                ("address", ASCENDING),
+                ("timestamp", DESCENDING),
+            ]
+        ),
+    ],
+    "allData": [
+        IndexModel([("id", ASCENDING)], unique=True),
+    ],
+    "allRewards2": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        # query_last
+        IndexModel(
+            [("chain", ASCENDING), ("protocol", ASCENDING), ("datetime", DESCENDING)]
+        ),
+        # allRewards2 lookup at query_return_imperm_rewards2_flat
+        IndexModel([("chain", ASCENDING), ("datetime", DESCENDING)]),
+    ],
+    "agregateStats": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        # query_last
+        IndexModel(
+            [("chain", ASCENDING), ("protocol", ASCENDING), ("datetime", DESCENDING)]
+        ),
+    ],
+}
+
+# global database ( blocks and prices shared by all chains )
+GLOBAL_DB_INDEXES = {
+    "blocks": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("network", ASCENDING), ("block", ASCENDING)]),
+        IndexModel([("network", ASCENDING), ("timestamp", ASCENDING)]),
+    ],
+    "usd_prices": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel(
+            [("network", ASCENDING), ("address", ASCENDING), ("block", ASCENDING)]
+        ),
+        IndexModel([("network", ASCENDING), ("block", ASCENDING)]),
+    ],
+}
+
+# <chain>_gamma databases ( web3 feeders )
+LOCAL_DB_INDEXES = {
+    "static": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("dex", ASCENDING)]),
+    ],
+    "operations": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("address", ASCENDING)]),
+        IndexModel([("blockNumber", ASCENDING)]),
+        # get_all_operations, query_operations
+        IndexModel(
+            [("address", ASCENDING), ("blockNumber", ASCENDING), ("logIndex", ASCENDING)]
+        ),
+        IndexModel([("address", ASCENDING), ("timestamp", ASCENDING)]),
+        # get_user_operations_status $or
+        IndexModel([("sender", ASCENDING)]),
+        IndexModel([("to", ASCENDING)]),
+        IndexModel([("src", ASCENDING)]),
+        IndexModel([("dst", ASCENDING)]),
+    ],
+    "status": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("address", ASCENDING)]),
+        IndexModel([("block", ASCENDING)]),
+        IndexModel([("timestamp", ASCENDING)]),
+        # get_all_status, get_hype_status_blocks, query_status_btwn_blocks
+        IndexModel([("address", ASCENDING), ("block", ASCENDING)]),
+        # query_status_feeReturn_data
+        IndexModel([("address", ASCENDING), ("timestamp", ASCENDING)]),
+    ],
+    "user_status": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("address", ASCENDING)]),
+        IndexModel([("hypervisor_address", ASCENDING)]),
+        IndexModel([("block", ASCENDING)]),
+        IndexModel([("timestamp", ASCENDING)]),
+        # get_user_status
+        IndexModel([("address", ASCENDING), ("block", ASCENDING)]),
+        # user status replay ( last status of each account in a hypervisor )
+        IndexModel(
+            [
+                ("hypervisor_address", ASCENDING),
+                ("address", ASCENDING),
+                ("block", DESCENDING),
+            ]
+        ),
+        IndexModel([("hypervisor_address", ASCENDING), ("block", ASCENDING)]),
+    ],
+    "rewards_static": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("address", ASCENDING)]),
+    ],
+    # user status replay checkpoints ( one per hypervisor )
+    "user_status_checkpoints": [
+        IndexModel([("id", ASCENDING)], unique=True),
+    ],
+}
+
+GAMMA_DB_NAME = "gamma_db_v1"
+GLOBAL_DB_NAME = "global"
+LOCAL_DB_SUFFIX = "_gamma"
+
+# local databases with their indexes created by this process ( url, db_name )
+_LOCAL_DB_INDEXED: set[tuple[str, str]] = set()
+_LOCAL_DB_INDEXED_LOCK = threading.Lock()
+
+
+def create_indexes(url: str, db_name: str, indexes: dict[str, list[IndexModel]]):
+    """Create the declared indexes of a database.
+        Index creation is idempotent: existing indexes with the same spec are left untouched
+
+    Args:
+        url (str): full mongodb url
+        db_name (str): database name
+        indexes (dict[str, list[IndexModel]]): { <collection name>: [<IndexModel>, ...] }
+    """
+    database = get_mongo_client(url=url)[db_name]
+    for coll_name, models in indexes.items():
+        try:
+            database[coll_name].create_indexes(models)
+        except MongoErrors.OperationFailure as e:
+            logger.warning(
+                f" Unable to create indexes for {db_name}'s {coll_name} collection  err:{e}"
+            )
+
+
+def bootstrap_indexes(url: str, local_db_names: list[str] | None = None):
+    """Create all declared indexes: gamma_db_v1, global and every <chain>_gamma database.
+        Meant to run once at startup ( or as a migration step ), never in the request path.
+
+    Args:
+        url (str): full mongodb url
+        local_db_names (list[str] | None, optional): local database names. Defaults to all existing <chain>_gamma databases.
+    """
+    create_indexes(url=url, db_name=GAMMA_DB_NAME, indexes=GAMMA_DB_INDEXES)
+    create_indexes(url=url, db_name=GLOBAL_DB_NAME, indexes=GLOBAL_DB_INDEXES)
+
+    if local_db_names is None:
+        local_db_names = [
+            x
+            for x in get_mongo_client(url=url).list_database_names()
+            if x.endswith(LOCAL_DB_SUFFIX)
+        ]
+    for db_name in local_db_names:
+        create_indexes(url=url, db_name=db_name, indexes=LOCAL_DB_INDEXES)
+        with _LOCAL_DB_INDEXED_LOCK:
+            _LOCAL_DB_INDEXED.add((url, db_name))
+
+    logger.info(
+        f" Database indexes bootstrapped for {GAMMA_DB_NAME}, {GLOBAL_DB_NAME} and {local_db_names}"
+    )
+
+
+def ensure_local_indexes(url: str, db_name: str):
+    """Create the declared indexes of a <chain>_gamma database once per process
+        ( databases created after bootstrap_indexes ran, ie. a new chain, get their indexes on first use )
+
+    Args:
+        url (str): full mongodb url
+        db_name (str): local database name
+    """
+    with _LOCAL_DB_INDEXED_LOCK:
+        if (url, db_name) in _LOCAL_DB_INDEXED:
+            return
+        try:
+            create_indexes(url=url, db_name=db_name, indexes=LOCAL_DB_INDEXES)
+        except Exception as e:
+            # retried on next use
+            logger.warning(f" Unable to create indexes for {db_name} database  err:{e}")
+            return
+        _LOCAL_DB_INDEXED.add((url, db_name))
+
+
+if __name__ == "__main__":
+    # migration step:  python -m sources.common.database.common.db_indexes
+    from sources.subgraph.bins.config import MONGO_DB_URL
+
+    logging.basicConfig(
+        format="[%(asctime)s:%(levelname)s:%(name)s]:%(message)s",
+        datefmt="%Y/%m/%d %I:%M:%S",
+        level=logging.INFO,
+    )
+    bootstrap_indexes(url=MONGO_DB_URL)
@@ -1,12 +1,69 @@
 import logging
-from pymongo import MongoClient
+import threading
+from pymongo import MongoClient, ReplaceOne, UpdateOne
 from pymongo import errors as MongoErrors
+from pymongo.results import BulkWriteResult
 
-from sources.subgraph.bins.config import MONGO_DB_TIMEOUTMS
+from sources.subgraph.bins.config import MONGO_DB_TIMEOUTMS, MONGO_DB_MAXPOOLSIZE
 
 logger = logging.getLogger(__name__)
 
 
+# process-wide mongo clients ( one per url ).
+# MongoClient is thread safe and holds its own connection pool,
+#   so every manager shares the same pool instead of handshaking on each call
+_MONGO_CLIENTS: dict[str, MongoClient] = {}
+_MONGO_CLIENTS_LOCK = threading.Lock()
+
+
+def get_mongo_client(
+    url: str,
+    serverSelectionTimeoutMS: int = MONGO_DB_TIMEOUTMS,
+    maxPoolSize: int = MONGO_DB_MAXPOOLSIZE,
+) -> MongoClient:
+    """Return the pooled mongo client for <url>, creating it on first use
+
+    Args:
+        url (str): full mongodb url
+        serverSelectionTimeoutMS (int): maximum number of milliseconds to timeout connection
+        maxPoolSize (int): maximum number of connections kept by the pool
+
+    Returns:
+        MongoClient:
+    """
+    try:
+        return _MONGO_CLIENTS[url]
+    except KeyError:
+        pass
+
+    with _MONGO_CLIENTS_LOCK:
+        if url not in _MONGO_CLIENTS:
+            try:
+                _MONGO_CLIENTS[url] = MongoClient(
+                    url,
+                    serverSelectionTimeoutMS=serverSelectionTimeoutMS,
+                    maxPoolSize=maxPoolSize,
+                )
+            except MongoErrors.ServerSelectionTimeoutError:
+                raise Exception(
+                    f" Connection timed out using {serverSelectionTimeoutMS} ms. Try increasing this value if u know server is responding"
+                )
+            except MongoErrors.ConnectionFailure:
+                raise Exception("Failed to connect to {}".format(url))
+        return _MONGO_CLIENTS[url]
+
+
+def close_mongo_clients():
+    """Close all pooled mongo clients ( call on app shutdown )"""
+    with _MONGO_CLIENTS_LOCK:
+        for url, client in _MONGO_CLIENTS.items():
+            try:
+                client.close()
+            except Exception as e:
+                logger.warning(f" Error closing mongo client for {url}  err:{e}")
+        _MONGO_CLIENTS.clear()
+
+
 class MongoDbManager:
     def __init__(
         self,
@@ -32,37 +89,42 @@ class MongoDbManager:
             serverSelectionTimeoutMS (int): maximum number of milliseconds to timeout connection
         """
 
-        # connect to mongo database
-        try:
-            self.mongo_client = MongoClient(
-                url, serverSelectionTimeoutMS=serverSelectionTimeoutMS
-            )
-        except MongoErrors.ServerSelectionTimeoutError:
-            raise Exception(
-                f" Connection timed out using {serverSelectionTimeoutMS} ms. Try increasing this value if u know server is responding"
-            )
-        except MongoErrors.ConnectionFailure:
-            raise Exception("Failed to connect to {}".format(url))
+        # use the process-wide pooled client
+        self.mongo_client = get_mongo_client(
+            url=url, serverSelectionTimeoutMS=serverSelectionTimeoutMS
+        )
         self.database = self.mongo_client[db_name]
 
-        # Retrieve database collection names
-        self.database_collections = self.database.list_collection_names()
+        # database collection names are retrieved on demand
+        self._database_collections = None
 
         # define collection configurations
         self.collections_config = collections
-
-        # Setup collections and their indexes
-        self.configure_collections()
+        # indexes are created once by db_indexes.bootstrap_indexes, not on each manager construction
 
     def __enter__(self):
         return self
 
     def __exit__(self, type, value, traceback):
         # xception handling here
-        self.mongo_client.close()
+        # the client is shared by the whole process: do not close it here
+        pass
+
+    @property
+    def database_collections(self) -> list[str]:
+        """database collection names"""
+        if self._database_collections is None:
+            self._database_collections = self.database.list_collection_names()
+        return self._database_collections
+
+    @database_collections.setter
+    def database_collections(self, value: list[str]):
+        self._database_collections = value
 
     def configure_collections(self):
-        """define collection names and create indexes"""
+        """define collection names and create indexes
+        ( DDL: use db_indexes.bootstrap_indexes at startup instead of calling this per request )
+        """
         for coll_name, fields in self.collections_config.items():
             for field, unique in fields.items():
                 self.database[coll_name].create_index(field, unique=unique)
@@ -98,11 +160,6 @@ class MongoDbManager:
             raise ValueError(
                 f" No configuration found for {coll_name} database collection."
             )
-        # create collection if it does not exist yet
-        self.create_collection(
-            coll_name=coll_name, **self.collections_config[coll_name]
-        )
-
         # add/ update to database (add or replace)
         self.database[coll_name].update_one(
             filter=dbFilter, update={"$set": data}, upsert=True
@@ -126,11 +183,6 @@ class MongoDbManager:
             raise ValueError(
                 f" No configuration found for {coll_name} database collection."
             )
-        # create collection if it does not exist yet
-        self.create_collection(
-            coll_name=coll_name, **self.collections_config[coll_name]
-        )
-
         # add/ update to database (add or replace)
         self.database[coll_name].replace_one(
             filter=dbFilter, replacement=data, upsert=True
@@ -294,6 +346,47 @@ class MongoDbManager:
         else:
             return self.database[coll_name].distinct(field, condition)
 
+    def add_items(
+        self,
+        coll_name: str,
+        items: list[dict],
+        upsert: bool = True,
+        replace: bool = False,
+        ordered: bool = False,
+    ) -> BulkWriteResult:
+        """Add or Update multiple items using one bulk write
+
+        Args:
+           coll_name (str): collection name
+           items (list[dict]): data to save ( each item must have an "id" field, used as filter )
+           upsert (bool, optional): add items not present. Defaults to True.
+           replace (bool, optional): replace the whole document instead of $set its fields. Defaults to False.
+           ordered (bool, optional): stop at first error. Defaults to False.
+
+        Raises:
+           ValueError: if coll_name is not defined at the class init <collections> field
+           BulkWriteError: when any of the operations fail ( unordered writes still execute the rest )
+
+        Returns:
+            BulkWriteResult:
+        """
+
+        # check collection configuration exists
+        if not coll_name in self.collections_config.keys():
+            raise ValueError(
+                f" No configuration found for {coll_name} database collection."
+            )
+
+        requests = [
+            ReplaceOne(filter={"id": item["id"]}, replacement=item, upsert=upsert)
+            if replace
+            else UpdateOne(
+                filter={"id": item["id"]}, update={"$set": item}, upsert=upsert
+            )
+            for item in items
+        ]
+
+        return self.database[coll_name].bulk_write(requests, ordered=ordered)
+
     # TODO: push_item ( add_item without id involved )
     # TODO: push_items ( add/update multiple items )
-    # TODO: add_items ( add/update multiple items )
@@ -1,4 +1,3 @@
-import asyncio
 from fastapi import HTTPException, Response, APIRouter, status
 from fastapi_cache.decorator import cache
 
@@ -13,7 +12,7 @@ from sources.subgraph.bins.enums import Chain, Protocol
 
 from sources.subgraph.bins.config import DEPLOYMENTS
 from sources.subgraph.bins.enums import Chain, Protocol
-from sources.subgraph.bins.hype_fees.fees_yield import fee_returns_all
+from sources.subgraph.bins.hype_fees.fees_yield import fee_returns_windows
 
 
 # Route builders
@@ -56,14 +55,19 @@ class internal_router_builder_main(router_builder_baseTemplate):
                 status_code=400, detail=f"{protocol} on {chain} not available."
             )
 
-        results = await asyncio.gather(
-            fee_returns_all(protocol, chain, 1, return_total=True),
-            fee_returns_all(protocol, chain, 7, return_total=True),
-            fee_returns_all(protocol, chain, 30, return_total=True),
-            return_exceptions=True,
-        )
+        try:
+            # one query for all windows ( each window is queried apart on failure )
+            results = await fee_returns_windows(
+                protocol=protocol,
+                chain=chain,
+                windows=[1, 7, 30],
+                return_total=True,
+                return_exceptions=True,
+            )
+        except Exception as e:
+            results = {1: e, 7: e, 30: e}
 
-        result_map = {"daily": results[0], "weekly": results[1], "monthly": results[2]}
+        result_map = {"daily": results[1], "weekly": results[7], "monthly": results[30]}
 
         output = {}
 
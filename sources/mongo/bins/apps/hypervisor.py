@@ -1,4 +1,3 @@
-import asyncio
 from sources.common.general.enums import Chain, Dex, ChainId
 from sources.common.database.collection_endpoint import database_global, database_local
 from sources.mongo.bins.enums import enumsConverter
@@ -172,28 +171,16 @@ async def get_hypervisor_prices(
 
     netval = enumsConverter.convert_general_to_local(chain=network).value
 
-    price_token0, price_token1 = await asyncio.gather(
-        create_global_database().get_items_from_database(
-            collection_name="usd_prices",
-            find={
-                "network": netval,
-                "address": hype_last_status["pool"]["token0"]["address"],
-            },
-            projection={"_id": 0, "id": 0, "address": 0, "network": 0},
-            sort=[("block", -1)],
-            limit=1,
-        ),
-        create_global_database().get_items_from_database(
-            collection_name="usd_prices",
-            find={
-                "network": netval,
-                "address": hype_last_status["pool"]["token1"]["address"],
-            },
-            projection={"_id": 0, "id": 0, "address": 0, "network": 0},
-            sort=[("block", -1)],
-            limit=1,
-        ),
+    # latest prices of both tokens with one query
+    prices = await create_global_database().get_last_prices_usd(
+        network=netval,
+        addresses=[
+            hype_last_status["pool"]["token0"]["address"],
+            hype_last_status["pool"]["token1"]["address"],
+        ],
     )
+    price_token0 = prices.get(hype_last_status["pool"]["token0"]["address"], {})
+    price_token1 = prices.get(hype_last_status["pool"]["token1"]["address"], {})
 
     try:
         # convert hypervisor string to floats
@@ -202,12 +189,12 @@ async def get_hypervisor_prices(
         # )
 
         price_lpToken = (
-            price_token0[0]["price"]
+            price_token0["price"]
             * (
                 int(hype_last_status["totalAmounts"]["total0"])
                 / (10 ** int(hype_last_status["pool"]["token0"]["decimals"]))
             )
-            + price_token1[0]["price"]
+            + price_token1["price"]
             * (
                 int(hype_last_status["totalAmounts"]["total1"])
                 / (10 ** int(hype_last_status["pool"]["token1"]["decimals"]))
@@ -226,12 +213,12 @@ async def get_hypervisor_prices(
         "token0": {
             "address": hype_last_status["pool"]["token0"]["address"],
             "symbol": hype_last_status["pool"]["token0"]["symbol"],
-            "price_usd": price_token0[0],
+            "price_usd": price_token0,
         },
         "token1": {
             "address": hype_last_status["pool"]["token1"]["address"],
             "symbol": hype_last_status["pool"]["token1"]["symbol"],
-            "price_usd": price_token1[0],
+            "price_usd": price_token1,
         },
     }
 
@@ -269,21 +256,26 @@ async def add_prices_to_hypervisor(hypervisor: dict, network: str) -> dict:
     global_db = create_global_database()
 
     try:
-        # get token prices
-        price_token0, price_token1 = await asyncio.gather(
-            global_db.get_price_usd(
-                network=network,
-                address=hypervisor["pool"]["token0"]["address"],
-                block=hypervisor["block"],
-            ),
-            global_db.get_price_usd(
-                network=network,
-                address=hypervisor["pool"]["token1"]["address"],
-                block=hypervisor["block"],
-            ),
-        )
-        price_token0 = price_token0[0]
-        price_token1 = price_token1[0]
+        # get token prices with one query
+        prices = {
+            x["address"]: x["price"]
+            for x in await global_db.get_prices_usd(
+                items=[
+                    (
+                        network,
+                        hypervisor["block"],
+                        hypervisor["pool"]["token0"]["address"],
+                    ),
+                    (
+                        network,
+                        hypervisor["block"],
+                        hypervisor["pool"]["token1"]["address"],
+                    ),
+                ]
+            )
+        }
+        price_token0 = prices[hypervisor["pool"]["token0"]["address"]]
+        price_token1 = prices[hypervisor["pool"]["token1"]["address"]]
 
         # get LPtoken price
         price_lpToken = (
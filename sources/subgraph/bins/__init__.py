@@ -1,4 +1,6 @@
+import asyncio
 import logging
+from typing import AsyncIterator
 
 import httpx
 
@@ -61,28 +63,144 @@ class SubgraphClient:
         # error return
         return {}
 
-    async def paginate_query(self, query, paginate_variable, variables={}):
-        # if not variables:
-        #     variables = {}
-
+    async def paginate_query(
+        self,
+        query: str,
+        paginate_variable: str,
+        variables: dict | None = None,
+        shards: int = 1,
+        max_retries: int = 3,
+        backoff: float = 1,
+    ) -> AsyncIterator[list]:
+        """Yield query result pages ( up to "first" items each ) paginating by a cursor variable.
+
+            The query filters with `<paginate_variable>_gt: $paginate`. To split the work in
+            concurrent shards it must also filter with `<paginate_variable>_lt: $paginateEnd`:
+            the hex keyspace ( "0x00".."0xff" ) is split in ranges and pages of different shards
+            are yielded as they arrive.
+
+        Args:
+            query (str): graphql query
+            paginate_variable (str): field to paginate with ( "id" )
+            variables (dict | None, optional): query variables ( not modified ). Defaults to None.
+            shards (int, optional): concurrent key ranges. Defaults to 1.
+            max_retries (int, optional): retries of each page. Defaults to 3.
+            backoff (float, optional): seconds to wait before the first retry ( doubled each retry ). Defaults to 1.
+
+        Yields:
+            list: result items page
+        """
         if f"{paginate_variable}_gt" not in query:
             raise ValueError("Paginate variable missing in query")
+        if shards > 1 and f"{paginate_variable}_lt" not in query:
+            logger.warning(
+                f" Paginate end variable missing in query: {shards} shards requested but not used"
+            )
+            shards = 1
+
+        variables = {
+            **(variables or {}),
+            "orderBy": paginate_variable,
+            "orderDirection": "asc",
+        }
+
+        queue = asyncio.Queue(maxsize=shards * 2)
+        workers = [
+            asyncio.create_task(
+                self._paginate_shard(
+                    queue=queue,
+                    query=query,
+                    paginate_variable=paginate_variable,
+                    variables=(
+                        {**variables, "paginate": lower or "", "paginateEnd": upper}
+                        if shards > 1
+                        else {"paginate": "", **variables}
+                    ),
+                    max_retries=max_retries,
+                    backoff=backoff,
+                )
+            )
+            for lower, upper in self._key_ranges(shards)
+        ]
+        try:
+            finished = 0
+            while finished < len(workers):
+                page = await queue.get()
+                if page is None:
+                    finished += 1
+                elif isinstance(page, Exception):
+                    raise page
+                else:
+                    yield page
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def _paginate_shard(
+        self,
+        queue: asyncio.Queue,
+        query: str,
+        paginate_variable: str,
+        variables: dict,
+        max_retries: int,
+        backoff: float,
+    ):
+        """Put all pages of a key range in the queue, followed by None ( or the exception raised )"""
+        try:
+            while True:
+                data = await self._query_page(
+                    query=query,
+                    variables=variables,
+                    max_retries=max_retries,
+                    backoff=backoff,
+                )
+                if not data:
+                    break
+                await queue.put(data)
+                variables = {**variables, "paginate": data[-1][paginate_variable]}
+            await queue.put(None)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await queue.put(e)
+
+    async def _query_page(
+        self, query: str, variables: dict, max_retries: int, backoff: float
+    ) -> list:
+        """Query one page retrying transient errors with exponential backoff
+
+        Returns:
+            list: page items
+        """
+        for retry in range(max_retries + 1):
+            try:
+                response = await async_client.post(
+                    self._url, json={"query": query, "variables": variables}
+                )
+                response.raise_for_status()
+                result = response.json()
+                if "errors" in result:
+                    raise ValueError(f"Subgraph query errors: {result['errors']}")
+                return next(iter(result["data"].values()))
+            except (httpx.HTTPError, ValueError) as e:
+                if retry >= max_retries:
+                    raise
+                logger.warning(
+                    f" Subgraph page query failed at {self._url} ( {e} ). Retrying in {backoff * 2**retry} seconds"
+                )
+                await asyncio.sleep(backoff * 2**retry)
 
-        variables["orderBy"] = paginate_variable
-        variables["orderDirection"] = "asc"
-
-        all_data = []
-        has_data = True
-        params = {"query": query, "variables": variables}
-        while has_data:
-            response = await async_client.post(self._url, json=params)
-            data = next(iter(response.json()["data"].values()))
-            has_data = bool(data)
-            if has_data:
-                all_data += data
-                params["variables"]["paginate"] = data[-1][paginate_variable]
-
-        return all_data
+    @staticmethod
+    def _key_ranges(shards: int) -> list[tuple[str | None, str]]:
+        """Split the hex keyspace in ranges ( the last one ends after any ascii key )
+
+        Returns:
+            list[tuple[str | None, str]]: [(<lower exclusive>, <upper exclusive>), ...]
+        """
+        shards = max(1, min(int(shards), 256))
+        bounds = [f"0x{x * 256 // shards:02x}" for x in range(1, shards)]
+        return list(zip([None] + bounds, bounds + ["~"]))
 
 
 class GammaClient(SubgraphClient):
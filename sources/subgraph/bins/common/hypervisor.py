@@ -1,4 +1,3 @@
-import asyncio
 from datetime import datetime, timedelta
 import logging
 
@@ -12,7 +11,10 @@ from sources.subgraph.bins.common import ExecutionOrderWrapper
 from sources.subgraph.bins.config import MONGO_DB_URL
 from sources.subgraph.bins.enums import Chain, Protocol
 from sources.subgraph.bins.hype_fees.fees import fees_all
-from sources.subgraph.bins.hype_fees.fees_yield import fee_returns_all
+from sources.subgraph.bins.hype_fees.fees_yield import (
+    fee_returns_all,
+    fee_returns_windows,
+)
 from sources.subgraph.bins.hype_fees.impermanent_divergence import (
     impermanent_divergence_all,
 )
@@ -56,11 +58,13 @@ class FeeReturns(ExecutionOrderWrapper):
         return result
 
     async def _subgraph(self):
-        return await fee_returns_all(
-            protocol=self.protocol,
-            chain=self.chain,
-            days=self.days,
-            current_timestamp=self.current_timestamp,
+        return (
+            await fee_returns_all(
+                protocol=self.protocol,
+                chain=self.chain,
+                days=self.days,
+                current_timestamp=self.current_timestamp,
+            )
         )["lp"]
 
 
@@ -130,20 +134,18 @@ class HypervisorsReturnsAllPeriods(ExecutionOrderWrapper):
         return result
 
     async def _subgraph(self):
-        daily, weekly, monthly = await asyncio.gather(
-            fee_returns_all(
-                self.protocol, self.chain, 1, self.hypervisors, self.current_timestamp
-            ),
-            fee_returns_all(
-                self.protocol, self.chain, 7, self.hypervisors, self.current_timestamp
-            ),
-            fee_returns_all(
-                self.protocol, self.chain, 30, self.hypervisors, self.current_timestamp
-            ),
+        # one query for all windows
+        windows = await fee_returns_windows(
+            protocol=self.protocol,
+            chain=self.chain,
+            windows=[1, 7, 30],
+            hypervisors=self.hypervisors,
+            current_timestamp=self.current_timestamp,
         )
+        daily, weekly, monthly = windows[1], windows[7], windows[30]
 
         results = {}
-        for hypervisor_id in daily.keys():
+        for hypervisor_id in daily["lp"].keys():
             hypervisor_daily = daily["lp"].get(hypervisor_id)
             hypervisor_weekly = weekly["lp"].get(hypervisor_id)
             hypervisor_monthly = monthly["lp"].get(hypervisor_id)
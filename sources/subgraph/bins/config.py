@@ -136,6 +136,8 @@ legacy_stats = {
 
 MONGO_DB_URL = get_config("MONGO_DB_URL")
 MONGO_DB_TIMEOUTMS = int(get_config("MONGO_DB_TIMEOUTMS"))
+MONGO_DB_MAXPOOLSIZE = int(get_config("MONGO_DB_MAXPOOLSIZE"))
+MONGO_DB_BULK_BATCH_SIZE = int(get_config("MONGO_DB_BULK_BATCH_SIZE"))
 MONGO_DB_COLLECTIONS = {
     "static": {"id": True},  # no historic
     "returns": {"id": True},  # historic
@@ -159,6 +161,13 @@ GROSS_FEES_MAX = 10**6
 TVL_MAX = 100e6
 
 GQL_CLIENT_TIMEOUT = int(get_config("GQL_CLIENT_TIMEOUT"))
+GQL_CLIENT_POOL_SIZE = int(get_config("GQL_CLIENT_POOL_SIZE"))
+GQL_CLIENT_KEEPALIVE_TIMEOUT = int(get_config("GQL_CLIENT_KEEPALIVE_TIMEOUT"))
+GQL_RETURNS_FEED_CONCURRENCY = int(get_config("GQL_RETURNS_FEED_CONCURRENCY"))
+
+BLOCK_TIME_CACHE_BUCKET_SECONDS = int(get_config("BLOCK_TIME_CACHE_BUCKET_SECONDS"))
+BLOCK_TIME_CACHE_MAX_SIZE = int(get_config("BLOCK_TIME_CACHE_MAX_SIZE"))
+BLOCK_TIME_LOOKUP_TIMEOUT = float(get_config("BLOCK_TIME_LOOKUP_TIMEOUT"))
 
 # What to run first, subgraph or database
 RUN_FIRST_QUERY_TYPE = QueryType(get_config("RUN_FIRST_QUERY_TYPE"))
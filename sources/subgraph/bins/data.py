@@ -1,13 +1,106 @@
+import asyncio
+import logging
+
 from gql.dsl import DSLQuery
 from httpx import HTTPStatusError
 
 from sources.subgraph.bins import LlamaClient
+from sources.subgraph.bins.config import (
+    BLOCK_TIME_CACHE_BUCKET_SECONDS,
+    BLOCK_TIME_CACHE_MAX_SIZE,
+    BLOCK_TIME_LOOKUP_TIMEOUT,
+)
 from sources.subgraph.bins.constants import DAY_SECONDS
 from sources.subgraph.bins.enums import Chain
 from sources.subgraph.bins.hype_fees.schema import Time
 from sources.subgraph.bins.subgraphs import SubgraphClient
 from sources.subgraph.bins.utils import estimate_block_from_timestamp_diff
 
+logger = logging.getLogger(__name__)
+
+
+class BlockTimeCache:
+    """Process-wide (chain, timestamp) -> block Time cache.
+
+    Timestamps are rounded down to buckets of <bucket_seconds> so close lookups share
+    one result, and concurrent lookups of the same bucket share one in-flight request.
+    Failed lookups are not cached.
+    """
+
+    def __init__(self, bucket_seconds: int, max_size: int):
+        self.bucket_seconds = max(1, bucket_seconds)
+        self.max_size = max_size
+        self._cache: dict[tuple[Chain, int], Time] = {}
+        self._inflight: dict[tuple[Chain, int], asyncio.Task] = {}
+
+    def bucket(self, timestamp: int) -> int:
+        """Timestamp rounded down to its bucket"""
+        return int(timestamp) // self.bucket_seconds * self.bucket_seconds
+
+    async def get(
+        self,
+        chain: Chain,
+        timestamp: int,
+        reference: Time | None = None,
+        timeout: float = BLOCK_TIME_LOOKUP_TIMEOUT,
+    ) -> Time:
+        """Block and timestamp of the bucket of a timestamp
+
+        Args:
+            chain (Chain):
+            timestamp (int):
+            reference (Time | None, optional): known block used to estimate the result when the lookup takes longer than <timeout>. Defaults to None ( wait for the lookup ).
+            timeout (float, optional): seconds to wait before estimating. Defaults to BLOCK_TIME_LOOKUP_TIMEOUT.
+
+        Returns:
+            Time:
+        """
+        key = (chain, self.bucket(timestamp))
+
+        if result := self._cache.get(key):
+            return result
+
+        task = self._inflight.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.create_task(self._lookup(key))
+            self._inflight[key] = task
+
+        if reference is None:
+            return await asyncio.shield(task)
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout=timeout)
+        except asyncio.TimeoutError:
+            # lookup keeps running in the background and will fill the cache
+            logger.debug(
+                f" Block lookup of {chain} timestamp {key[1]} took more than {timeout} seconds. Estimating it"
+            )
+            return Time(
+                block=estimate_block_from_timestamp_diff(
+                    chain, reference.block, reference.timestamp, key[1]
+                ),
+                timestamp=key[1],
+            )
+
+    async def _lookup(self, key: tuple[Chain, int]) -> Time:
+        try:
+            response = await LlamaClient(key[0]).block_from_timestamp(key[1], True)
+            result = Time(block=response["height"], timestamp=response["timestamp"])
+
+            # evict oldest entries
+            while len(self._cache) >= self.max_size > 0:
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[key] = result
+
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+
+BLOCK_TIME_CACHE = BlockTimeCache(
+    bucket_seconds=BLOCK_TIME_CACHE_BUCKET_SECONDS, max_size=BLOCK_TIME_CACHE_MAX_SIZE
+)
+
 
 class BlockRange:
     """Manage time ranges"""
@@ -22,7 +115,6 @@ class BlockRange:
         self.end: Time | None = None
         if subgraph_client:
             self._subgraph_client = subgraph_client
-        self._llama_client = LlamaClient(chain)
 
     async def set_end(self, timestamp: int | None = None) -> None:
         """Set end time and block"""
@@ -39,11 +131,8 @@ class BlockRange:
         """Set initial timestamp and block using days before current time"""
         timestamp_start = self.end.timestamp - (days_ago * DAY_SECONDS)
         try:
-            response = await self._llama_client.block_from_timestamp(
-                timestamp_start, True
-            )
-            self.initial = Time(
-                block=response["height"], timestamp=response["timestamp"]
+            self.initial = await BLOCK_TIME_CACHE.get(
+                self.chain, timestamp_start, reference=self.end
             )
         except HTTPStatusError:
             # Estimate start time if not found
@@ -58,8 +147,7 @@ class BlockRange:
             )
 
     async def _get_time_from_timestamp(self, timestamp: int) -> Time:
-        response = await self._llama_client.block_from_timestamp(timestamp, True)
-        return Time(block=response["height"], timestamp=response["timestamp"])
+        return await BLOCK_TIME_CACHE.get(self.chain, timestamp)
 
     async def _query_current_time(self) -> Time:
         query = DSLQuery(
@@ -1,19 +1,23 @@
 import logging
 import asyncio
 import sys
+import time
 from datetime import datetime, timezone
 from sources.common.database.collection_endpoint import database_local
 from sources.subgraph.bins.hypervisor import HypervisorInfo, HypervisorData
 from sources.subgraph.bins.masterchef_v2 import MasterchefV2Info
 from sources.subgraph.bins.hype_fees.data import FeeGrowthSnapshotData
-from sources.subgraph.bins.hype_fees.fees_yield import FeesYield
+from sources.subgraph.bins.hype_fees.fees_yield import FeesYieldBatch
 from sources.subgraph.bins.hype_fees.impermanent_divergence import (
-    impermanent_divergence_all,
+    impermanent_divergence_from_data,
 )
 from sources.subgraph.bins.toplevel import TopLevelData
 from sources.subgraph.bins.enums import Chain, Protocol
 
-from sources.subgraph.bins.config import MASTERCHEF_ADDRESSES
+from sources.subgraph.bins.config import (
+    GQL_RETURNS_FEED_CONCURRENCY,
+    MASTERCHEF_ADDRESSES,
+)
 
 from sources.common.database.common.collections_common import db_collections_common
 
@@ -47,6 +51,50 @@ class db_collection_manager(db_collections_common):
                 f" Unexpected error feeding {chain}'s {protocol} database  err:{e}"
             )
 
+    async def create_items(self, chain: Chain, protocol: Protocol, **kwargs) -> dict:
+        """Create the items to be saved to database
+
+        Returns:
+            dict: {<id>: <item>, ...}
+        """
+        return await self.create_data(chain=chain, protocol=protocol, **kwargs)
+
+    async def feed_db_bulk(
+        self, chains_protocols: list[tuple[Chain, Protocol]], **kwargs
+    ) -> list[dict]:
+        """Create data for all chains/protocols concurrently and save it using bulk writes
+
+        Args:
+            chains_protocols (list[tuple[Chain, Protocol]]):
+            **kwargs: passed to create_data
+
+        Returns:
+            list[dict]: per batch saving result
+        """
+        responses = await asyncio.gather(
+            *[
+                self.create_items(chain=chain, protocol=protocol, **kwargs)
+                for chain, protocol in chains_protocols
+            ],
+            return_exceptions=True,
+        )
+
+        items = {}
+        for (chain, protocol), response in zip(chains_protocols, responses):
+            if isinstance(response, ValueError):
+                # no data for this chain/protocol
+                logger.debug(f" {chain}'s {protocol} {response}")
+            elif isinstance(response, Exception):
+                logger.warning(
+                    f" Unexpected error creating {chain}'s {protocol} {self.db_collection_name} data  err:{response}"
+                )
+            elif response:
+                items.update({item["id"]: item for item in response.values()})
+
+        return await self.save_items_to_database(
+            data=items, collection_name=self.db_collection_name
+        )
+
     async def _get_data(self, query: list[dict]):
         return await self.query_items_from_database(
             query=query, collection_name=self.db_collection_name
@@ -183,6 +231,18 @@ class db_returns_manager(db_collection_manager):
         self.db_collection_name = "returns"
         self._max_retry = 1
 
+    # feeds running against each subgraph ( shared by all manager instances )
+    _subgraph_semaphores: dict[tuple[Protocol, Chain], asyncio.Semaphore] = {}
+
+    def _subgraph_semaphore(
+        self, chain: Chain, protocol: Protocol
+    ) -> asyncio.Semaphore:
+        if (protocol, chain) not in self._subgraph_semaphores:
+            self._subgraph_semaphores[(protocol, chain)] = asyncio.Semaphore(
+                GQL_RETURNS_FEED_CONCURRENCY
+            )
+        return self._subgraph_semaphores[(protocol, chain)]
+
     # format data to be used with mongo db
     async def create_data(
         self,
@@ -201,72 +261,97 @@ class db_returns_manager(db_collection_manager):
         Returns:
             dict:   <hypervisor_id>:<db_data_models.hypervisor_return>
         """
-        # define result var
-        result = {}
+        return (
+            await self.create_data_periods(
+                chain=chain,
+                protocol=protocol,
+                periods=[period_days],
+                current_timestamp=current_timestamp,
+            )
+        )[period_days]
+
+    async def create_data_periods(
+        self,
+        chain: Chain,
+        protocol: Protocol,
+        periods: list[int],
+        current_timestamp: int = None,
+    ) -> dict[int, dict]:
+        """Create the hypervisor_return database models of multiple periods ending at the same time,
+            using one subgraph query ( fee snapshots of the widest period are sliced for the rest )
 
-        # calculate return
+        Args:
+            chain (Chain):
+            protocol (Protocol):
+            periods (list[int]): periods in days
+
+        Returns:
+            dict[int, dict]:   <period>: {<hypervisor_id>:<db_data_models.hypervisor_return>}
+        """
+        # query all periods
         fees_data = FeeGrowthSnapshotData(protocol, chain)
-        await fees_data.init_time(days_ago=period_days, end_timestamp=current_timestamp)
+        await fees_data.init_time(days_ago=periods, end_timestamp=current_timestamp)
         await fees_data.get_data()
 
-        returns_data = {}
-        for hypervisor_id, fees_data_item in fees_data.data.items():
-            fees_yield = FeesYield(fees_data_item, protocol, chain)
-            returns = fees_yield.calculate_returns()
-            returns_data[hypervisor_id] = returns
-
-        # calculate impermanent divergence
-        imperm_data = await impermanent_divergence_all(
-            protocol=protocol,
-            chain=chain,
-            days=period_days,
-            current_timestamp=fees_data.time_range.end.timestamp,
-        )
-
         # get block n timestamp
         block = fees_data.time_range.end.block
         timestamp = fees_data.time_range.end.timestamp
 
-        # fee yield data process
-        for k, v in returns_data.items():
-            if k not in result.keys():
-                # set the database unique id
-                database_id = f"{chain}_{k}_{block}_{period_days}"
-
-                result[k] = {
-                    "id": database_id,
-                    "chain": chain,
-                    "period": period_days,
-                    "address": k,
-                    "block": block,
-                    "timestamp": timestamp,
-                    "fees": {
-                        "feeApr": v.apr,
-                        "feeApy": v.apy,
-                        "status": v.status,
-                    },
-                }
+        results = {}
+        for period_days in fees_data.windows:
+            # define result var
+            result = {}
 
-        # impermanent data process
-        for k, v in imperm_data.items():
-            # only hypervisors with FeeYield data
-            if k in result:
-                # add symbol
-                result[k]["symbol"] = v["symbol"]
-                # add impermanent
-                result[k]["impermanent"] = {
-                    # "ini_block": v["ini_block"],
-                    # "end_block": v["end_block"],
-                    # "ini_timestamp": v["ini_timestamp"],
-                    # "end_timestamp": v["end_timestamp"],
-                    "lping": v["lping"],
-                    "hodl_deposited": v["hodl_deposited"],
-                    "hodl_fifty": v["hodl_fifty"],
-                    "hodl_token0": v["hodl_token0"],
-                    "hodl_token1": v["hodl_token1"],
-                }
+            # calculate return
+            returns_data = FeesYieldBatch(
+                fees_data.windows_data[period_days], protocol, chain
+            ).calculate_returns()
 
-        return result
+            # calculate impermanent divergence
+            imperm_data = impermanent_divergence_from_data(
+                data=fees_data.windows_range[period_days],
+                protocol=protocol,
+                chain=chain,
+            )
+
+            # fee yield data process
+            for k, v in returns_data.items():
+                if k not in result.keys():
+                    # set the database unique id
+                    database_id = f"{chain}_{k}_{block}_{period_days}"
+
+                    result[k] = {
+                        "id": database_id,
+                        "chain": chain,
+                        "period": period_days,
+                        "address": k,
+                        "block": block,
+                        "timestamp": timestamp,
+                        "fees": {
+                            "feeApr": v.apr,
+                            "feeApy": v.apy,
+                            "status": v.status,
+                        },
+                    }
+
+            # impermanent data process
+            for k, v in imperm_data.items():
+                # only hypervisors with FeeYield data
+                if k in result:
+                    # add symbol
+                    result[k]["symbol"] = v["symbol"]
+                    # add impermanent
+                    result[k]["impermanent"] = {
+                        "lping": v["lping"],
+                        "hodl_deposited": v["hodl_deposited"],
+                        "hodl_fifty": v["hodl_fifty"],
+                        "hodl_token0": v["hodl_token0"],
+                        "hodl_token1": v["hodl_token1"],
+                    }
+
+            results[period_days] = result
+
+        return results
 
     async def feed_db(
         self,
@@ -275,34 +360,49 @@ class db_returns_manager(db_collection_manager):
         periods: list[int] = None,
         retried: int = 0,
         current_timestamp: int = None,
-    ):
+    ) -> float | None:
         """
         Args:
             chain (Chain):
             protocol (Protocol):
             periods (list[int], optional): . Defaults to [1, 7, 14, 30].
             retried (int, optional): current number of retries . Defaults to 0.
+
+        Returns:
+            float | None: seconds taken to feed the database ( None when it could not be fed )
         """
         # set default periods
         if not periods:
             periods = [1, 7, 14, 30]
 
+        _startime = time.monotonic()
+
         # create data
         try:
-            requests = [
-                self.save_items_to_database(
-                    data=await self.create_data(
-                        chain=chain,
-                        protocol=protocol,
-                        period_days=days,
-                        current_timestamp=current_timestamp,
-                    ),
-                    collection_name=self.db_collection_name,
+            # all periods from one query ( limiting the feeds running against the same subgraph )
+            async with self._subgraph_semaphore(chain=chain, protocol=protocol):
+                data_periods = await self.create_data_periods(
+                    chain=chain,
+                    protocol=protocol,
+                    periods=periods,
+                    current_timestamp=current_timestamp,
                 )
-                for days in periods
-            ]
 
-            await asyncio.gather(*requests)
+            # all periods in one bulk write
+            items = {
+                item["id"]: item
+                for data in data_periods.values()
+                for item in data.values()
+            }
+            await self.save_items_to_database(
+                data=items, collection_name=self.db_collection_name
+            )
+
+            seconds = time.monotonic() - _startime
+            logger.debug(
+                f" {chain}'s {protocol} returns of periods {periods} fed to db in {seconds:,.2f} seconds  [{len(items)} items]"
+            )
+            return seconds
 
         except Exception as err:
             # retry when possible
@@ -313,7 +413,7 @@ class db_returns_manager(db_collection_manager):
                     f" Retrying the feeding of {chain}'s {protocol} returns to db for the {retried+1} time."
                 )
                 # retry
-                await self.feed_db(
+                return await self.feed_db(
                     chain=chain,
                     protocol=protocol,
                     periods=periods,
@@ -1363,6 +1463,12 @@ class db_allData_manager(db_collection_manager):
 
         return allData
 
+    async def create_items(self, chain: Chain, protocol: Protocol, **kwargs) -> dict:
+        # data is saved as 1 item ( not separated)
+        if data := await self.create_data(chain=chain, protocol=protocol, **kwargs):
+            return {data["id"]: data}
+        return {}
+
     async def feed_db(self, chain: Chain, protocol: Protocol):
         try:
             # save as 1 item ( not separated)
@@ -1451,6 +1557,12 @@ class db_allRewards2_manager(db_collection_manager):
 
         return data
 
+    async def create_items(self, chain: Chain, protocol: Protocol, **kwargs) -> dict:
+        # data is saved as 1 item ( not separated)
+        if data := await self.create_data(chain=chain, protocol=protocol, **kwargs):
+            return {data["id"]: data}
+        return {}
+
     async def feed_db(self, chain: Chain, protocol: Protocol):
         try:
             # save as 1 item ( not separated)
@@ -1810,6 +1922,12 @@ class db_aggregateStats_manager(db_collection_manager):
             "totalFeesClaimedUSD": top_level_data["fees_claimed"],
         }
 
+    async def create_items(self, chain: Chain, protocol: Protocol, **kwargs) -> dict:
+        # data is saved as 1 item ( not separated)
+        if data := await self.create_data(chain=chain, protocol=protocol, **kwargs):
+            return {data["id"]: data}
+        return {}
+
     async def feed_db(self, chain: Chain, protocol: Protocol):
         try:
             # save as 1 item ( not separated)
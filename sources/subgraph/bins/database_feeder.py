@@ -20,6 +20,7 @@ from sources.subgraph.bins.config import (
     EXCLUDED_HYPERVISORS,
 )
 
+from sources.common.database.common.db_indexes import bootstrap_indexes
 from sources.subgraph.bins.database.managers import (
     db_returns_manager,
     db_static_manager,
@@ -85,7 +86,7 @@ async def feed_database_returns(
     returns_manager = db_returns_manager(mongo_url=MONGO_DB_URL)
     returns_manager._max_retry = max_retries
 
-    # all request at once
+    # all request at once ( each subgraph limited by GQL_RETURNS_FEED_CONCURRENCY )
     requests = [
         returns_manager.feed_db(
             chain=chain,
@@ -95,7 +96,18 @@ async def feed_database_returns(
         )
         for chain, protocol in CHAINS_PROTOCOLS
     ]
-    await asyncio.gather(*requests)
+    timings = await asyncio.gather(*requests)
+
+    # per chain time log
+    logger.info(
+        " {} feed times: {}".format(
+            name,
+            ", ".join(
+                f"{chain}'s {protocol} {'failed' if seconds is None else f'{seconds:,.2f}s'}"
+                for (chain, protocol), seconds in zip(CHAINS_PROTOCOLS, timings)
+            ),
+        )
+    )
 
     # end time log
     logger.info(f" took {get_timepassed_string(_startime)} to complete the {name} feed")
@@ -112,13 +124,12 @@ async def feed_database_static():
 
     # static requests
     static_manager = db_static_manager(mongo_url=MONGO_DB_URL)
-    requests = [
-        static_manager.feed_db(chain=chain, protocol=protocol)
-        for chain, protocol in CHAINS_PROTOCOLS
-    ]
 
     # execute feed
-    await asyncio.gather(*requests)
+    log_bulk_results(
+        name=name,
+        results=await static_manager.feed_db_bulk(chains_protocols=CHAINS_PROTOCOLS),
+    )
 
     # end time log
     logger.info(f" took {get_timepassed_string(_startime)} to complete the {name} feed")
@@ -134,16 +145,12 @@ async def feed_database_allData():
     _startime = datetime.now(timezone.utc)
 
     _manager = db_allData_manager(mongo_url=MONGO_DB_URL)
-    requests = [
-        _manager.feed_db(
-            chain=chain,
-            protocol=protocol,
-        )
-        for chain, protocol in CHAINS_PROTOCOLS
-    ]
 
     # execute feed
-    await asyncio.gather(*requests)
+    log_bulk_results(
+        name=name,
+        results=await _manager.feed_db_bulk(chains_protocols=CHAINS_PROTOCOLS),
+    )
 
     # end time log
     logger.info(f" took {get_timepassed_string(_startime)} to complete the {name} feed")
@@ -161,17 +168,18 @@ async def feed_database_allRewards2():
     _startime = datetime.now(timezone.utc)
 
     _manager = db_allRewards2_manager(mongo_url=MONGO_DB_URL)
-    requests = [
-        _manager.feed_db(
-            chain=chain,
-            protocol=protocol,
-        )
-        for chain, protocol in CHAINS_PROTOCOLS
-        if protocol not in [Protocol.ZYBERSWAP, Protocol.THENA]
-    ]
 
     # execute feed
-    await asyncio.gather(*requests)
+    log_bulk_results(
+        name=name,
+        results=await _manager.feed_db_bulk(
+            chains_protocols=[
+                (chain, protocol)
+                for chain, protocol in CHAINS_PROTOCOLS
+                if protocol not in [Protocol.ZYBERSWAP, Protocol.THENA]
+            ]
+        ),
+    )
 
     # end time log
     logger.info(f" took {get_timepassed_string(_startime)} to complete the {name} feed")
@@ -184,18 +192,19 @@ async def feed_database_allRewards2_externals(current_timestamp: int | None = No
     _startime = datetime.now(timezone.utc)
 
     _manager = db_allRewards2_external_manager(mongo_url=MONGO_DB_URL)
-    requests = [
-        _manager.feed_db(
-            chain=chain,
-            protocol=protocol,
-            current_timestamp=current_timestamp,
-        )
-        for chain, protocol in CHAINS_PROTOCOLS
-        if protocol in [Protocol.ZYBERSWAP, Protocol.THENA]
-    ]
 
     # execute feed
-    await asyncio.gather(*requests)
+    log_bulk_results(
+        name=name,
+        results=await _manager.feed_db_bulk(
+            chains_protocols=[
+                (chain, protocol)
+                for chain, protocol in CHAINS_PROTOCOLS
+                if protocol in [Protocol.ZYBERSWAP, Protocol.THENA]
+            ],
+            current_timestamp=current_timestamp,
+        ),
+    )
 
     # end time log
     logger.info(f" took {get_timepassed_string(_startime)} to complete the {name} feed")
@@ -208,16 +217,12 @@ async def feed_database_aggregateStats():
     _startime = datetime.now(timezone.utc)
 
     _manager = db_aggregateStats_manager(mongo_url=MONGO_DB_URL)
-    requests = [
-        _manager.feed_db(
-            chain=chain,
-            protocol=protocol,
-        )
-        for chain, protocol in CHAINS_PROTOCOLS
-    ]
 
     # execute feed
-    await asyncio.gather(*requests)
+    log_bulk_results(
+        name=name,
+        results=await _manager.feed_db_bulk(chains_protocols=CHAINS_PROTOCOLS),
+    )
 
     # end time log
     logger.info(f" took {get_timepassed_string(_startime)} to complete the {name} feed")
@@ -347,6 +352,19 @@ def convert_commandline_arguments(argv) -> dict:
     return prmtrs
 
 
+def log_bulk_results(name: str, results: list[dict]):
+    """log the per batch result of a bulk database feed
+
+    Args:
+        name (str): feed name
+        results (list[dict]): list of {"items":, "matched":, "modified":, "upserted":, "errors":}
+    """
+    for idx, result in enumerate(results):
+        logger.info(
+            f"     {name} batch {idx+1}/{len(results)}: items {result['items']}  matched {result['matched']}  upserted {result['upserted']}  errors {result['errors']}"
+        )
+
+
 def get_timepassed_string(start_time: datetime, end_time: datetime = None) -> str:
     if not end_time:
         end_time = datetime.now(timezone.utc)
@@ -377,6 +395,12 @@ if __name__ == "__main__":
     # convert command line arguments to dict variables
     cml_parameters = convert_commandline_arguments(sys.argv[1:])
 
+    # create database indexes once, before any feeding
+    try:
+        bootstrap_indexes(url=MONGO_DB_URL)
+    except Exception as e:
+        logger.warning(f" Unable to bootstrap database indexes  err:{e}")
+
     if cml_parameters["historic"]:
         # historic feed
 
@@ -1,3 +1,4 @@
+import asyncio
 from abc import ABC, abstractmethod
 
 from gql.dsl import DSLQuery
@@ -9,6 +10,7 @@ from sources.subgraph.bins.hype_fees.schema import (
     FeesData,
     FeesDataRange,
     HypervisorStaticInfo,
+    Time,
 )
 from sources.subgraph.bins.subgraphs.hype_pool import HypePoolClient
 
@@ -101,7 +103,7 @@ class FeeGrowthDataABC(ABC):
             fee_growth_outside_upper_limit1=hypervisor["limitPosition"]["tickUpper"][
                 "feeGrowthOutside1X128"
             ],
-            total_supply=hypervisor.get("totalSupply"),
+            total_supply_raw=hypervisor.get("totalSupply"),
             total_supply_decimals=18 if hypervisor.get("totalSupply") else 0,
         )
 
@@ -166,15 +168,59 @@ class FeeGrowthData(FeeGrowthDataABC):
 
 
 class FeeGrowthSnapshotData(FeeGrowthDataABC):
-    """Get fee growth data from fee growth subgraph"""
+    """Get fee growth data from fee growth subgraph
 
-    async def init_time(self, days_ago: int, end_timestamp: int | None = None):
+    Multiple windows ending at the same time are queried at once: fee snapshots of the
+    widest window are pulled once and sliced in memory for the rest of windows.
+    """
+
+    def __init__(self, protocol: Protocol, chain: Chain) -> None:
+        super().__init__(protocol, chain)
+        # initial time of each window:  { <days>: <Time> }
+        self.windows: dict[int, Time] = {}
+        # data of each window:  { <days>: { <hypervisor id>: [<FeesData>, ...] } }
+        self.windows_data: dict[int, dict[str, list[FeesData]]] = {}
+        # initial and latest data of each window ( impermanent divergence ):  { <days>: { <hypervisor id>: <FeesDataRange> } }
+        self.windows_range: dict[int, dict[str, FeesDataRange]] = {}
+
+    async def init_time(
+        self, days_ago: int | list[int], end_timestamp: int | None = None
+    ):
+        """Set end time and the initial time of one or multiple windows
+
+        Args:
+            days_ago (int | list[int]): window(s) length in days
+            end_timestamp (int | None, optional): Defaults to current time.
+        """
         await self.time_range.set_end(end_timestamp)
-        await self.time_range.set_initial_with_days_ago(days_ago)
+
+        windows = sorted(set(days_ago if isinstance(days_ago, list) else [days_ago]))
+        window_ranges = []
+        for _ in windows:
+            window_range = BlockRange(self.chain)
+            window_range.end = self.time_range.end
+            window_ranges.append(window_range)
+        await asyncio.gather(
+            *[
+                window_range.set_initial_with_days_ago(days)
+                for window_range, days in zip(window_ranges, windows)
+            ]
+        )
+        self.windows = {
+            days: window_range.initial
+            for days, window_range in zip(windows, window_ranges)
+        }
+
+        # widest window
+        self.time_range.initial = self.windows[windows[-1]]
 
     async def get_data(self, hypervisors: list[str] | None = None) -> None:
-        """Query data and tranfrom to FeesData Class"""
-        self.data = self._transform_data(await self._query_data(hypervisors))
+        """Query data and tranfrom to FeesData Class
+        ( data: widest window, windows_data: every window )"""
+        query_data = await self._query_data(hypervisors)
+        self.windows_data = self._transform_data(query_data)
+        self.windows_range = self._transform_range_data(query_data)
+        self.data = self.windows_data[max(self.windows)]
 
     async def _query_data(self, hypervisors: list[str] | None = None) -> dict:
         ds = self.hype_pool_client.data_schema
@@ -196,20 +242,23 @@ class FeeGrowthSnapshotData(FeeGrowthDataABC):
             )
             .alias("latest")
             .select(self.hype_pool_client.hypervisor_fields_fragment()),
-            ds.Query.hypervisors(
-                **(
-                    {"block": {"number": self.time_range.initial.block}}
-                    | hypervisor_filter
+            *[
+                ds.Query.hypervisors(
+                    **({"block": {"number": initial.block}} | hypervisor_filter)
                 )
-            )
-            .alias("initial")
-            .select(self.hype_pool_client.hypervisor_fields_fragment()),
+                .alias(f"initial_{days}")
+                .select(self.hype_pool_client.hypervisor_fields_fragment())
+                for days, initial in self.windows.items()
+            ],
             ds.Query.hypervisors(**hypervisor_filter)
             .alias("snapshots")
             .select(
                 ds.Hypervisor.id,
+                # latest first: narrower windows are complete when the limit is reached
                 ds.Hypervisor.feeSnapshots(
                     first=1000,
+                    orderBy="timestamp",
+                    orderDirection="desc",
                     where={
                         "timestamp_gte": self.time_range.initial.timestamp,
                         "timestamp_lte": self.time_range.end.timestamp,
@@ -231,90 +280,125 @@ class FeeGrowthSnapshotData(FeeGrowthDataABC):
         response = await self.hype_pool_client.execute(query)
         return response
 
-    def _transform_data(self, query_data: dict) -> dict[str, list[FeesData]]:
+    def _init_hypervisor_fees_data(self, hypervisor: dict, time: Time) -> FeesData:
+        """FeesData of a hypervisor queried at a block"""
+        return self._init_fees_data(
+            hypervisor=hypervisor,
+            hypervisor_id=hypervisor["id"],
+            block=time.block,
+            timestamp=time.timestamp,
+            current_tick=hypervisor["pool"]["currentTick"],
+            price_0=hypervisor["pool"]["token0"]["priceUSD"],
+            price_1=hypervisor["pool"]["token1"]["priceUSD"],
+            fee_growth_global_0=hypervisor["pool"]["feeGrowthGlobal0X128"],
+            fee_growth_global_1=hypervisor["pool"]["feeGrowthGlobal1X128"],
+        )
+
+    def _transform_data(
+        self, query_data: dict
+    ) -> dict[int, dict[str, list[FeesData]]]:
         self._extract_static_data(query_data["static"])
-        transformed_data = {
-            hypervisor_latest["id"]: [
-                self._init_fees_data(
-                    hypervisor=hypervisor_latest,
-                    hypervisor_id=hypervisor_latest["id"],
-                    block=self.time_range.end.block,
-                    timestamp=self.time_range.end.timestamp,
-                    current_tick=hypervisor_latest["pool"]["currentTick"],
-                    price_0=hypervisor_latest["pool"]["token0"]["priceUSD"],
-                    price_1=hypervisor_latest["pool"]["token1"]["priceUSD"],
-                    fee_growth_global_0=hypervisor_latest["pool"][
-                        "feeGrowthGlobal0X128"
-                    ],
-                    fee_growth_global_1=hypervisor_latest["pool"][
-                        "feeGrowthGlobal1X128"
-                    ],
-                )
-            ]
+        latest_data = {
+            hypervisor_latest["id"]: self._init_hypervisor_fees_data(
+                hypervisor=hypervisor_latest, time=self.time_range.end
+            )
             for hypervisor_latest in query_data["latest"]
         }
 
-        # Add initial row
-        for hypervisor_initial in query_data["initial"]:
-            if not transformed_data.get(hypervisor_initial["id"]):
-                continue
-
-            transformed_data[hypervisor_initial["id"]].append(
-                self._init_fees_data(
-                    hypervisor=hypervisor_initial,
-                    hypervisor_id=hypervisor_initial["id"],
-                    block=self.time_range.initial.block,
-                    timestamp=self.time_range.initial.timestamp,
-                    current_tick=hypervisor_initial["pool"]["currentTick"],
-                    price_0=hypervisor_initial["pool"]["token0"]["priceUSD"],
-                    price_1=hypervisor_initial["pool"]["token1"]["priceUSD"],
-                    fee_growth_global_0=hypervisor_initial["pool"][
-                        "feeGrowthGlobal0X128"
-                    ],
-                    fee_growth_global_1=hypervisor_initial["pool"][
-                        "feeGrowthGlobal1X128"
-                    ],
-                )
-            )
-
+        # snapshot rows ( current and previous block ) with their snapshot timestamp
+        snapshot_data: dict[str, list[tuple[int, FeesData]]] = {}
         for hypervisor_snapshot in query_data["snapshots"]:
+            if hypervisor_snapshot["id"] not in latest_data:
+                continue
+            rows = snapshot_data.setdefault(hypervisor_snapshot["id"], [])
             for snapshot in hypervisor_snapshot["feeSnapshots"]:
-                if not transformed_data.get(hypervisor_snapshot["id"]):
-                    continue
-
                 # Add current block
                 current_block = snapshot["currentBlock"]
-                transformed_data[hypervisor_snapshot["id"]].append(
-                    self._init_fees_data(
-                        hypervisor=current_block,
-                        hypervisor_id=hypervisor_snapshot["id"],
-                        block=snapshot["blockNumber"],
-                        timestamp=snapshot["timestamp"],
-                        current_tick=current_block["tick"],
-                        price_0=current_block["price0"],
-                        price_1=current_block["price1"],
-                        fee_growth_global_0=current_block["feeGrowthGlobal0X128"],
-                        fee_growth_global_1=current_block["feeGrowthGlobal1X128"],
+                rows.append(
+                    (
+                        int(snapshot["timestamp"]),
+                        self._init_fees_data(
+                            hypervisor=current_block,
+                            hypervisor_id=hypervisor_snapshot["id"],
+                            block=snapshot["blockNumber"],
+                            timestamp=snapshot["timestamp"],
+                            current_tick=current_block["tick"],
+                            price_0=current_block["price0"],
+                            price_1=current_block["price1"],
+                            fee_growth_global_0=current_block["feeGrowthGlobal0X128"],
+                            fee_growth_global_1=current_block["feeGrowthGlobal1X128"],
+                        ),
                     )
                 )
                 # Add previous block
                 previous_block = snapshot["previousBlock"]
-                transformed_data[hypervisor_snapshot["id"]].append(
-                    self._init_fees_data(
-                        hypervisor=previous_block,
-                        hypervisor_id=hypervisor_snapshot["id"],
-                        block=int(snapshot["blockNumber"])
-                        - 1,  # Previous block is 1 block before
-                        timestamp=int(snapshot["timestamp"])
-                        - BLOCK_TIME_SECONDS[self.chain],
-                        current_tick=previous_block["tick"],
-                        price_0=previous_block["price0"],
-                        price_1=previous_block["price1"],
-                        fee_growth_global_0=previous_block["feeGrowthGlobal0X128"],
-                        fee_growth_global_1=previous_block["feeGrowthGlobal1X128"],
+                rows.append(
+                    (
+                        int(snapshot["timestamp"]),
+                        self._init_fees_data(
+                            hypervisor=previous_block,
+                            hypervisor_id=hypervisor_snapshot["id"],
+                            block=int(snapshot["blockNumber"])
+                            - 1,  # Previous block is 1 block before
+                            timestamp=int(snapshot["timestamp"])
+                            - BLOCK_TIME_SECONDS[self.chain],
+                            current_tick=previous_block["tick"],
+                            price_0=previous_block["price0"],
+                            price_1=previous_block["price1"],
+                            fee_growth_global_0=previous_block["feeGrowthGlobal0X128"],
+                            fee_growth_global_1=previous_block["feeGrowthGlobal1X128"],
+                        ),
                     )
                 )
-        return transformed_data
+
+        # slice every window:  latest, initial and snapshots since the window initial time
+        windows_data = {}
+        for days, initial in self.windows.items():
+            transformed_data = {
+                hypervisor_id: [latest] for hypervisor_id, latest in latest_data.items()
+            }
+
+            # Add initial row
+            for hypervisor_initial in query_data[f"initial_{days}"]:
+                if not transformed_data.get(hypervisor_initial["id"]):
+                    continue
+
+                transformed_data[hypervisor_initial["id"]].append(
+                    self._init_hypervisor_fees_data(
+                        hypervisor=hypervisor_initial, time=initial
+                    )
+                )
+
+            for hypervisor_id, rows in snapshot_data.items():
+                transformed_data[hypervisor_id].extend(
+                    row for timestamp, row in rows if timestamp >= initial.timestamp
+                )
+
+            windows_data[days] = transformed_data
+
+        return windows_data
+
+    def _transform_range_data(
+        self, query_data: dict
+    ) -> dict[int, dict[str, FeesDataRange]]:
+        """Initial and latest data of every window ( new FeesData: ranges are modified when used )"""
+        latest_data = {hype["id"]: hype for hype in query_data["latest"]}
+        return {
+            days: {
+                hypervisor_initial["id"]: FeesDataRange(
+                    initial=self._init_hypervisor_fees_data(
+                        hypervisor=hypervisor_initial, time=initial
+                    ),
+                    latest=self._init_hypervisor_fees_data(
+                        hypervisor=latest_data[hypervisor_initial["id"]],
+                        time=self.time_range.end,
+                    ),
+                )
+                for hypervisor_initial in query_data[f"initial_{days}"]
+                if hypervisor_initial["id"] in latest_data
+            }
+            for days, initial in self.windows.items()
+        }
 
 
 class ImpermanentDivergenceData(FeeGrowthDataABC):
@@ -0,0 +1,119 @@
+import numpy as np
+
+# wide integers are arrays of 32 bit limbs ( little endian ) held in uint64,
+# so limb products and carries never overflow
+LIMB_BITS = 32
+LIMB_MASK = np.uint64(2**LIMB_BITS - 1)
+LIMB_SHIFT = np.uint64(LIMB_BITS)
+# uint256 fee growth values and uint128 liquidity
+UINT256_LIMBS = 8
+UINT128_LIMBS = 4
+
+
+def to_limbs(values: list[int], limbs: int) -> tuple[np.ndarray, np.ndarray]:
+    """Unsigned integers to limb arrays
+
+    Args:
+        values (list[int]):
+        limbs (int): 32 bit limbs of each value
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: ( n, limbs ) uint64 array,  bool mask of the values that fit
+                ( negative, too big or non integer values are set to 0 )
+    """
+    size = limbs * LIMB_BITS // 8
+    valid = np.ones(len(values), dtype=bool)
+    chunks = []
+    for i, value in enumerate(values):
+        try:
+            chunks.append(value.to_bytes(size, "little"))
+        except (AttributeError, OverflowError):
+            chunks.append(bytes(size))
+            valid[i] = False
+
+    return (
+        np.frombuffer(b"".join(chunks), dtype="<u4")
+        .reshape(len(values), limbs)
+        .astype(np.uint64),
+        valid,
+    )
+
+
+def from_limbs(values: np.ndarray) -> list[int]:
+    """Limb array to python integers"""
+    size = values.shape[1] * LIMB_BITS // 8
+    data = values.astype("<u4").tobytes()
+    return [
+        int.from_bytes(data[i : i + size], "little")
+        for i in range(0, len(data), size)
+    ]
+
+
+def sub_limbs(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """x - y modulo 2**( limbs * 32 ) ( sub_in_256 for 8 limbs )"""
+    result = np.empty_like(x)
+    borrow = np.zeros(len(x), dtype=np.uint64)
+    for k in range(x.shape[1]):
+        difference = x[:, k] + (LIMB_MASK + np.uint64(1)) - y[:, k] - borrow
+        result[:, k] = difference & LIMB_MASK
+        borrow = np.uint64(1) - (difference >> LIMB_SHIFT)
+    return result
+
+
+def mul_limbs(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """x * y ( full width:  x limbs + y limbs )"""
+    result = np.zeros((len(x), x.shape[1] + y.shape[1]), dtype=np.uint64)
+    for i in range(x.shape[1]):
+        for j in range(y.shape[1]):
+            product = x[:, i] * y[:, j]
+            result[:, i + j] += product & LIMB_MASK
+            result[:, i + j + 1] += product >> LIMB_SHIFT
+    # propagate carries
+    for k in range(result.shape[1] - 1):
+        result[:, k + 1] += result[:, k] >> LIMB_SHIFT
+        result[:, k] &= LIMB_MASK
+    return result
+
+
+def uncollected_fees_x128(
+    current_tick: np.ndarray,
+    tick_lower: np.ndarray,
+    tick_upper: np.ndarray,
+    fee_growth_global: np.ndarray,
+    fee_growth_outside_lower: np.ndarray,
+    fee_growth_outside_upper: np.ndarray,
+    fee_growth_inside: np.ndarray,
+    liquidity: np.ndarray,
+) -> np.ndarray:
+    """Uncollected fees ( x128 ) of one token of many positions at once
+        ( Fees._calc_position_fees for limb arrays )
+
+    Args:
+        current_tick (np.ndarray): int64 pool tick of each position
+        tick_lower (np.ndarray): int64
+        tick_upper (np.ndarray): int64
+        fee_growth_global (np.ndarray): uint256 limbs
+        fee_growth_outside_lower (np.ndarray): uint256 limbs
+        fee_growth_outside_upper (np.ndarray): uint256 limbs
+        fee_growth_inside (np.ndarray): uint256 limbs ( last position update )
+        liquidity (np.ndarray): uint128 limbs
+
+    Returns:
+        np.ndarray: uint384 limbs
+    """
+    fee_growth_below = np.where(
+        (current_tick >= tick_lower)[:, None],
+        fee_growth_outside_lower,
+        sub_limbs(fee_growth_global, fee_growth_outside_lower),
+    )
+    fee_growth_above = np.where(
+        (current_tick >= tick_upper)[:, None],
+        sub_limbs(fee_growth_global, fee_growth_outside_upper),
+        fee_growth_outside_upper,
+    )
+
+    fees_accum_now = sub_limbs(
+        sub_limbs(fee_growth_global, fee_growth_below), fee_growth_above
+    )
+
+    return mul_limbs(sub_limbs(fees_accum_now, fee_growth_inside), liquidity)
@@ -1,7 +1,17 @@
 import logging
 
+import numpy as np
+
+from sources.subgraph.bins.constants import X128
 from sources.subgraph.bins.enums import Chain, PositionType, Protocol
 from sources.subgraph.bins.hype_fees.data import FeeGrowthData
+from sources.subgraph.bins.hype_fees.fee_growth import (
+    UINT128_LIMBS,
+    UINT256_LIMBS,
+    from_limbs,
+    to_limbs,
+    uncollected_fees_x128,
+)
 from sources.subgraph.bins.hype_fees.schema import FeesData, UncollectedFees, _TokenPair
 from sources.subgraph.bins.utils import sub_in_256
 
@@ -110,6 +120,173 @@ class Fees:
         )
 
 
+def _position_fees_batch(
+    data: list[FeesData],
+) -> tuple[dict[tuple[PositionType, int], list[int]], np.ndarray]:
+    """Uncollected position fees ( x128 ) of many snapshots at once, using exact wide integer arrays
+
+    Args:
+        data (list[FeesData]):
+
+    Returns:
+        tuple[dict, np.ndarray]: {(<position type>, <token>): [<fees x128 of each item>]},
+                bool mask of the items calculated ( missing or out of range values are not )
+    """
+    valid = np.ones(len(data), dtype=bool)
+
+    def _ticks(values: list) -> np.ndarray:
+        result = np.zeros(len(values), dtype=np.int64)
+        for i, value in enumerate(values):
+            try:
+                result[i] = value
+            except (TypeError, ValueError, OverflowError):
+                valid[i] = False
+        return result
+
+    def _limbs(values: list, limbs: int) -> np.ndarray:
+        result, fits = to_limbs(values, limbs)
+        valid[~fits] = False
+        return result
+
+    current_tick = _ticks([x.current_tick for x in data])
+    fee_growth_global = [
+        _limbs([x.fee_growth_global.value0 for x in data], UINT256_LIMBS),
+        _limbs([x.fee_growth_global.value1 for x in data], UINT256_LIMBS),
+    ]
+
+    # uncollected fees x128 by position type and token
+    fees_x128 = {}
+    for position_type in (PositionType.BASE, PositionType.LIMIT):
+        positions = [
+            x.base_position if position_type == PositionType.BASE else x.limit_position
+            for x in data
+        ]
+        tick_lower = _ticks([x.tick_lower.tick_index for x in positions])
+        tick_upper = _ticks([x.tick_upper.tick_index for x in positions])
+        liquidity = _limbs([x.liquidity for x in positions], UINT128_LIMBS)
+        for token in (0, 1):
+            fees_x128[(position_type, token)] = from_limbs(
+                uncollected_fees_x128(
+                    current_tick=current_tick,
+                    tick_lower=tick_lower,
+                    tick_upper=tick_upper,
+                    fee_growth_global=fee_growth_global[token],
+                    fee_growth_outside_lower=_limbs(
+                        [
+                            getattr(x.tick_lower.fee_growth_outside, f"value{token}")
+                            for x in positions
+                        ],
+                        UINT256_LIMBS,
+                    ),
+                    fee_growth_outside_upper=_limbs(
+                        [
+                            getattr(x.tick_upper.fee_growth_outside, f"value{token}")
+                            for x in positions
+                        ],
+                        UINT256_LIMBS,
+                    ),
+                    fee_growth_inside=_limbs(
+                        [
+                            getattr(x.fee_growth_inside, f"value{token}")
+                            for x in positions
+                        ],
+                        UINT256_LIMBS,
+                    ),
+                    liquidity=liquidity,
+                )
+            )
+
+    return fees_x128, valid
+
+
+def fee_amounts_batch(
+    data: list[FeesData], protocol: Protocol, chain: Chain
+) -> list[UncollectedFees]:
+    """Fee amounts of many snapshots at once ( Fees.fee_amounts of each item ).
+        Snapshots with missing or out of range values use Fees.
+
+    Args:
+        data (list[FeesData]):
+        protocol (Protocol):
+        chain (Chain):
+
+    Returns:
+        list[UncollectedFees]: one item per data item
+    """
+    fees_x128, valid = _position_fees_batch(data)
+
+    results = []
+    for i, item in enumerate(data):
+        if not valid[i]:
+            results.append(Fees(item, protocol, chain).fee_amounts())
+            continue
+
+        results.append(
+            UncollectedFees(
+                base_fees0_x128=fees_x128[(PositionType.BASE, 0)][i],
+                base_fees1_x128=fees_x128[(PositionType.BASE, 1)][i],
+                base_owed0_x128=item.base_position.tokens_owed.value0.raw,
+                base_owed1_x128=item.base_position.tokens_owed.value1.raw,
+                limit_fees0_x128=fees_x128[(PositionType.LIMIT, 0)][i],
+                limit_fees1_x128=fees_x128[(PositionType.LIMIT, 1)][i],
+                limit_owed0_x128=item.limit_position.tokens_owed.value0.raw,
+                limit_owed1_x128=item.limit_position.tokens_owed.value1.raw,
+                decimals0=item.decimals.value0,
+                decimals1=item.decimals.value1,
+                price0=item.price.value0,
+                price1=item.price.value1,
+            )
+        )
+
+    return results
+
+
+def total_fee_amounts_batch(
+    data: list[FeesData], protocol: Protocol, chain: Chain
+) -> list[tuple[float, float]]:
+    """Total fee amounts of many snapshots at once ( Fees.fee_amounts().total.amount of each item ),
+        without building the fee amounts of each position.
+
+    Args:
+        data (list[FeesData]):
+        protocol (Protocol):
+        chain (Chain):
+
+    Returns:
+        list[tuple[float, float]]: token0 and token1 total fees of each data item
+    """
+    fees_x128, valid = _position_fees_batch(data)
+
+    results = []
+    for i, item in enumerate(data):
+        if not valid[i]:
+            total = Fees(item, protocol, chain).fee_amounts().total.amount
+            results.append((total.value0, total.value1))
+            continue
+
+        # same operations as UncollectedFees totals
+        total0_x128 = (
+            fees_x128[(PositionType.BASE, 0)][i]
+            + item.base_position.tokens_owed.value0.raw
+            + fees_x128[(PositionType.LIMIT, 0)][i]
+            + item.limit_position.tokens_owed.value0.raw
+        )
+        total1_x128 = (
+            fees_x128[(PositionType.BASE, 1)][i]
+            + item.base_position.tokens_owed.value1.raw
+            + fees_x128[(PositionType.LIMIT, 1)][i]
+            + item.limit_position.tokens_owed.value1.raw
+        )
+        results.append(
+            (
+                total0_x128 / 10**item.decimals.value0 / X128,
+                total1_x128 / 10**item.decimals.value1 / X128,
+            )
+        )
+
+    return results
+
+
 async def fees_all(
     protocol: Protocol,
     chain: Chain,
@@ -121,10 +298,10 @@ async def fees_all(
     await fees_data.get_data(hypervisors)
 
     results = {}
-    for hypervisor_id, fees_data in fees_data.data.items():
-        fees = Fees(fees_data, protocol, chain)
-        fee_amounts = fees.fee_amounts()
-
+    for (hypervisor_id, fees_data), fee_amounts in zip(
+        fees_data.data.items(),
+        fee_amounts_batch(list(fees_data.data.values()), protocol, chain),
+    ):
         results[hypervisor_id] = {
             "symbol": fees_data.symbol,
             "baseFees0": fee_amounts.base.fees.amount.value0,
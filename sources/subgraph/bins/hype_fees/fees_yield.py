@@ -1,3 +1,4 @@
+import asyncio
 import logging
 
 import numpy as np
@@ -6,7 +7,7 @@ from pandas import DataFrame
 from sources.subgraph.bins.constants import DAY_SECONDS, YEAR_SECONDS
 from sources.subgraph.bins.enums import Chain, Protocol, YieldType
 from sources.subgraph.bins.hype_fees.data import FeeGrowthSnapshotData
-from sources.subgraph.bins.hype_fees.fees import Fees
+from sources.subgraph.bins.hype_fees.fees import Fees, total_fee_amounts_batch
 from sources.subgraph.bins.hype_fees.schema import FeesData, FeesSnapshot, FeeYield
 
 logger = logging.getLogger(__name__)
@@ -113,19 +114,178 @@ class FeesYield:
 
     def get_fees(self, fees_data: FeesData) -> FeesSnapshot:
         """Get fee amounts given fees data."""
-        fees = Fees(fees_data, self.protocol, self.chain)
-        fee_amounts = fees.fee_amounts()
-
-        return FeesSnapshot(
-            block=fees_data.block,
-            timestamp=fees_data.timestamp,
-            fee=fees_data.fee,
-            tvl_usd=fees_data.tvl_usd,
-            total_fees_0=fee_amounts.total.amount.value0,
-            total_fees_1=fee_amounts.total.amount.value1,
-            price_0=fees_data.price.value0,
-            price_1=fees_data.price.value1,
-        )
+        return fees_snapshot(fees_data, self.protocol, self.chain)
+
+
+class FeesYieldBatch:
+    """Calculations for fee related yields of multiple hypervisors at once.
+
+    Snapshots of every hypervisor are stacked in one set of arrays sorted by
+    hypervisor ( segment ) and block, so each step of FeesYield.calculate_returns
+    is one NumPy operation for all hypervisors.
+    """
+
+    def __init__(
+        self, data: dict[str, list[FeesData]], protocol: Protocol, chain: Chain
+    ) -> None:
+        self.protocol = protocol
+        self.chain = chain
+        self.hypervisors = list(data.keys())
+
+        entries = [entry for fees_data in data.values() for entry in fees_data]
+        segments = [
+            segment
+            for segment, fees_data in enumerate(data.values())
+            for _ in fees_data
+        ]
+
+        rows = [
+            (
+                entry.block,
+                entry.timestamp,
+                entry.fee,
+                entry.tvl_usd,
+                total_fees_0,
+                total_fees_1,
+                entry.price.value0,
+                entry.price.value1,
+            )
+            for entry, (total_fees_0, total_fees_1) in zip(
+                entries, total_fee_amounts_batch(entries, protocol, chain)
+            )
+        ]
+
+        columns = np.array(rows, dtype=np.float64).reshape(-1, 8).T
+        segment = np.array(segments, dtype=np.int64)
+        order = np.lexsort((columns[0], segment))
+
+        self.segment = segment[order]
+        (
+            self.block,
+            self.timestamp,
+            self.fee,
+            self.tvl_usd,
+            self.total_fees_0,
+            self.total_fees_1,
+            self.price_0,
+            self.price_1,
+        ) = columns[:, order]
+
+        # rows of each hypervisor
+        self.counts = np.bincount(self.segment, minlength=len(self.hypervisors))
+
+    def calculate_returns(
+        self, yield_type: YieldType = YieldType.LP
+    ) -> dict[str, FeeYield]:
+        """Calculate APR and APY of every hypervisor."""
+        n_segments = len(self.hypervisors)
+
+        # Apply gamma fees to total fees if calculating LP returns
+        if yield_type == YieldType.LP:
+            # fee % is 1 / fee or 1/10 if fee > 100
+            with np.errstate(divide="ignore"):
+                gamma_fee_rate = np.where(self.fee < 100, 1 / self.fee, 1 / 10)
+            effective_fees_0 = self.total_fees_0 * (1 - gamma_fee_rate)
+            effective_fees_1 = self.total_fees_1 * (1 - gamma_fee_rate)
+        else:
+            effective_fees_0 = self.total_fees_0
+            effective_fees_1 = self.total_fees_1
+
+        # differences with the previous row of the same hypervisor
+        first_row = np.ones(len(self.segment), dtype=bool)
+        first_row[1:] = self.segment[1:] != self.segment[:-1]
+
+        def _diff(values: np.ndarray) -> np.ndarray:
+            result = np.empty_like(values)
+            result[1:] = values[1:] - values[:-1]
+            result[first_row] = np.nan
+            return result
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            elapsed_time = _diff(self.timestamp)
+            fee0_growth = np.clip(_diff(effective_fees_0), 0, None)
+            fee1_growth = np.clip(_diff(effective_fees_1), 0, None)
+
+            fee_growth_usd = fee0_growth * self.price_0 + fee1_growth * self.price_1
+            period_yield = fee_growth_usd / self.tvl_usd
+            yield_per_day = period_yield * YEAR_SECONDS / elapsed_time
+
+        has_outlier = np.zeros(n_segments, dtype=bool)
+        has_outlier[np.unique(self.segment[yield_per_day > YIELD_PER_DAY_MAX])] = True
+
+        # good rows of each hypervisor
+        good = yield_per_day < YIELD_PER_DAY_MAX
+        good_segment = self.segment[good]
+        good_counts = np.bincount(good_segment, minlength=n_segments)
+        starts = np.flatnonzero(np.r_[True, good_segment[1:] != good_segment[:-1]])
+
+        total_period_seconds = np.zeros(n_segments, dtype=np.float64)
+        cum_fee_return = np.zeros(n_segments, dtype=np.float64)
+        if len(good_segment):
+            with_data = good_segment[starts]
+            total_period_seconds[with_data] = np.add.reduceat(
+                elapsed_time[good], starts
+            )
+            cum_fee_return[with_data] = (
+                np.multiply.reduceat(1 + period_yield[good], starts) - 1
+            )
+
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            # Extrapolate linearly to annual rate
+            fee_apr = cum_fee_return * (YEAR_SECONDS / total_period_seconds)
+            # Extrapolate by compounding
+            fee_apy = (
+                1 + cum_fee_return * (DAY_SECONDS / total_period_seconds)
+            ) ** 365 - 1
+
+        fee_apr = np.maximum(np.nan_to_num(fee_apr, nan=0, posinf=0, neginf=0), 0)
+        fee_apy = np.maximum(np.nan_to_num(fee_apy, nan=0, posinf=0, neginf=0), 0)
+
+        results = {}
+        for segment, hypervisor_id in enumerate(self.hypervisors):
+            #  Require at least two rows to calculate yield
+            if self.counts[segment] < 2:
+                logger.info("No hypervisor data - skipping calculations")
+                results[hypervisor_id] = FeeYield(
+                    apr=0,
+                    apy=0,
+                    status="Insufficient Data",
+                )
+            # This is a failsafe for if there are outliers
+            elif good_counts[segment] == 0:
+                logger.debug("Empty returns")
+                results[hypervisor_id] = FeeYield(
+                    apr=0,
+                    apy=0,
+                    status="Insufficient good data",
+                )
+            else:
+                results[hypervisor_id] = FeeYield(
+                    apr=fee_apr[segment],
+                    apy=fee_apy[segment],
+                    status="Outlier removed" if has_outlier[segment] else "Good",
+                )
+
+        return results
+
+
+def fees_snapshot(
+    fees_data: FeesData, protocol: Protocol, chain: Chain
+) -> FeesSnapshot:
+    """Get fee amounts given fees data."""
+    fees = Fees(fees_data, protocol, chain)
+    fee_amounts = fees.fee_amounts()
+
+    return FeesSnapshot(
+        block=fees_data.block,
+        timestamp=fees_data.timestamp,
+        fee=fees_data.fee,
+        tvl_usd=fees_data.tvl_usd,
+        total_fees_0=fee_amounts.total.amount.value0,
+        total_fees_1=fee_amounts.total.amount.value1,
+        price_0=fees_data.price.value0,
+        price_1=fees_data.price.value1,
+    )
 
 
 async def fee_returns_all(
@@ -137,29 +297,99 @@ async def fee_returns_all(
     return_total: bool = False,
 ) -> dict[str, dict]:
     """Get fee returns for multiple hypervisors."""
-    fees_data = FeeGrowthSnapshotData(protocol, chain)
-    await fees_data.init_time(days_ago=days, end_timestamp=current_timestamp)
-    await fees_data.get_data(hypervisors)
+    return (
+        await fee_returns_windows(
+            protocol=protocol,
+            chain=chain,
+            windows=[days],
+            hypervisors=hypervisors,
+            current_timestamp=current_timestamp,
+            return_total=return_total,
+        )
+    )[days]
 
-    results = {"lp": {}, "total": {}}
-    for hypervisor_id, fees_data in fees_data.data.items():
-        fees_yield = FeesYield(fees_data, protocol, chain)
-        lp_returns = fees_yield.calculate_returns(yield_type=YieldType.LP)
-
-        results["lp"][hypervisor_id] = {
-            "symbol": fees_data[0].symbol,
-            "feeApr": lp_returns.apr,
-            "feeApy": lp_returns.apy,
-            "status": lp_returns.status,
+
+async def fee_returns_windows(
+    protocol: Protocol,
+    chain: Chain,
+    windows: list[int],
+    hypervisors: list[str] | None = None,
+    current_timestamp: int | None = None,
+    return_total: bool = False,
+    return_exceptions: bool = False,
+) -> dict[int, dict[str, dict]]:
+    """Get fee returns for multiple hypervisors and windows ending at the same time,
+    from one query ( snapshots of the widest window are sliced for the rest )
+
+    Args:
+        windows (list[int]): window lengths in days
+        return_exceptions (bool, optional): when the combined query fails, query each
+            window separately and return its exception instead of raising it. Defaults to False.
+
+    Returns:
+        dict[int, dict[str, dict]]: { <days>: {"lp": {...}, "total": {...}} }
+    """
+    try:
+        fees_data = FeeGrowthSnapshotData(protocol, chain)
+        await fees_data.init_time(days_ago=windows, end_timestamp=current_timestamp)
+        await fees_data.get_data(hypervisors)
+    except Exception as e:
+        if len(set(windows)) < 2:
+            raise
+        # a window may not be available ( subgraph data starting after its initial block )
+        logger.debug(
+            f" Combined {chain} {protocol} fee returns query failed, querying each window. err: {e}"
+        )
+        results = await asyncio.gather(
+            *[
+                fee_returns_windows(
+                    protocol=protocol,
+                    chain=chain,
+                    windows=[days],
+                    hypervisors=hypervisors,
+                    current_timestamp=current_timestamp,
+                    return_total=return_total,
+                )
+                for days in windows
+            ],
+            return_exceptions=return_exceptions,
+        )
+        return {
+            days: result if isinstance(result, Exception) else result[days]
+            for days, result in zip(windows, results)
         }
 
-        if return_total:
-            total_returns = fees_yield.calculate_returns(yield_type=YieldType.TOTAL)
-            results["total"][hypervisor_id] = {
-                "symbol": fees_data[0].symbol,
-                "feeApr": total_returns.apr,
-                "feeApy": total_returns.apy,
-                "status": total_returns.status,
+    return {
+        days: _fee_returns(
+            data=window_data,
+            protocol=protocol,
+            chain=chain,
+            return_total=return_total,
+        )
+        for days, window_data in fees_data.windows_data.items()
+    }
+
+
+def _fee_returns(
+    data: dict[str, list[FeesData]],
+    protocol: Protocol,
+    chain: Chain,
+    return_total: bool,
+) -> dict[str, dict]:
+    """Fee returns of the hypervisors of a window"""
+    fees_yield = FeesYieldBatch(data, protocol, chain)
+    yield_types = [YieldType.LP, YieldType.TOTAL] if return_total else [YieldType.LP]
+
+    results = {"lp": {}, "total": {}}
+    for yield_type in yield_types:
+        for hypervisor_id, returns in fees_yield.calculate_returns(
+            yield_type=yield_type
+        ).items():
+            results[yield_type.value][hypervisor_id] = {
+                "symbol": data[hypervisor_id][0].symbol,
+                "feeApr": returns.apr,
+                "feeApy": returns.apy,
+                "status": returns.status,
             }
 
     return results
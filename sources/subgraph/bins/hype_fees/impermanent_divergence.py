@@ -274,8 +274,17 @@ async def impermanent_divergence_all(
     await divergence_data.init_time(days_ago=days, end_timestamp=current_timestamp)
     await divergence_data.get_data(hypervisors)
 
+    return impermanent_divergence_from_data(
+        data=divergence_data.data, protocol=protocol, chain=chain
+    )
+
+
+def impermanent_divergence_from_data(
+    data: dict[str, FeesDataRange], protocol: Protocol, chain: Chain
+) -> dict:
+    """Impermanent divergence of hypervisors from their initial and latest data"""
     results = {}
-    for hypervisor_id, hypervisor in divergence_data.data.items():
+    for hypervisor_id, hypervisor in data.items():
         divergence = ImpermanentDivergence(hypervisor, protocol, chain)
         calculation = divergence.calculate()
         results[hypervisor_id] = {
@@ -43,7 +43,9 @@ class Pool:
             "timestampStart": timestamp_start,
             "paginate": "",
         }
-        data = await self.client.paginate_query(query, "id", variables)
+        data = []
+        async for page in self.client.paginate_query(query, "id", variables):
+            data += page
         return data
 
     async def hourly_prices(self, pools, hours):
@@ -1,7 +1,7 @@
 from dataclasses import dataclass, field
 
 
-@dataclass
+@dataclass(slots=True)
 class ValueWithDecimal:
     raw: int
     adjusted: float = field(init=False)
@@ -1,15 +1,24 @@
+import asyncio
 import logging
 from abc import ABC, abstractmethod
-from functools import wraps
+from functools import lru_cache, wraps
 from typing import Any
 
+import aiohttp
 from gql import Client as GqlClient
+from gql.client import AsyncClientSession
 from gql.dsl import DSLFragment, DSLQuery, DSLSchema, dsl_gql
 from gql.transport.aiohttp import AIOHTTPTransport, log as requests_logger
+from graphql import GraphQLSchema, build_ast_schema, parse
 
-from sources.subgraph.bins.config import GQL_CLIENT_TIMEOUT
+from sources.subgraph.bins.config import (
+    GQL_CLIENT_TIMEOUT,
+    GQL_CLIENT_POOL_SIZE,
+    GQL_CLIENT_KEEPALIVE_TIMEOUT,
+)
 
 requests_logger.setLevel(logging.WARNING)
+logger = logging.getLogger(__name__)
 
 
 def fragment(fragment_function):
@@ -30,37 +39,117 @@ def fragment(fragment_function):
     return wrapper
 
 
+@lru_cache(maxsize=None)
+def load_schema(schema_path: str) -> GraphQLSchema:
+    """Read and parse a graphql schema file ( once per process )"""
+    with open(schema_path, encoding="utf-8") as schema_file:
+        return build_ast_schema(parse(schema_file.read()))
+
+
+@lru_cache(maxsize=None)
+def load_dsl_schema(schema_path: str) -> DSLSchema:
+    """DSL schema of a graphql schema file ( once per process )"""
+    return DSLSchema(load_schema(schema_path))
+
+
 class AsyncGqlClient(GqlClient):
-    """Subclass of gql Client that defaults to AIOHTTPTransport"""
+    """Subclass of gql Client that defaults to AIOHTTPTransport
+    using a keep-alive, size bounded connection pool
+    """
 
-    def __init__(self, url: str, schema, execute_timeout: int) -> None:
+    def __init__(
+        self,
+        url: str,
+        schema,
+        execute_timeout: int,
+        pool_size: int = GQL_CLIENT_POOL_SIZE,
+    ) -> None:
         self.url = url
         super().__init__(
             schema=schema,
-            transport=AIOHTTPTransport(url=url),
+            transport=AIOHTTPTransport(
+                url=url,
+                client_session_args={
+                    "connector": aiohttp.TCPConnector(
+                        limit=pool_size,
+                        keepalive_timeout=GQL_CLIENT_KEEPALIVE_TIMEOUT,
+                    )
+                },
+            ),
             execute_timeout=execute_timeout,
         )
 
 
+class GqlSessionRegistry:
+    """Process-wide registry of connected gql sessions, one per subgraph kind and url
+    ( url identifies protocol and chain ).
+    Sessions are bound to the event loop that created them, so the registry
+    starts over when it is used from a different loop.
+    """
+
+    def __init__(self) -> None:
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock: asyncio.Lock | None = None
+        self._clients: dict[tuple[str, str], AsyncGqlClient] = {}
+        self._sessions: dict[tuple[str, str], AsyncClientSession] = {}
+
+    def _check_loop(self):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._lock = asyncio.Lock()
+            self._clients = {}
+            self._sessions = {}
+
+    async def get_session(self, url: str, schema_path: str) -> AsyncClientSession:
+        """Return the long lived session for url, connecting it on first use"""
+        self._check_loop()
+        key = (schema_path, url)
+        if session := self._sessions.get(key):
+            return session
+
+        async with self._lock:
+            if key not in self._sessions:
+                client = AsyncGqlClient(
+                    url=url,
+                    schema=load_schema(schema_path),
+                    execute_timeout=GQL_CLIENT_TIMEOUT,
+                )
+                self._sessions[key] = await client.connect_async()
+                self._clients[key] = client
+            return self._sessions[key]
+
+    async def close(self):
+        """Close all sessions of the current event loop"""
+        for key, client in self._clients.items():
+            try:
+                await client.close_async()
+            except Exception as e:
+                logger.warning(f" Error closing gql client for {key[1]}  err:{e}")
+        self._clients = {}
+        self._sessions = {}
+
+
+GQL_SESSIONS = GqlSessionRegistry()
+
+
 class SubgraphClient:
     """Subgraph base client to manage query execution and shared fragments"""
 
     def __init__(self, url: str, schema_path: str) -> None:
-        with open(schema_path, encoding="utf-8") as schema_file:
-            schema = schema_file.read()
-        self.client = AsyncGqlClient(
-            url=url, schema=schema, execute_timeout=GQL_CLIENT_TIMEOUT
-        )
-        self.data_schema = DSLSchema(self.client.schema)
+        self.url = url
+        self.schema_path = schema_path
+        self.data_schema = load_dsl_schema(schema_path)
         self._fragment_dependencies: list[DSLFragment] = []
         self._fragments_used: list[str] = []
 
     async def execute(self, query: DSLQuery) -> dict:
         """Executes query and returns result"""
         gql = dsl_gql(*self._fragment_dependencies, query)
-        async with self.client as session:
-            result = await session.execute(gql)
-            return result
+        session = await GQL_SESSIONS.get_session(
+            url=self.url, schema_path=self.schema_path
+        )
+        return await session.execute(gql)
 
     @fragment
     def meta_fields_fragment(self) -> DSLFragment:
@@ -2,6 +2,7 @@ import asyncio
 from fastapi import Response, APIRouter, status
 from fastapi_cache.decorator import cache
 
+from endpoint.routers.coalesce import coalesce
 from endpoint.routers.template import (
     router_builder_generalTemplate,
     router_builder_baseTemplate,
@@ -337,6 +338,7 @@ class subgraph_router_builder(router_builder_generalTemplate):
         )
 
     @cache(expire=APY_CACHE_TIMEOUT)
+    @coalesce()
     async def hypervisor_returns(self, hypervisor_address: str, response: Response):
         hypervisor_returns = hypervisor.HypervisorsReturnsAllPeriods(
             protocol=self.dex,
@@ -347,6 +349,7 @@ class subgraph_router_builder(router_builder_generalTemplate):
         return await hypervisor_returns.run(RUN_FIRST)
 
     @cache(expire=DB_CACHE_TIMEOUT)
+    @coalesce()
     async def hypervisor_average_returns(
         self, hypervisor_address: str, response: Response
     ):
@@ -369,6 +372,7 @@ class subgraph_router_builder(router_builder_generalTemplate):
 
     #    hypervisor analytics
     @cache(expire=APY_CACHE_TIMEOUT)
+    @coalesce()
     async def hypervisor_analytics_basic_daily(
         self, hypervisor_address: str, response: Response
     ):
@@ -377,6 +381,7 @@ class subgraph_router_builder(router_builder_generalTemplate):
         )
 
     @cache(expire=APY_CACHE_TIMEOUT)
+    @coalesce()
     async def hypervisor_analytics_basic_weekly(
         self, hypervisor_address: str, response: Response
     ):
@@ -385,6 +390,7 @@ class subgraph_router_builder(router_builder_generalTemplate):
         )
 
     @cache(expire=APY_CACHE_TIMEOUT)
+    @coalesce()
     async def hypervisor_analytics_basic_biweekly(
         self, hypervisor_address: str, response: Response
     ):
@@ -393,6 +399,7 @@ class subgraph_router_builder(router_builder_generalTemplate):
         )
 
     @cache(expire=APY_CACHE_TIMEOUT)
+    @coalesce()
     async def hypervisor_analytics_basic_monthly(
         self, hypervisor_address: str, response: Response
     ):
@@ -413,6 +420,7 @@ class subgraph_router_builder(router_builder_generalTemplate):
         )
 
     @cache(expire=APY_CACHE_TIMEOUT)
+    @coalesce()
     async def hypervisors_returns(self, response: Response, apr_type: str = "net"):
         """fee's Apr and Apy
 
@@ -433,12 +441,14 @@ class subgraph_router_builder(router_builder_generalTemplate):
         return await hypervisor_returns.run(RUN_FIRST)
 
     @cache(expire=DB_CACHE_TIMEOUT)
+    @coalesce()
     async def hypervisors_average_returns(self, response: Response):
         return await hypervisor.hypervisors_average_return(
             protocol=self.dex, chain=self.chain, response=response
         )
 
     @cache(expire=ALLDATA_CACHE_TIMEOUT)
+    @coalesce()
     async def hypervisors_all_data(self, response: Response):
         all_data = hypervisor.AllData(
             protocol=self.dex, chain=self.chain, response=response
@@ -477,6 +487,7 @@ class subgraph_router_builder(router_builder_generalTemplate):
         )
 
     @cache(expire=APY_CACHE_TIMEOUT)
+    @coalesce()
     async def hypervisors_feeReturns_daily(self, response: Response):
         fee_returns = hypervisor.FeeReturns(
             protocol=self.dex, chain=self.chain, days=1, response=response
@@ -484,6 +495,7 @@ class subgraph_router_builder(router_builder_generalTemplate):
         return await fee_returns.run(RUN_FIRST)
 
     @cache(expire=APY_CACHE_TIMEOUT)
+    @coalesce()
     async def hypervisors_feeReturns_weekly(self, response: Response):
         fee_returns = hypervisor.FeeReturns(
             protocol=self.dex, chain=self.chain, days=7, response=response
@@ -491,6 +503,7 @@ class subgraph_router_builder(router_builder_generalTemplate):
         return await fee_returns.run(RUN_FIRST)
 
     @cache(expire=APY_CACHE_TIMEOUT)
+    @coalesce()
     async def hypervisors_feeReturns_monthly(self, response: Response):
         fee_returns = hypervisor.FeeReturns(
             protocol=self.dex, chain=self.chain, days=30, response=response
@@ -498,6 +511,7 @@ class subgraph_router_builder(router_builder_generalTemplate):
         return await fee_returns.run(RUN_FIRST)
 
     @cache(expire=APY_CACHE_TIMEOUT)
+    @coalesce()
     async def hypervisors_impermanentDivergence_daily(self, response: Response):
         impermanent = hypervisor.ImpermanentDivergence(
             protocol=self.dex, chain=self.chain, days=1, response=response
@@ -505,6 +519,7 @@ class subgraph_router_builder(router_builder_generalTemplate):
         return await impermanent.run(first=RUN_FIRST)
 
     @cache(expire=APY_CACHE_TIMEOUT)
+    @coalesce()
     async def hypervisors_impermanentDivergence_weekly(self, response: Response):
         impermanent = hypervisor.ImpermanentDivergence(
             protocol=self.dex, chain=self.chain, days=7, response=response
@@ -512,6 +527,7 @@ class subgraph_router_builder(router_builder_generalTemplate):
         return await impermanent.run(first=RUN_FIRST)
 
     @cache(expire=APY_CACHE_TIMEOUT)
+    @coalesce()
     async def hypervisors_impermanentDivergence_monthly(self, response: Response):
         impermanent = hypervisor.ImpermanentDivergence(
             protocol=self.dex, chain=self.chain, days=30, response=response
@@ -602,6 +618,7 @@ class subgraph_router_builder_compatible(subgraph_router_builder):
         return await result.output()
 
     @cache(expire=DASHBOARD_CACHE_TIMEOUT)
+    @coalesce()
     async def dashboard(self, response: Response, period: str = "weekly"):
         result = Dashboard(period.lower())
 
@@ -710,6 +727,7 @@ class subgraph_router_builder_allDeployments(router_builder_baseTemplate):
         return await result.output()
 
     @cache(expire=DASHBOARD_CACHE_TIMEOUT)
+    @coalesce()
     async def dashboard(self, response: Response, period: str = "weekly"):
         result = Dashboard(period.lower())
 
@@ -797,6 +815,7 @@ class subgraph_router_builder_Charts(router_builder_baseTemplate):
 
     # Charts
     @cache(expire=CHARTS_CACHE_TIMEOUT)
+    @coalesce()
     async def daily_tvl_chart_data(days: int = 24):
         daily = DailyChart(days)
         return {"data": await daily.tvl()}
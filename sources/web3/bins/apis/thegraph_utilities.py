@@ -1,16 +1,37 @@
+import asyncio
+import concurrent.futures
 import sys
 
 import datetime as dt
 import logging
-import time
+import re
+from typing import AsyncIterator, Coroutine
+
+import aiohttp
 
 from sources.web3.bins.general import net_utilities
 from sources.web3.bins.cache import cache_utilities
+from sources.web3.bins.configuration import CONFIGURATION
 
 
 RATE_LIMIT_THEGRAPH = net_utilities.rate_limit(
     rate_max_sec=4
 )  # thegraph global rate limiter
+RATE_BUDGET_THEGRAPH = net_utilities.async_rate_limit(
+    rate_max_sec=CONFIGURATION["WEB3_THEGRAPH_RATE_MAX_SEC"]
+)  # thegraph global rate budget of async queries ( shared by all shards )
+
+
+def run_async(coroutine: Coroutine):
+    """Run a coroutine to completion from sync code, even when called from a running event loop"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    # called from a running event loop: do not block it with a nested loop
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
 
 
 ## GLOBAL ##
@@ -56,12 +77,11 @@ class thegraph_scraper_helper:
             orderby:str= "timestamp"
             orderDirection:str= "asc" or "desc"
             block:str = "number: { 15432282 } "
+            shards:int = id keyspace shards queried in parallel. Defaults to WEB3_THEGRAPH_SHARDS configuration
+                        ( 1 when where selects a single id ).
 
         """
         result = None
-        _skip = kwargs.get("skip", 0)
-        _url = self._url_constructor(network, query_name)
-        _filter = self._filter_constructor(**kwargs)
 
         # check cache, if enabled
         if self._CACHE is not None:
@@ -71,84 +91,17 @@ class thegraph_scraper_helper:
 
         if result is None:
             # get  data from thegraph
-            result = []
-
-            # loop till no more results are retrieved
-            while True:
-                try:
-                    # wait till sufficient time has been passed between queries
-                    RATE_LIMIT_THEGRAPH.continue_when_safe()
-
-                    _query, path_to_data = self._query_constructor(
-                        skip=_skip, name=query_name, filter=_filter
-                    )
-                    _data = net_utilities.post_request(
-                        url=_url,
-                        query=_query,
-                        retry=0,
-                        max_retry=2,
-                        wait_secs=5,
-                        timeout_secs=self.timeout_secs,
-                    )
-
-                    # add it to result
-                    try:
-                        _data = _data[path_to_data[0]]
-
-                        for i in range(1, len(path_to_data)):
-                            _data = _data[path_to_data[i]]
-                    except KeyError as err:
-                        if (
-                            "errors" in err.args
-                            and "message" in err.args["errors"]
-                            and (
-                                err.args["errors"]["message"]
-                                .lower()
-                                .contains("database unavailable")
-                            )
-                        ):
-                            # connection error: wait and loop again
-                            logging.getLogger(__name__).error(
-                                f" Seems like subgraph isnt available temporarily. Retrying in 5sec.  .error: {sys.exc_info()[0]}"
-                            )
-
-                            time.sleep(5)
-                            continue
-
-                        logging.getLogger(__name__).error(
-                            f" Unexpected error retrieving data path  query name:{query_name}   data:{_data}       .error: {sys.exc_info()[0]}"
-                        )
-
-                    except Exception:
-                        logging.getLogger(__name__).error(
-                            f" Unexpected error retrieving data path  query name:{query_name}   data:{_data}       .error: {sys.exc_info()[0]}"
-                        )
-
-                    if not _data:
-                        # exit loop
-                        break
-
-                    # modify pagination var
-                    _skip += len(_data)
-                    # add to result
-                    result.extend(_data)
-                    # check if we are done
-                    if len(_data) < 1000:
-                        # qtty is less than window ("first" var at query)
-                        break  # exit loop
-                except Exception:
-                    logging.getLogger(__name__).exception(
-                        f"Unexpected error while retrieving query {query_name}      .error: {sys.exc_info()[0]}"
+            try:
+                result = run_async(
+                    self._collect_results(
+                        network=network, query_name=query_name, **kwargs
                     )
-
-                    break  # exit loop
-
-            # return empty list if result contains error
-            if "errors" in result:
-                logging.getLogger(__name__).warning(
-                    f"Errors found in thegraph query result--> network:{network}  query:{query_name}  result:{sys.exc_info()[0]}   . Empty list is returned. "
                 )
-
+            except Exception:
+                logging.getLogger(__name__).exception(
+                    f"Unexpected error while retrieving query {query_name}      .error: {sys.exc_info()[0]}"
+                )
+                # return empty list if result contains error
                 return []
 
             # save it to cache, if enabled
@@ -169,9 +122,317 @@ class thegraph_scraper_helper:
             for itm in result:
                 self._converter(itm, query_name, network)
 
+        # pages are retrieved by id: sort as requested
+        if (orderby := kwargs.get("orderby", "").strip()) and orderby != "id":
+            result.sort(
+                key=lambda x: self._order_value(x.get(orderby)),
+                reverse=kwargs.get("orderDirection", "").strip() == "desc",
+            )
+
         # return
         return result
 
+    async def iterate_results(
+        self, network: str, query_name: str, **kwargs
+    ) -> AsyncIterator[list]:
+        """Stream query results page by page ( max 1000 items each ) without building the full result list.
+            Pages are paginated by id cursor ( id_gt ) and come in no particular order when using multiple shards.
+            ( results are not cached )
+
+        Args:
+            network (str): "ethereum"
+            query_name (str): "uniswapV3Deposits"
+
+        kwargs=
+            where:str = " hypervisor: "0x0000000000" "
+            block:str = "number: 15432282 "
+            shards:int = id keyspace shards queried in parallel. Defaults to WEB3_THEGRAPH_SHARDS configuration
+                        ( 1 when where selects a single id ).
+
+        Yields:
+            list: converted items page
+        """
+        async for page in self._iterate_raw_results(
+            network=network, query_name=query_name, **kwargs
+        ):
+            if self._CONVERT:
+                for itm in page:
+                    self._converter(itm, query_name, network)
+            yield page
+
+    async def _collect_results(self, network: str, query_name: str, **kwargs) -> list:
+        result = []
+        async for page in self._iterate_raw_results(
+            network=network, query_name=query_name, **kwargs
+        ):
+            result.extend(page)
+        return result
+
+    async def _iterate_raw_results(
+        self, network: str, query_name: str, **kwargs
+    ) -> AsyncIterator[list]:
+        """Query all shards in parallel and yield their raw pages as they arrive
+        ( shards wait when the caller does not consume pages )
+        """
+        if "skip" in kwargs:
+            # legacy skip pagination ( nested lists )
+            shards = [(None, None)]
+        elif "shards" not in kwargs and self._is_single_id(kwargs.get("where", "")):
+            # one entity: no keyspace to split
+            shards = [(None, None)]
+        else:
+            shards = self._id_shards(
+                kwargs.get("shards") or CONFIGURATION["WEB3_THEGRAPH_SHARDS"]
+            )
+
+        queue = asyncio.Queue(maxsize=len(shards) * 2)
+        async with aiohttp.ClientSession() as session:
+            workers = [
+                asyncio.create_task(
+                    self._query_shard(
+                        session=session,
+                        queue=queue,
+                        network=network,
+                        query_name=query_name,
+                        lower=lower,
+                        upper=upper,
+                        **kwargs,
+                    )
+                )
+                for lower, upper in shards
+            ]
+            try:
+                finished = 0
+                while finished < len(workers):
+                    page = await queue.get()
+                    if page is None:
+                        finished += 1
+                    elif isinstance(page, Exception):
+                        raise page
+                    else:
+                        yield page
+            finally:
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+
+    async def _query_shard(
+        self,
+        session: aiohttp.ClientSession,
+        queue: asyncio.Queue,
+        network: str,
+        query_name: str,
+        lower: str | None,
+        upper: str | None,
+        **kwargs,
+    ):
+        """Put all pages of an id range in the queue, followed by None ( or the exception raised )
+
+        Args:
+            lower (str | None): first id ( inclusive )
+            upper (str | None): last id ( exclusive )
+        """
+        try:
+            _url = self._url_constructor(network, query_name)
+            _skip = kwargs.get("skip", 0)
+            # cursor pagination needs items sorted by id
+            _cursor_mode = "skip" not in kwargs
+            _order = (
+                {"orderby": "id", "orderDirection": "asc"}
+                if _cursor_mode
+                else {
+                    "orderby": kwargs.get("orderby", ""),
+                    "orderDirection": kwargs.get("orderDirection", ""),
+                }
+            )
+            _cursor = None
+
+            # loop till no more results are retrieved
+            while True:
+                _where = [kwargs.get("where", "").strip()]
+                if _cursor is not None:
+                    _where.append(f'id_gt: "{_cursor}"')
+                elif lower is not None:
+                    _where.append(f'id_gte: "{lower}"')
+                if upper is not None:
+                    _where.append(f'id_lt: "{upper}"')
+
+                _query, path_to_data = self._query_constructor(
+                    skip=_skip,
+                    name=query_name,
+                    filter=self._filter_constructor(
+                        where=", ".join([x for x in _where if x]),
+                        block=kwargs.get("block", ""),
+                        **_order,
+                    ),
+                )
+                _data = await self._post_query(
+                    session=session, url=_url, query=_query
+                )
+
+                # follow path to data
+                for key in path_to_data:
+                    _data = _data[key]
+
+                if not _data:
+                    # exit loop
+                    break
+
+                await queue.put(_data)
+
+                # check if we are done
+                if len(_data) < 1000:
+                    # qtty is less than window ("first" var at query)
+                    break  # exit loop
+
+                # modify pagination var
+                if _cursor_mode and "id" in _data[-1]:
+                    _cursor = _data[-1]["id"]
+                else:
+                    # items without id: paginate using skip
+                    _skip += len(_data)
+
+            await queue.put(None)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await queue.put(e)
+
+    async def _post_query(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        query: str,
+        max_retry: int = 2,
+        wait_secs: int = 5,
+    ) -> dict:
+        """Post a query within the thegraph rate budget, retrying on connection errors and unavailable subgraphs
+
+        Returns:
+            dict: query response
+        """
+        for retry in range(max_retry + 1):
+            # wait till there is budget for another query
+            await RATE_BUDGET_THEGRAPH.continue_when_safe()
+            try:
+                async with session.post(
+                    url=url,
+                    json={"query": query},
+                    timeout=aiohttp.ClientTimeout(total=self.timeout_secs),
+                ) as response:
+                    _data = await response.json(content_type=None)
+
+                if "errors" not in _data:
+                    return _data
+                if "database unavailable" not in str(_data["errors"]).lower():
+                    raise ValueError(f"thegraph query errors: {_data['errors']}")
+                # connection error: wait and loop again
+                logging.getLogger(__name__).error(
+                    f" Seems like subgraph isnt available temporarily. Retrying in {wait_secs}sec."
+                )
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logging.getLogger(__name__).warning(
+                    f"Connection to {url} failed ( {e.__class__.__name__} )..."
+                )
+
+            if retry < max_retry:
+                logging.getLogger(__name__).warning(
+                    f"    Waiting {wait_secs} seconds to retry {url} query for the {retry} time."
+                )
+                await asyncio.sleep(wait_secs)
+
+        raise ConnectionError(
+            f"thegraph query failed after {max_retry} retries at {url}"
+        )
+
+    @staticmethod
+    def _is_single_id(where: str) -> bool:
+        """where filters by id equality ( id: "0x..." )"""
+        return re.search(r"(^|[\s,{])id\s*:", where) is not None
+
+    @staticmethod
+    def _id_shards(shards: int) -> list[tuple[str | None, str | None]]:
+        """Split the id keyspace in ranges using the two hex characters following "0x"
+            ( ids not starting with 0x fall in the first or last range )
+
+        Returns:
+            list[tuple[str | None, str | None]]: [(<lower inclusive>, <upper exclusive>), ...]
+        """
+        shards = max(1, min(int(shards), 256))
+        bounds = [f"0x{x * 256 // shards:02x}" for x in range(1, shards)]
+        return list(zip([None] + bounds, bounds + [None]))
+
+    @staticmethod
+    def _order_value(value) -> tuple:
+        """sortable value of a thegraph field ( numbers received as strings are compared as numbers )"""
+        try:
+            return (0, float(value), "")
+        except (TypeError, ValueError):
+            return (1, 0, str(value))
+
+    def get_tokens_at_blocks(
+        self, network: str, tokens_by_block: dict[int, list[str]], max_aliases: int = 20
+    ) -> dict[int, list[dict]]:
+        """Query multiple tokens at multiple blocks using one aliased "tokens" query per max_aliases blocks
+            ( one alias per block:  b<block>: tokens(where: {id_in: [...]}, block: {number: <block>}) )
+
+        Args:
+            network (str):
+            tokens_by_block (dict[int, list[str]]): { <block>: [<token address>, ...] }  ( block 0 = current )
+            max_aliases (int, optional): blocks per query. Defaults to 20.
+
+        Returns:
+            dict[int, list[dict]]: { <block>: [<token data>, ...] }
+        """
+        result = {}
+        _url = self._url_constructor(network, "tokens")
+        blocks = list(tokens_by_block.keys())
+
+        for i in range(0, len(blocks), max_aliases):
+            # build aliased query
+            _aliases = []
+            for block in blocks[i : i + max_aliases]:
+                _ids = ", ".join(f'"{x}"' for x in tokens_by_block[block])
+                _query, _ = self._query_constructor(
+                    skip=0,
+                    name="tokens",
+                    filter=self._filter_constructor(
+                        where=f"id_in: [{_ids}]",
+                        block=f"number: {block}" if block else "",
+                    ),
+                )
+                # remove query braces and name the result by block
+                _aliases.append(
+                    _query.strip()[1:-1].replace("tokens(", f"b{block}: tokens(", 1)
+                )
+
+            # wait till sufficient time has been passed between queries
+            RATE_LIMIT_THEGRAPH.continue_when_safe()
+
+            _data = net_utilities.post_request(
+                url=_url,
+                query="{{ {} }}".format(" ".join(_aliases)),
+                retry=0,
+                max_retry=2,
+                wait_secs=5,
+                timeout_secs=self.timeout_secs,
+            )
+
+            if "errors" in _data or "data" not in _data:
+                logging.getLogger(__name__).warning(
+                    f"Errors found in thegraph aliased tokens query --> network:{network}  blocks:{blocks[i : i + max_aliases]}  result:{_data.get('errors', _data)}"
+                )
+                continue
+
+            for block in blocks[i : i + max_aliases]:
+                result[block] = _data["data"].get(f"b{block}") or []
+                # convert result
+                if self._CONVERT:
+                    for itm in result[block]:
+                        self._converter(itm, "tokens", network)
+
+        return result
+
     @property
     def networks(self) -> list[str]:
         """available networks
@@ -69,7 +69,7 @@ async def get_token_price_usd(token_address: str, network: str, block: int) -> f
     price_helper = price_scraper(cache=False)
 
     try:
-        price_token = price_helper.get_price(
+        price_token = await price_helper.get_price_async(
             network=network,
             token_id=token_address,
             block=block,
@@ -1,7 +1,9 @@
 import contextlib
+import json
 import sys
 import os
 import logging
+import sqlite3
 import threading
 
 from sources.web3.bins.general import file_utilities, net_utilities
@@ -13,6 +15,16 @@ CACHE_LOCK = threading.Lock()  ##threading.RLock
 
 
 class file_backend:
+    """Cache backed by a SQLite key-value file ( <folder_name>/<filename>.sqlite ).
+
+    Values are kept in memory as they are used and written to disk one row at a time
+    ( O(1) appends instead of rewriting the whole file ). Nothing is loaded at startup:
+    memory misses are looked up in the file. Legacy <filename>.json caches are imported once.
+    """
+
+    # WAL file is checkpointed ( truncated ) every COMPACT_EVERY writes
+    COMPACT_EVERY = 10000
+
     def __init__(self, filename: str, folder_name: str, reset: bool = False):
         """Cache class properties
 
@@ -26,10 +38,19 @@ class file_backend:
 
         self._cache = {}  # {  network_id: "<contract address>": value, ...}
 
+        # database connection ( opened on first use )
+        self._db: sqlite3.Connection | None = None
+        self._db_lock = threading.Lock()
+        self._db_writes = 0
+
         # init object
         self._pre_init_cache(reset)
         self._init_cache()
 
+    @property
+    def db_path(self) -> str:
+        return f"{self.folder_name or '.'}/{self.file_name}.sqlite"
+
     def _pre_init_cache(self, reset: bool):
         if self.folder_name != "":
             # check if folder exists
@@ -37,52 +58,146 @@ class file_backend:
                 # Create a new directory because it does not exist
                 os.makedirs(name=self.folder_name, exist_ok=True)
 
-            if reset:
-                # delete file
+        if reset:
+            # delete files
+            for path in [
+                f"{self.folder_name}/{self.file_name}.json",
+                self.db_path,
+                f"{self.db_path}-wal",
+                f"{self.db_path}-shm",
+            ]:
                 try:
-                    if os.path.isfile(f"{self.folder_name}/{self.file_name}.json"):
-                        os.remove(f"{self.folder_name}/{self.file_name}.json")
+                    if os.path.isfile(path):
+                        os.remove(path)
                 except Exception:
                     # error could not delete file
                     logging.getLogger("special").exception(
-                        f" Could not delete cache file:  {self.folder_name}/{self.file_name}.json     .error: {sys.exc_info()[0]}"
+                        f" Could not delete cache file:  {path}     .error: {sys.exc_info()[0]}"
                     )
 
         # init price cache
         self._cache = {}
 
-    def _load_cache_file(self, lock: bool = True) -> dict:
-        if lock:
-            with CACHE_LOCK:
-                temp_loaded_cache = file_utilities.load_json(
-                    filename=self.file_name, folder_path=self.folder_name
+    def _init_cache(self):
+        # data is loaded on demand
+        pass
+
+    # DATABASE
+    def _database(self) -> sqlite3.Connection:
+        """Open the cache file ( once ), importing the legacy json cache when the file is new"""
+        if self._db is None:
+            self._db = sqlite3.connect(
+                self.db_path, timeout=30, check_same_thread=False, isolation_level=None
+            )
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache (k1 TEXT, k2 TEXT, k3 TEXT, k4 TEXT, value TEXT, PRIMARY KEY (k1, k2, k3, k4)) WITHOUT ROWID"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)"
+            )
+            self._import_legacy_file()
+        return self._db
+
+    def _import_legacy_file(self):
+        """Import <filename>.json cache file ( only once )"""
+        if self._db.execute(
+            "SELECT 1 FROM meta WHERE name = 'json_imported'"
+        ).fetchone():
+            return
+
+        if loaded := file_utilities.load_json(
+            filename=self.file_name, folder_path=self.folder_name
+        ):
+            try:
+                with self._db:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?)",
+                        (
+                            (*self._db_keys(*keys), self._encode(value))
+                            for *keys, value in self._legacy_records(loaded)
+                        ),
+                    )
+            except Exception:
+                logging.getLogger(__name__).exception(
+                    f" Could not import legacy cache file {self.folder_name}/{self.file_name}.json     .error: {sys.exc_info()[0]}"
                 )
-        else:
-            temp_loaded_cache = file_utilities.load_json(
-                filename=self.file_name, folder_path=self.folder_name
+        self._db.execute(
+            "INSERT OR REPLACE INTO meta VALUES ('json_imported', '1')"
+        )
+
+    def _legacy_records(self, loaded: dict):
+        """Legacy json cache records:  (k1, k2, k3, k4, value)"""
+        return iter(())
+
+    @staticmethod
+    def _db_keys(*keys) -> tuple[str, str, str, str]:
+        return tuple(str(x) for x in (list(keys) + [""] * 4)[:4])
+
+    @staticmethod
+    def _encode(value) -> str:
+        return json.dumps(value, cls=file_utilities.CustomEncoder)
+
+    @staticmethod
+    def _decode(value: str):
+        return json.loads(value, cls=file_utilities.CustomDecoder)
+
+    def _db_get(self, *keys):
+        """Get a value from file
+
+        Returns:
+           Can return None if not found
+        """
+        try:
+            with self._db_lock:
+                row = (
+                    self._database()
+                    .execute(
+                        "SELECT value FROM cache WHERE k1 = ? AND k2 = ? AND k3 = ? AND k4 = ?",
+                        self._db_keys(*keys),
+                    )
+                    .fetchone()
+                )
+        except sqlite3.Error:
+            logging.getLogger(__name__).exception(
+                f" Could not read from cache file {self.db_path}     .error: {sys.exc_info()[0]}"
             )
-        return temp_loaded_cache
+            return None
+        return self._decode(row[0]) if row else None
 
-    def _save_tofile(self, lock: bool = True):
-        if lock:
-            with CACHE_LOCK:
-                # save file
-                file_utilities.save_json(
-                    filename=self.file_name,
-                    data=self._cache,
-                    folder_path=self.folder_name,
+    def _db_set(self, value, *keys) -> bool:
+        """Save a value to file
+
+        Returns:
+           bool: success or fail
+        """
+        try:
+            with self._db_lock:
+                self._database().execute(
+                    "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?)",
+                    (*self._db_keys(*keys), self._encode(value)),
                 )
-        else:
-            # save file
-            file_utilities.save_json(
-                filename=self.file_name, data=self._cache, folder_path=self.folder_name
+                self._db_writes += 1
+                if self._db_writes % self.COMPACT_EVERY == 0:
+                    self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except sqlite3.Error:
+            logging.getLogger(__name__).exception(
+                f" Could not save to cache file {self.db_path}     .error: {sys.exc_info()[0]}"
             )
+            return False
+        return True
 
-    def _init_cache(self):
-        # place some loading logic
-        #  _cache = _load_cache_file()
-        # ...
-        pass
+    def compact(self, vacuum: bool = False):
+        """Checkpoint the file's write ahead log and optionally rebuild the file
+
+        Args:
+            vacuum (bool, optional): rebuild the file to reclaim free space. Defaults to False.
+        """
+        with self._db_lock:
+            self._database().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            if vacuum:
+                self._db.execute("VACUUM")
 
     # PUBLIC
     def add_data(self, data, **kwargs) -> bool:
@@ -152,34 +267,17 @@ class database_backend:
 
 
 class standard_property_cache(file_backend):
-    def _init_cache(self):
-        temp_loaded_cache = self._load_cache_file()
-        _loaded = 0
-        if temp_loaded_cache != None:
-            for chainId, val1 in temp_loaded_cache.items():
-                # v = { "<address>:{<block>:{<key>:<val>..."}
-                # network id
-                if not int(chainId) in self._cache:
-                    self._cache[int(chainId)] = dict()
-
-                for address, val2 in val1.items():
-                    # contract address
-                    if not address in self._cache[int(chainId)]:
-                        self._cache[int(chainId)][address] = dict()
-
-                    for block, val3 in val2.items():
-                        # block
-                        if not int(block) in self._cache[int(chainId)][address]:
-                            self._cache[int(chainId)][address][int(block)] = dict()
-
-                        # set props
-                        self._cache[int(chainId)][address][int(block)] = val3
-                        _loaded += 1
-
-        # log price cache loaded qtty
-        # logging.getLogger("special").debug(
-        #     "          {:,.0f} loaded from {}  cache file ".format(
-        #         _loaded, self.file_name))
+    def _legacy_records(self, loaded: dict):
+        # v = { "<address>:{<block>:{<key>:<val>..."}
+        for chainId, val1 in loaded.items():
+            for address, val2 in val1.items():
+                for block, val3 in val2.items():
+                    for key, value in val3.items():
+                        yield chainId, address, int(block), key, value
+
+    def _persist(self, chain_id, address: str, block: int, key: str, data) -> bool:
+        """should this data be saved to file"""
+        return True
 
     def add_data(
         self, chain_id, address: str, block: int, key: str, data, save2file=False
@@ -210,9 +308,9 @@ class standard_property_cache(file_backend):
             # save data to var
             self._cache[chain_id][address][block][key] = data
 
-        if save2file:
-            # save file to disk
-            self._save_tofile()
+        if save2file and self._persist(chain_id, address, block, key, data):
+            # save row to disk
+            return self._db_set(data, chain_id, address, block, key)
 
         return True
 
@@ -228,9 +326,19 @@ class standard_property_cache(file_backend):
         key = key.lower()
 
         # use it for key in cache
-        return (
+        result = (
             self._cache.get(chain_id, {}).get(address, {}).get(block, {}).get(key, None)
         )
+        if result is None and (
+            result := self._db_get(chain_id, address, int(block), key)
+        ) is not None:
+            # keep it in memory
+            with CACHE_LOCK:
+                self._cache.setdefault(chain_id, {}).setdefault(
+                    address, {}
+                ).setdefault(int(block), {})[key] = result
+
+        return result
 
 
 class mutable_property_cache(standard_property_cache):
@@ -318,6 +426,19 @@ class mutable_property_cache(standard_property_cache):
         except Exception:
             self.fixed_fields[key] = False
 
+        # try get the variable using any block saved to file
+        with contextlib.suppress(Exception):
+            with self._db_lock:
+                if row := (
+                    self._database()
+                    .execute(
+                        "SELECT value FROM cache WHERE k1 = ? AND k2 = ? AND k4 = ? LIMIT 1",
+                        (str(chain_id), address, key),
+                    )
+                    .fetchone()
+                ):
+                    return self._decode(row[0])
+
         return None
 
     def is_fixedfield_inCache(self, chain_id: str, address: str, key: str) -> bool:
@@ -348,23 +469,12 @@ class standard_thegraph_cache(file_backend):
     # THE GRAPH VARS & HELPERS
     RATE_LIMIT = net_utilities.rate_limit(rate_max_sec=4)  # thegraph rate limiter
 
-    def _init_cache(self):
-        # init price cache
-        self._cache = self._load_cache_file()
-
-        # set new dict if no file has been loaded
-        if self._cache is None:
-            self._cache = {}
-
-        _loaded = 0
-        with contextlib.suppress(Exception):
-            for network in self._cache.keys():
-                _loaded += len(self._cache[network].keys())
-
-        # log price cache loaded qtty
-        # logging.getLogger("special").debug(
-        #     "          {:,.0f} loaded from {}  cache file ".format(
-        #         _loaded, self.file_name))
+    def _legacy_records(self, loaded: dict):
+        # { <network>: { <block>: { <key>: <data> } } }
+        for network, val1 in loaded.items():
+            for block, val2 in val1.items():
+                for key, data in val2.items():
+                    yield network, block, key, data
 
     def add_data(self, data, **kwargs) -> bool:
         """Only historic data (block query) is
@@ -395,10 +505,8 @@ class standard_thegraph_cache(file_backend):
             # set value
             self._cache[network][block][key] = data
 
-            # save cache to file
-            self._save_tofile(lock=False)
-
-        return True
+        # save row to file
+        return self._db_set(data, network, block, key)
 
     def get_data(self, **kwargs):
         """Retrieves data from cache
@@ -415,15 +523,27 @@ class standard_thegraph_cache(file_backend):
             key = self._build_key(kwargs)
             if key != "":
                 # use it for key in cache
-                return self._cache[network][block][key]
+                if (
+                    result := self._cache.get(network, {}).get(block, {}).get(key)
+                ) is None and (
+                    result := self._db_get(network, block, key)
+                ) is not None:
+                    # keep it in memory
+                    with CACHE_LOCK:
+                        self._cache.setdefault(network, {}).setdefault(block, {})[
+                            key
+                        ] = result
+                return result
         # not in cache
         return None
 
     def _build_key(self, args: dict) -> str:
         result = ""
         try:
-            # create a sorted list of keys without network nor block
-            tmp_keys = sorted([k for k in args if k not in ["network", "block"]])
+            # create a sorted list of keys without network, block nor shards ( same result )
+            tmp_keys = sorted(
+                [k for k in args if k not in ["network", "block", "shards"]]
+            )
             # unify query string
             for k in tmp_keys:
                 if result != "":
@@ -440,43 +560,12 @@ class standard_thegraph_cache(file_backend):
 
 
 class price_cache(standard_property_cache):
-    def _init_cache(self):
-        # init price cache
-        temp_loaded_cache = self._load_cache_file()
-        _loaded = 0
-        if temp_loaded_cache != None:
-            for chainId, val1 in temp_loaded_cache.items():
-                # v = { "<address>:{<block>:{<key>:<val>..."}
-
-                for address, val2 in val1.items():
-                    # contract address ( token id)
-
-                    for block, val3 in val2.items():
-                        # block
-
-                        # non zero blocks and zero values are discarded
-                        if int(block) > 0:
-                            for token, value in val3.items():
-                                # only values > 0
-                                if value > 0:
-                                    # init cache network id
-                                    if not chainId in self._cache:
-                                        self._cache[chainId] = dict()
-                                    # init cache address
-                                    if not address in self._cache[chainId]:
-                                        self._cache[chainId][address] = dict()
-                                    # init block
-                                    if not int(block) in self._cache[chainId][address]:
-                                        self._cache[chainId][address][
-                                            int(block)
-                                        ] = dict()
-                                    # set token value
-                                    self._cache[chainId][address][int(block)][
-                                        token
-                                    ] = value
-                                    _loaded += 1
-
-        # log price cache loaded qtty
-        # logging.getLogger("special").debug(
-        #     "          {:,.0f} loaded from {}  cache file ".format(
-        #         _loaded, self.file_name))
+    def _legacy_records(self, loaded: dict):
+        # non zero blocks and zero values are discarded
+        for record in super()._legacy_records(loaded):
+            if record[2] > 0 and record[4] > 0:
+                yield record
+
+    def _persist(self, chain_id, address: str, block: int, key: str, data) -> bool:
+        # only historic ( non zero blocks ) and positive prices are saved
+        return block > 0 and data > 0
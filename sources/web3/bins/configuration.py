@@ -5,6 +5,33 @@ from sources.common.general.config import get_config
 CONFIGURATION = {"cache": {"save_path": "data/cache"}}  # load_configuration()
 # load rpc providers
 CONFIGURATION["WEB3_PROVIDER_URLS"] = get_config("WEB3_PROVIDER_URLS")
+# rpc connection pool settings
+CONFIGURATION["WEB3_PROVIDER_TIMEOUT"] = int(get_config("WEB3_PROVIDER_TIMEOUT"))
+CONFIGURATION["WEB3_PROVIDER_CONNECTIONS_PER_HOST"] = int(
+    get_config("WEB3_PROVIDER_CONNECTIONS_PER_HOST")
+)
+# view calls batching ( Multicall3 )
+CONFIGURATION["WEB3_MULTICALL_MAX_CALLS"] = int(get_config("WEB3_MULTICALL_MAX_CALLS"))
+CONFIGURATION["WEB3_MULTICALL_WINDOW_MS"] = int(get_config("WEB3_MULTICALL_WINDOW_MS"))
+# seconds to wait for thegraph price sources
+CONFIGURATION["WEB3_PRICE_DEADLINE"] = float(get_config("WEB3_PRICE_DEADLINE"))
+# thegraph async pagination: id keyspace shards queried in parallel and queries per second budget
+CONFIGURATION["WEB3_THEGRAPH_SHARDS"] = int(get_config("WEB3_THEGRAPH_SHARDS"))
+CONFIGURATION["WEB3_THEGRAPH_RATE_MAX_SEC"] = float(
+    get_config("WEB3_THEGRAPH_RATE_MAX_SEC")
+)
+# user status engine of operations applied to all hypervisor accounts ( decimal or columnar )
+CONFIGURATION["WEB3_USER_STATUS_ENGINE"] = get_config("WEB3_USER_STATUS_ENGINE")
+# rpc router hedging and circuit breaker settings
+CONFIGURATION["WEB3_RPC_HEDGE_AFTER_MS"] = int(get_config("WEB3_RPC_HEDGE_AFTER_MS"))
+CONFIGURATION["WEB3_RPC_CIRCUIT_FAILURES"] = int(
+    get_config("WEB3_RPC_CIRCUIT_FAILURES")
+)
+CONFIGURATION["WEB3_RPC_CIRCUIT_COOLDOWN"] = float(
+    get_config("WEB3_RPC_CIRCUIT_COOLDOWN")
+)
+# rpc router endpoint stats log interval
+CONFIGURATION["WEB3_RPC_STATS_LOG_SECS"] = float(get_config("WEB3_RPC_STATS_LOG_SECS"))
 
 
 # check configuration
@@ -4,6 +4,7 @@ from bson.decimal128 import Decimal128, create_decimal128_context
 from decimal import Decimal, localcontext
 from datetime import datetime
 
+from sources.common.database.common.db_indexes import ensure_local_indexes
 from sources.web3.bins.database.common.db_managers import MongoDbManager
 
 
@@ -72,6 +73,34 @@ class db_collections_common:
                 f" Unable to replace data in mongo's {collection_name} collection.  Item: {data}    error-> {e}"
             )
 
+    def replace_items_to_database(
+        self,
+        data: list[dict],
+        collection_name: str,
+    ) -> bool:
+        """Replace ( or add ) multiple items using one bulk write
+
+        Args:
+            data (list[dict]): items with an "id" field
+            collection_name (str): collection name to save data to
+
+        Returns:
+            bool: all items were saved
+        """
+        try:
+            with MongoDbManager(
+                url=self._db_mongo_url,
+                db_name=self._db_name,
+                collections=self._db_collections,
+            ) as _db_manager:
+                _db_manager.replace_items(coll_name=collection_name, items=data)
+            return True
+        except Exception as e:
+            logging.getLogger(__name__).error(
+                f" Unable to replace {len(data)} items in mongo's {collection_name} collection.  error-> {e}"
+            )
+            return False
+
     def query_items_from_database(
         self,
         query: list[dict],
@@ -487,12 +516,16 @@ class database_local(db_collections_common):
                     "timestamp": False,
                 },
                 "rewards_static": {"id": True, "address": False},
+                "user_status_checkpoints": {"id": True},
             }
 
         super().__init__(
             mongo_url=mongo_url, db_name=db_name, db_collections=db_collections
         )
 
+        # <chain>_gamma databases created after startup get their indexes here
+        ensure_local_indexes(url=mongo_url, db_name=db_name)
+
     # static
 
     def set_static(self, data: dict):
@@ -756,6 +789,64 @@ class database_local(db_collections_common):
         # convert decimal to bson compatible and save
         self.replace_item_to_database(data=data, collection_name="user_status")
 
+    def set_user_status_bulk(self, data: list[dict]) -> bool:
+        """save multiple user status with one bulk write
+
+        Args:
+            data (list[dict]):
+
+        Returns:
+            bool: all user status were saved
+        """
+        for item in data:
+            # define database id
+            item[
+                "id"
+            ] = f"{item['address']}_{item['block']}_{item['logIndex']}_{item['hypervisor_address']}"
+
+        return self.replace_items_to_database(data=data, collection_name="user_status")
+
+    def set_user_status_checkpoint(self, data: dict):
+        """save the user status replay checkpoint of a hypervisor
+
+        Args:
+            data (dict): {"hypervisor_address", "block", "logIndex", "accounts": [<user_status id>, ...]}
+        """
+        data["id"] = data["hypervisor_address"]
+        self.replace_item_to_database(
+            data=data, collection_name="user_status_checkpoints"
+        )
+
+    def get_user_status_checkpoint(self, hypervisor_address: str) -> dict | None:
+        """get the user status replay checkpoint of a hypervisor
+
+        Args:
+            hypervisor_address (str):
+
+        Returns:
+            dict | None:
+        """
+        try:
+            return self.get_items_from_database(
+                collection_name="user_status_checkpoints",
+                find={"id": hypervisor_address},
+            )[0]
+        except IndexError:
+            return None
+
+    def get_user_status_byIds(self, ids: list[str]) -> list[dict]:
+        """get multiple user status with one query
+
+        Args:
+            ids (list[str]): user status ids
+
+        Returns:
+            list[dict]:
+        """
+        return self.get_items_from_database(
+            collection_name="user_status", find={"id": {"$in": ids}}
+        )
+
     def get_user_status(
         self, address: str, block_ini: int = 0, block_end: int = 0
     ) -> list:
@@ -1,6 +1,8 @@
-from pymongo import MongoClient
+from pymongo import ReplaceOne
 from pymongo.errors import ConnectionFailure
 
+from sources.common.database.common.db_managers import get_mongo_client
+
 
 class MongoDbManager:
     def __init__(self, url: str, db_name: str, collections: dict):
@@ -20,31 +22,43 @@ class MongoDbManager:
                                }
         """
 
-        # connect to mongo database
+        # connect to mongo database ( process-wide pooled client )
         try:
-            self.mongo_client = MongoClient(url)
+            self.mongo_client = get_mongo_client(url=url)
         except ConnectionFailure as e:
             raise ValueError(f"Failed not connect to {url}") from e
         self.database = self.mongo_client[db_name]
 
-        # Retrieve database collection names
-        self.database_collections = self.database.list_collection_names()
+        # database collection names are retrieved on demand
+        self._database_collections = None
 
         # define collection configurations
         self.collections_config = collections
-
-        # Setup collections and their indexes
-        self.configure_collections()
+        # indexes are created once by db_indexes.bootstrap_indexes, not on each manager construction
 
     def __enter__(self):
         return self
 
     def __exit__(self, type, value, traceback):
         # xception handling here
-        self.mongo_client.close()
+        # the client is shared by the whole process: do not close it here
+        pass
+
+    @property
+    def database_collections(self) -> list[str]:
+        """database collection names"""
+        if self._database_collections is None:
+            self._database_collections = self.database.list_collection_names()
+        return self._database_collections
+
+    @database_collections.setter
+    def database_collections(self, value: list[str]):
+        self._database_collections = value
 
     def configure_collections(self):
-        """define collection names and create indexes"""
+        """define collection names and create indexes
+        ( DDL: use db_indexes.bootstrap_indexes at startup instead of calling this per request )
+        """
         for coll_name, fields in self.collections_config.items():
             for field, unique in fields.items():
                 self.database[coll_name].create_index(field, unique=unique)
@@ -80,11 +94,6 @@ class MongoDbManager:
             raise ValueError(
                 f" No configuration found for {coll_name} database collection."
             )
-        # create collection if it does not exist yet
-        self.create_collection(
-            coll_name=coll_name, **self.collections_config[coll_name]
-        )
-
         # add/ update to database (add or replace)
         self.database[coll_name].update_one(
             filter=dbFilter, update={"$set": data}, upsert=True
@@ -108,16 +117,39 @@ class MongoDbManager:
             raise ValueError(
                 f" No configuration found for {coll_name} database collection."
             )
-        # create collection if it does not exist yet
-        self.create_collection(
-            coll_name=coll_name, **self.collections_config[coll_name]
-        )
-
         # add/ update to database (add or replace)
         self.database[coll_name].replace_one(
             filter=dbFilter, replacement=data, upsert=True
         )
 
+    def replace_items(self, coll_name: str, items: list[dict], upsert=True):
+        """Add or Replace multiple items using one unordered bulk write
+
+        Args:
+           coll_name (str): collection name
+           items (list[dict]): data to save ( each item must have an "id" field, used as filter )
+           upsert (bool, optional): replace or add items. Defaults to True.
+
+        Raises:
+           ValueError: if coll_name is not defined at the class init <collections> field
+        """
+
+        # check collection configuration exists
+        if coll_name not in self.collections_config.keys():
+            raise ValueError(
+                f" No configuration found for {coll_name} database collection."
+            )
+        if items:
+            self.database[coll_name].bulk_write(
+                [
+                    ReplaceOne(
+                        filter={"id": item["id"]}, replacement=item, upsert=upsert
+                    )
+                    for item in items
+                ],
+                ordered=False,
+            )
+
     def get_items(self, coll_name: str, **kwargs):
         """get items cursor from database
 
@@ -1,8 +1,10 @@
+import bisect
 import contextlib
 import sys
 import logging
 import uuid
 import concurrent.futures
+import numpy as np
 
 from bson.decimal128 import Decimal128
 from decimal import Decimal, getcontext
@@ -14,12 +16,17 @@ from sources.web3.bins.database.common.db_collections_common import (
     database_local,
     database_global,
 )
+from sources.web3.bins.database.db_user_status_columns import user_status_columns
 
 from sources.web3.bins.converters.onchain import convert_hypervisor_fromDict
+from sources.web3.bins.mixed.price_utilities import price_scraper
 from datetime import timezone
 
 # getcontext().prec = 40
 
+# user status saved to database per bulk write
+USER_STATUS_FLUSH_SIZE = 1000
+
 
 class user_status:
     __slots__ = (
@@ -299,21 +306,29 @@ class user_status:
 
 
 class user_status_hypervisor_builder:
-    def __init__(self, hypervisor_address: str, network: str, protocol: str):
+    def __init__(
+        self,
+        hypervisor_address: str,
+        network: str,
+        protocol: str,
+        engine: str | None = None,
+    ):
         """Fast forward emulate gamma hypervisor contract using database data
 
         Args:
             hypervisor_address (str):
             network (str):
             protocol (str):
-            t_ini (int): initial timestamp
-            t_end (int): end timestamp
+            engine (str | None, optional): "decimal" or "columnar" -> how operations applied to all accounts ( fee sharing, reports ) are calculated. Defaults to WEB3_USER_STATUS_ENGINE.
         """
 
         # set global vars
         self._hypervisor_address = hypervisor_address.lower()
         self._network = network
         self._protocol = protocol
+        self._engine = engine or CONFIGURATION["WEB3_USER_STATUS_ENGINE"]
+        if self._engine not in ("decimal", "columnar"):
+            raise ValueError(f" User status engine not valid:->  {self._engine}")
 
         self.__blacklist_addresses = ["0x0000000000000000000000000000000000000000"]
 
@@ -326,10 +341,22 @@ class user_status_hypervisor_builder:
         self._rewarders_list = []
         self._rewarders_lastTime_update = None
 
-        # control var (itemsprocessed): list of operation ids processed
-        self.ids_processed = []
+        # control var (itemsprocessed): operation ids processed
+        self.ids_processed: set[str] = set()
         # control var time order :  last block always >= current
         self.last_block_processed: int = 0
+        self.last_logIndex_processed: int = 0
+
+        # latest status of each account ( ledger ) when all of them are known in memory
+        #   None -> not loaded yet
+        self._account_states: dict[str, user_status] | None = None
+        # sum of ledger account shares
+        self._total_shares: Decimal = Decimal("0")
+        # user status waiting to be saved to database
+        self._pending_user_status: list[dict] = []
+        # hypervisor status and last operation logIndex by block ( of operations being processed )
+        self._hypervisor_status: dict[int, dict] = {}
+        self._last_logIndex: dict[int, int] = {}
 
     # setup
     def _get_static_data(self):
@@ -366,6 +393,36 @@ class user_status_hypervisor_builder:
 
         return result
 
+    def _prefetch_prices(self, blocks: set[int]):
+        """Add the token prices missing at the specified blocks to the loaded prices
+            ( cache, database and thegraph are queried in batch instead of one price at a time )
+
+        Args:
+            blocks (set[int]): block numbers
+        """
+        items = [
+            (self.network, address, block)
+            for block in blocks
+            for address in (
+                self._static["pool"]["token0"]["address"],
+                self._static["pool"]["token1"]["address"],
+            )
+            if address not in self._prices.get(block, {})
+        ]
+        if not items:
+            return
+
+        try:
+            prices = price_scraper(cache=True).get_prices(items=items)
+        except Exception:
+            logging.getLogger(__name__).exception(
+                f" Unexpected error prefetching {len(items)} {self.network}'s {self.address} token prices"
+            )
+            return
+
+        for (network, address, block), price in prices.items():
+            self._prices.setdefault(block, {})[address] = price
+
     @property
     def rewarders_list(self) -> list:
         """Masterchef addresses that reward this hypervisor
@@ -861,41 +918,64 @@ class user_status_hypervisor_builder:
 
     @log_execution_time
     def _create_operations_to_process(self) -> list[dict]:
-        # get all blocks from user status ( what has already been done [ careful because last  =  block + logIndex ] )
-        user_status_blocks_processed = sorted(
-            self.local_db_manager.get_distinct_items_from_database(
-                collection_name="user_status",
-                field="block",
-                condition={"hypervisor_address": self.address},
+        """Operations to replay ( sorted by block and logIndex ), including one report operation per day.
+            When a checkpoint exists, only operations after it are returned and account states are loaded from it.
+        """
+        checkpoint = self.local_db_manager.get_user_status_checkpoint(
+            hypervisor_address=self.address
+        )
+
+        if checkpoint:
+            # resume after checkpoint
+            self.last_block_processed = checkpoint["block"]
+            self.last_logIndex_processed = checkpoint["logIndex"]
+            self._set_ledger(
+                states=[
+                    self.convert_user_status_fromDb(status=item)
+                    for item in self.local_db_manager.get_user_status_byIds(
+                        ids=checkpoint["accounts"]
+                    )
+                ]
             )
-        )
-        # substract last couple of blocks to make sure db data has not been left between the same block and different logIndexes
-        if len(user_status_blocks_processed) > 1:
-            try:
-                user_status_blocks_processed = set(user_status_blocks_processed[:-2])
-            except Exception:
-                logging.getLogger(__name__).error(
-                    f" Unexpected error slicing block array while creating operations to process. array length: {len(user_status_blocks_processed)}"
-                )
+            result = self.get_hypervisor_operations_after(
+                block=checkpoint["block"], logIndex=checkpoint["logIndex"]
+            )
+            # reports of blocks already processed are already in database
+            blocks_processed = [checkpoint["block"]]
+            report_from_block = checkpoint["block"] + 1
         else:
-            # reset and do it all from zero
-            user_status_blocks_processed = set()
-
-        # get all available hypervisor operations, not already processed:  the hypervisor status at any time T needs all operations till that time to be build
-        result = [
-            operation
-            for operation in self.get_hypervisor_operations()
-            if operation["blockNumber"] not in user_status_blocks_processed
-        ]
-
-        # construct the todo block list
-        blocks_to_process = {x["blockNumber"] for x in result}
+            # get all blocks from user status ( what has already been done [ careful because last  =  block + logIndex ] )
+            blocks_processed = sorted(
+                self.local_db_manager.get_distinct_items_from_database(
+                    collection_name="user_status",
+                    field="block",
+                    condition={"hypervisor_address": self.address},
+                )
+            )
+            # substract last couple of blocks to make sure db data has not been left between the same block and different logIndexes
+            if len(blocks_processed) > 1:
+                blocks_processed = blocks_processed[:-2]
+            else:
+                # reset and do it all from zero: all account states will be built in memory
+                blocks_processed = []
+                self._set_ledger(states=[])
+            report_from_block = 0
+
+            # get all available hypervisor operations, not already processed:  the hypervisor status at any time T needs all operations till that time to be build
+            _processed = set(blocks_processed)
+            result = [
+                operation
+                for operation in self.get_hypervisor_operations()
+                if operation["blockNumber"] not in _processed
+            ]
 
         # control var
         initial_length = len(result)
 
-        # mix blocks to process ( extracted from operations)
-        combined_blocks = list(blocks_to_process) + list(user_status_blocks_processed)
+        # mix blocks to process ( extracted from operations) with processed ones
+        combined_blocks = sorted(
+            {x["blockNumber"] for x in result}.union(blocks_processed)
+        )
 
         # add report dummy operations once every day
         for hype_status in sorted(
@@ -903,54 +983,92 @@ class user_status_hypervisor_builder:
             key=lambda x: (x["block"]),
             reverse=False,
         ):
-            if (
-                hype_status["block"] not in blocks_to_process
-                and hype_status["block"] not in user_status_blocks_processed
-            ):
-                # discard close blocks ( block <30> block )
-                _closest = min(
-                    combined_blocks,
-                    key=lambda x: abs(x - hype_status["block"]),
-                )
-                if abs(_closest - hype_status["block"]) < 30:
-                    # discard block close to a block to process
-                    logging.getLogger(__name__).debug(
-                        f' Block {hype_status["block"]} has not been included in {self.address} [{self.symbol}] user status creation because it is {_closest - hype_status["block"]} blocks close to (already/to be) processed block'
-                    )
+            if hype_status["block"] < report_from_block:
+                continue
 
-                    continue
-                # add report operation to operations tobe processed
-                result.append(
-                    {
-                        "blockHash": "reportHash",
-                        "blockNumber": hype_status["block"],
-                        "address": self.address,
-                        "timestamp": hype_status["timestamp"],
-                        "decimals_token0": hype_status["pool"]["token0"]["decimals"],
-                        "decimals_token1": hype_status["pool"]["token1"]["decimals"],
-                        "decimals_contract": hype_status["decimals"],
-                        "topic": "report",
-                        "logIndex": 100000,
-                        "id": str(uuid.uuid4()),
-                    }
+            # discard close blocks ( block <30> block )
+            _closest = self._closest_block(
+                blocks=combined_blocks, block=hype_status["block"]
+            )
+            if _closest is not None and abs(_closest - hype_status["block"]) < 30:
+                # discard block close to a block to process ( or the same block )
+                logging.getLogger(__name__).debug(
+                    f' Block {hype_status["block"]} has not been included in {self.address} [{self.symbol}] user status creation because it is {_closest - hype_status["block"]} blocks close to (already/to be) processed block'
                 )
 
+                continue
+            # add report operation to operations tobe processed
+            result.append(
+                {
+                    "blockHash": "reportHash",
+                    "blockNumber": hype_status["block"],
+                    "address": self.address,
+                    "timestamp": hype_status["timestamp"],
+                    "decimals_token0": hype_status["pool"]["token0"]["decimals"],
+                    "decimals_token1": hype_status["pool"]["token1"]["decimals"],
+                    "decimals_contract": hype_status["decimals"],
+                    "topic": "report",
+                    "logIndex": 100000,
+                    "id": str(uuid.uuid4()),
+                }
+            )
+
         logging.getLogger(__name__).debug(
-            f" Added {len(result)-initial_length} report operations from status blocks. Processed: {len(user_status_blocks_processed)} -> total to process {len(result)}"
+            f" Added {len(result)-initial_length} report operations from status blocks. Processed: {len(blocks_processed)} -> total to process {len(result)}"
         )
         # return sorted by block->logindex
         return sorted(result, key=lambda x: (x["blockNumber"], x["logIndex"]))
 
+    @staticmethod
+    def _closest_block(blocks: list[int], block: int) -> int | None:
+        """closest block of a sorted block list
+
+        Args:
+            blocks (list[int]): sorted blocks
+            block (int):
+
+        Returns:
+            int | None: None when blocks is empty
+        """
+        idx = bisect.bisect_left(blocks, block)
+        candidates = blocks[max(0, idx - 1) : idx + 1]
+        return min(candidates, key=lambda x: abs(x - block)) if candidates else None
+
     def _process_operations(self):
-        """process all operations"""
+        """process all operations, saving a checkpoint of the last one processed"""
 
         # mix operations with status blocks ( status different than operation's)
-        operations_to_process = self._create_operations_to_process()
+        operations_to_process = [
+            x
+            for x in self._create_operations_to_process()
+            if x["id"] not in self.ids_processed
+        ]
+        if not operations_to_process:
+            return
 
-        _errors = 0
+        # load account states before the first operation, when not already known
+        if self._account_states is None:
+            self._set_ledger(
+                states=self.last_user_status_list(
+                    block=operations_to_process[0]["blockNumber"], block_condition="$lt"
+                )
+            )
 
+        # load all data needed at once: prices, hypervisor status and last logIndex of each block
+        blocks = {x["blockNumber"] for x in operations_to_process}
+        self._prefetch_prices(blocks=blocks)
+        self._prefetch_hypervisor_status(blocks=blocks)
         for operation in operations_to_process:
-            if operation["id"] not in self.ids_processed:
+            if operation["topic"] != "report":
+                self._last_logIndex[operation["blockNumber"]] = max(
+                    operation["logIndex"],
+                    self._last_logIndex.get(operation["blockNumber"], 0),
+                )
+
+        _processed = 0
+
+        try:
+            for operation in operations_to_process:
                 # linear processing check
                 if operation["blockNumber"] < self.last_block_processed:
                     logging.getLogger(__name__).error(
@@ -962,14 +1080,107 @@ class user_status_hypervisor_builder:
                 self._process_operation(operation)
 
                 # add operation as proceesed
-                self.ids_processed.append(operation["id"])
+                self.ids_processed.add(operation["id"])
+                _processed += 1
 
                 # set last block number processed
                 self.last_block_processed = operation["blockNumber"]
-            else:
-                logging.getLogger(__name__).debug(
-                    f""" Operation already processed {operation["id"]}. Not processing"""
+                self.last_logIndex_processed = operation["logIndex"]
+        finally:
+            # save pending user status ( when processing fails, they are replaced on the next run )
+            flushed = self._flush_user_status()
+
+        # only checkpoint when all user status are in the database ( or the next run would skip them )
+        if _processed and flushed:
+            self._save_checkpoint()
+
+    def _save_checkpoint(self):
+        """save last operation processed and the latest status id of each account"""
+        self.local_db_manager.set_user_status_checkpoint(
+            data={
+                "hypervisor_address": self.address,
+                "block": self.last_block_processed,
+                "logIndex": self.last_logIndex_processed,
+                "accounts": [
+                    f"{x.address}_{x.block}_{x.logIndex}_{x.hypervisor_address}"
+                    for x in self._account_states.values()
+                ],
+            }
+        )
+
+    # ledger
+    def _set_ledger(self, states: list[user_status]):
+        """set the latest status of every account"""
+        self._account_states = {x.address: x for x in states}
+        self._total_shares = sum(
+            (x.shares_qtty for x in self._account_states.values()), Decimal("0")
+        )
+
+    def _ledger_total_shares(self, exclude_address: str = "") -> Decimal:
+        """sum of account shares
+
+        Args:
+            exclude_address (str, optional): account to exclude. Defaults to "".
+        """
+        if exclude_address and (
+            excluded := self._account_states.get(exclude_address)
+        ):
+            return self._total_shares - excluded.shares_qtty
+        return self._total_shares
+
+    def _ledger_accounts_with_shares(self) -> list[user_status]:
+        """latest status of accounts with shares"""
+        return [x for x in self._account_states.values() if x.shares_qtty > 0]
+
+    def _flush_user_status(self) -> bool:
+        """save pending user status to database with one bulk write
+            ( pending user status are kept when saving fails )
+
+        Returns:
+            bool: no user status left pending
+        """
+        if self._pending_user_status:
+            if not self.local_db_manager.set_user_status_bulk(
+                data=self._pending_user_status
+            ):
+                return False
+            self._pending_user_status = []
+        return True
+
+    def _prefetch_hypervisor_status(self, blocks: set[int]):
+        """load hypervisor status of multiple blocks with one query"""
+        if not (blocks := [x for x in blocks if x not in self._hypervisor_status]):
+            return
+        for x in self.local_db_manager.get_items_from_database(
+            collection_name="status",
+            find={"address": self.address.lower(), "block": {"$in": blocks}},
+        ):
+            self._hypervisor_status[x["block"]] = convert_hypervisor_fromDict(
+                hypervisor=x, toDecimal=True
+            )
+
+    def _hypervisor_status_at(self, block: int) -> dict:
+        """hypervisor status at block ( loaded or from database )"""
+        if block not in self._hypervisor_status:
+            if not (status_data := self.get_hypervisor_status(block=block)):
+                raise ValueError(
+                    f" No hypervisor status found for {self.network}'s {self.address} at block {block}"
                 )
+            self._hypervisor_status[block] = status_data[0]
+        return self._hypervisor_status[block]
+
+    def _hypervisor_supply_at(self, block: int) -> Decimal:
+        """hypervisor total supply at block"""
+        try:
+            return self._hypervisor_status_at(block=block)["totalSupply"]
+        except Exception:
+            return self.total_hypervisor_supply(block=block)
+
+    def _last_logIndex_at(self, block: int) -> int:
+        """last operation logIndex of a block"""
+        if block not in self._last_logIndex:
+            self._last_logIndex[block] = self.get_last_logIndex(block=block)
+        return self._last_logIndex[block]
 
     @log_execution_time
     def _process_operation(self, operation: dict):
@@ -1047,7 +1258,7 @@ class user_status_hypervisor_builder:
         )
 
         # get last operation (lower than current logIndex)
-        last_op = self.last_user_status(
+        last_op = self._last_account_status(
             account_address=account_address,
             block=operation["blockNumber"],
             logIndex=operation["logIndex"],
@@ -1118,7 +1329,7 @@ class user_status_hypervisor_builder:
             logIndex=operation["logIndex"],
         )
         # get last operation ( lower than logIndex)
-        last_op = self.last_user_status(
+        last_op = self._last_account_status(
             account_address=account_address, block=block, logIndex=operation["logIndex"]
         )
 
@@ -1320,15 +1531,12 @@ class user_status_hypervisor_builder:
         )
 
         # get current total shares
-        if (
-            self.get_last_logIndex(block=operation["blockNumber"])
-            == operation["logIndex"]
-        ):
+        if self._last_logIndex_at(block=block) == operation["logIndex"]:
             # get total shares from current users
-            total_shares = self.total_hypervisor_supply(block=block)
+            total_shares = self._hypervisor_supply_at(block=block)
         else:
             # sum total shares from current users
-            total_shares = self.total_shares(block=block)
+            total_shares = self._ledger_total_shares()
 
         # create SOURCE result
         new_user_status_source = user_status(
@@ -1341,7 +1549,7 @@ class user_status_hypervisor_builder:
             logIndex=operation["logIndex"],
         )
         # get last operation from source address
-        last_op_source = self.last_user_status(
+        last_op_source = self._last_account_status(
             account_address=address_source, block=block, logIndex=operation["logIndex"]
         )
         # fill new status item with last data
@@ -1436,7 +1644,7 @@ class user_status_hypervisor_builder:
         )
 
         # get last operation from destination address
-        last_op_destination = self.last_user_status(
+        last_op_destination = self._last_account_status(
             account_address=address_destination,
             block=block,
             logIndex=operation["logIndex"],
@@ -1507,16 +1715,31 @@ class user_status_hypervisor_builder:
     # Collection
     @log_execution_time
     def _add_user_status(self, status: user_status):
-        """add user status to database
+        """add user status to database ( in batches: see _flush_user_status )
 
         Args:
             status (user_status):
         """
         if status.address not in self.__blacklist_addresses:
-            # add status to database
-            self.local_db_manager.set_user_status(
+            # queue status to be saved to database in bulk
+            self._pending_user_status.append(
                 self.convert_user_status_toDb(status=status)
             )
+            if (
+                len(self._pending_user_status) >= USER_STATUS_FLUSH_SIZE
+                and not self._flush_user_status()
+            ):
+                # stop processing: the run is replayed from the last checkpoint
+                raise ValueError(
+                    f" Unable to save {len(self._pending_user_status)} user status of {self.address} to database"
+                )
+
+            # keep account state and total shares
+            if self._account_states is not None:
+                if last := self._account_states.get(status.address):
+                    self._total_shares -= last.shares_qtty
+                self._total_shares += status.shares_qtty
+                self._account_states[status.address] = status
 
         elif status.address != "0x0000000000000000000000000000000000000000":
             logging.getLogger(__name__).debug(
@@ -1571,25 +1794,16 @@ class user_status_hypervisor_builder:
 
         # get hypervisor status at block
         if not current_status_data:
-            current_status_data = self.get_hypervisor_status(
+            current_status_data = self._hypervisor_status_at(
                 block=current_user_status.block
             )
-            if len(current_status_data) == 0:
-                raise ValueError(
-                    f" No hypervisor status found for {self.network}'s {self.address} at block {current_user_status.block}"
-                )
-            current_status_data = current_status_data[0]
 
         # on transfer: total shares is correct ( pre deposit & withraw transfers are not passing thru here)
         # on deposit : total shares is correct
         # on withdraw: total shares is correct
         if total_shares == Decimal("0"):
             total_shares = (
-                self.total_shares(
-                    block=current_user_status.block,
-                    logIndex=current_user_status.logIndex,
-                    exclude_address=current_user_status.address,
-                )
+                self._ledger_total_shares(exclude_address=current_user_status.address)
                 + current_user_status.shares_qtty
             )
 
@@ -1800,6 +2014,24 @@ class user_status_hypervisor_builder:
                 hypervisor_address=self.address,
             )
 
+    def _last_account_status(
+        self, account_address: str, block: int, logIndex: int
+    ) -> user_status:
+        """Last status of an account before the operation being processed
+            ( from memory when account states are known )
+        """
+        if self._account_states is not None:
+            return self._account_states.get(account_address) or user_status(
+                timestamp=0,
+                block=0,
+                topic="",
+                address=account_address,
+                hypervisor_address=self.address,
+            )
+        return self.last_user_status(
+            account_address=account_address, block=block, logIndex=logIndex
+        )
+
     @log_execution_time
     def last_user_status_list(
         self,
@@ -1986,6 +2218,30 @@ class user_status_hypervisor_builder:
             collection_name="operations", find=find, sort=sort
         )
 
+    @log_execution_time
+    def get_hypervisor_operations_after(self, block: int, logIndex: int) -> list[dict]:
+        """Get hypervisor operations after a block and logIndex ordered by block (asc)
+
+        Args:
+            block (int):
+            logIndex (int):
+
+        Returns:
+            list[dict]:
+        """
+        find = {
+            "address": self.address.lower(),
+            "$or": [
+                {"blockNumber": {"$gt": block}},
+                {"blockNumber": block, "logIndex": {"$gt": logIndex}},
+            ],
+        }
+        sort = [("blockNumber", 1), ("logIndex", 1)]
+
+        return self.local_db_manager.get_items_from_database(
+            collection_name="operations", find=find, sort=sort
+        )
+
     @log_execution_time
     def get_hypervisor_status(self, block: int = 0) -> list[dict]:
         """Get all found hypervisor status ordered by block (desc)
@@ -2098,7 +2354,7 @@ class user_status_hypervisor_builder:
             logging.getLogger(__name__).error(
                 f" Can't find {self.network}'s {self.address} usd price for {address} at block {block}. Return Zero"
             )
-            Decimal("0")
+            return Decimal("0")
 
     # Transformers
     def convert_user_status_toDb(self, status: user_status) -> dict:
@@ -2170,17 +2426,12 @@ class user_status_hypervisor_builder:
 
         # get current total contract_address shares qtty
         # check if this is the last operation of the block
-        if (
-            self.get_last_logIndex(block=operation["blockNumber"])
-            == operation["logIndex"]
-        ):
+        if self._last_logIndex_at(block=block) == operation["logIndex"]:
             # get total shares from current users
-            total_shares = self.total_hypervisor_supply(block=block)
+            total_shares = self._hypervisor_supply_at(block=block)
         else:
             # sum total shares from current users
-            total_shares = self.total_shares(
-                block=block, logIndex=operation["logIndex"]
-            )
+            total_shares = self._ledger_total_shares()
 
         fees_collected_token0 = Decimal(operation["qtty_token0"]) / (
             Decimal(10) ** Decimal(operation["decimals_token0"])
@@ -2218,12 +2469,7 @@ class user_status_hypervisor_builder:
             block=block, address=self._static["pool"]["token1"]["address"]
         )
 
-        current_status_data = self.get_hypervisor_status(block=block)
-        if len(current_status_data) == 0:
-            raise ValueError(
-                f" No hypervisor status found for {self.network}'s {self.address} at block {block}"
-            )
-        current_status_data = current_status_data[0]
+        current_status_data = self._hypervisor_status_at(block=block)
 
         # control var to keep track of total percentage applied
         ctrl_total_percentage_applied = Decimal("0")
@@ -2232,9 +2478,7 @@ class user_status_hypervisor_builder:
         #     block=block, logIndex=operation["logIndex"]
         # )
 
-        last_status_list = self.last_user_status_list(
-            block=block, logIndex=operation["logIndex"], with_shares=True
-        )
+        last_status_list = self._ledger_accounts_with_shares()
 
         # create fee sharing loop for threaded processing
         def loop_share_fees(
@@ -2277,9 +2521,24 @@ class user_status_hypervisor_builder:
             # return
             return new_user_status, user_share
 
-        # go thread all: Get all user status with shares to share fees with
-        with concurrent.futures.ThreadPoolExecutor() as ex:
-            for result_status, result_user_share in ex.map(
+        if self._engine == "columnar":
+            # share fees with all accounts at once
+            for result_status in self._columnar_user_status(
+                operation=operation,
+                last_status_list=last_status_list,
+                price_usd_t0=price_usd_t0,
+                price_usd_t1=price_usd_t1,
+                current_status_data=current_status_data,
+                total_shares=total_shares,
+                fees_collected_token0=fees_collected_token0,
+                fees_collected_token1=fees_collected_token1,
+            ):
+                ctrl_total_shares_applied += result_status.shares_qtty
+                self._add_user_status(status=result_status)
+            ctrl_total_percentage_applied = ctrl_total_shares_applied / total_shares
+        else:
+            # share fees with all accounts with shares ( in memory: no need for threads )
+            for result_status, result_user_share in map(
                 loop_share_fees,
                 last_status_list,
             ):
@@ -2348,14 +2607,9 @@ class user_status_hypervisor_builder:
         block = operation["blockNumber"]
 
         # get total shares from current users
-        total_shares = self.total_hypervisor_supply(block=block)
+        total_shares = self._hypervisor_supply_at(block=block)
 
-        current_status_data = self.get_hypervisor_status(block=block)
-        if len(current_status_data) == 0:
-            raise ValueError(
-                f" No hypervisor status found for {self.network}'s {self.address} at block {block}"
-            )
-        current_status_data = current_status_data[0]
+        current_status_data = self._hypervisor_status_at(block=block)
 
         # USD prices
         price_usd_t0 = self.get_price(
@@ -2395,16 +2649,101 @@ class user_status_hypervisor_builder:
             # return
             return new_user_status
 
-        # go thread all: only users with shares
-        with concurrent.futures.ThreadPoolExecutor() as ex:
-            for new_user_status in ex.map(
-                loop_process_report,
-                self.last_user_status_list(
-                    block=block, logIndex=operation["logIndex"], with_shares=True
+        if self._engine == "columnar":
+            # all accounts at once
+            results = self._columnar_user_status(
+                operation=operation,
+                last_status_list=self._ledger_accounts_with_shares(),
+                price_usd_t0=price_usd_t0,
+                price_usd_t1=price_usd_t1,
+                current_status_data=current_status_data,
+                total_shares=total_shares,
+            )
+        else:
+            # only users with shares ( in memory: no need for threads )
+            results = map(loop_process_report, self._ledger_accounts_with_shares())
+
+        for new_user_status in results:
+            # add to result
+            self._add_user_status(status=new_user_status)
+
+    def _columnar_user_status(
+        self,
+        operation: dict,
+        last_status_list: list[user_status],
+        price_usd_t0: Decimal,
+        price_usd_t1: Decimal,
+        current_status_data: dict,
+        total_shares: Decimal,
+        fees_collected_token0: Decimal = Decimal("0"),
+        fees_collected_token1: Decimal = Decimal("0"),
+    ) -> list[user_status]:
+        """New status of multiple accounts at an operation, sharing collected fees between them
+            ( columnar engine: same results as loop_share_fees/loop_process_report, calculated with fixed point and float64 arrays )
+
+        Args:
+            operation (dict): fee collection or report operation
+            last_status_list (list[user_status]): last status of the accounts
+            price_usd_t0 (Decimal):
+            price_usd_t1 (Decimal):
+            current_status_data (dict): hypervisor status at the operation block
+            total_shares (Decimal): hypervisor shares
+            fees_collected_token0 (Decimal, optional): fees to share. Defaults to 0.
+            fees_collected_token1 (Decimal, optional): fees to share. Defaults to 0.
+
+        Returns:
+            list[user_status]: new status of each account
+        """
+        if not last_status_list:
+            return []
+
+        # create results filled with last data
+        new_status_list = []
+        for last_status in last_status_list:
+            new_user_status = user_status(
+                timestamp=operation["timestamp"],
+                block=operation["blockNumber"],
+                topic=operation["topic"],
+                address=last_status.address,
+                hypervisor_address=self.address,
+                raw_operation=operation["id"],
+            )
+            if operation["topic"] != "report":
+                new_user_status.logIndex = operation["logIndex"]
+            new_user_status.fill_from(status=last_status)
+            new_status_list.append(new_user_status)
+
+        columns = user_status_columns(
+            statuses=new_status_list,
+            decimals_token0=operation["decimals_token0"],
+            decimals_token1=operation["decimals_token1"],
+            decimals_contract=operation["decimals_contract"],
+        )
+        total_shares = columns.to_fixed(total_shares, columns.scale_shares)
+
+        if fees_collected_token0 or fees_collected_token1:
+            columns.share_fees(
+                fees_token0=columns.to_fixed(
+                    fees_collected_token0, columns.scale_token0
                 ),
-            ):
-                # add to result
-                self._add_user_status(status=new_user_status)
+                fees_token1=columns.to_fixed(
+                    fees_collected_token1, columns.scale_token1
+                ),
+                total_shares=total_shares,
+                price_usd_t0=float(price_usd_t0),
+                price_usd_t1=float(price_usd_t1),
+            )
+        columns.add_globals(
+            last_timestamps=np.array(
+                [x.timestamp for x in last_status_list], dtype=np.int64
+            ),
+            price_usd_t0=float(price_usd_t0),
+            price_usd_t1=float(price_usd_t1),
+            current_status_data=current_status_data,
+            total_shares=total_shares,
+        )
+
+        return columns.write()
 
     # Results
 
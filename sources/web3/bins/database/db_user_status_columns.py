@@ -0,0 +1,318 @@
+from decimal import Decimal
+
+import numpy as np
+
+
+# token quantities kept as exact fixed point integers ( scaled by the token decimals )
+TOKEN0_FIELDS = (
+    "investment_qtty_token0",
+    "fees_collected_token0",
+    "fees_uncollected_token0",
+    "fees_owed_token0",
+    "divestment_base_qtty_token0",
+    "divestment_fee_qtty_token0",
+    "current_result_token0",
+    "closed_investment_return_token0",
+    "underlying_token0",
+    "last_underlying_token0",
+    "tvl_token0",
+)
+TOKEN1_FIELDS = tuple(x.replace("token0", "token1") for x in TOKEN0_FIELDS)
+# share quantities ( scaled by the hypervisor decimals )
+SHARES_FIELDS = ("shares_qtty",)
+INT_FIELDS = (
+    "timestamp",
+    "block",
+    "logIndex",
+    "secPassed",
+    "fees_uncollected_secPassed",
+)
+STR_FIELDS = ("topic", "address", "hypervisor_address", "raw_operation")
+# any other field is a float64 column ( usd values, prices, percentages and cross token conversions )
+
+
+class user_status_columns:
+    """Columnar view of the user status of all accounts of a hypervisor.
+
+    Every user_status field is a numpy array with one row per account:
+        token and share quantities are exact fixed point integers ( python ints in object arrays,
+        as 18 decimals overflow int64 ), usd values, prices and percentages are float64.
+    Operations applied to all accounts at once ( fee sharing, globals ) are single array operations.
+    Columns are loaded when first used and only the ones set are written back to the
+    user_status objects ( as Decimal ), so untouched fields keep their exact values.
+    """
+
+    def __init__(
+        self,
+        statuses: list,
+        decimals_token0: int,
+        decimals_token1: int,
+        decimals_contract: int,
+    ):
+        """
+        Args:
+            statuses (list[user_status]): one status per account ( rows )
+            decimals_token0 (int):
+            decimals_token1 (int):
+            decimals_contract (int): hypervisor share decimals
+        """
+        self._statuses = statuses
+        self._scales = {
+            **{x: 10**decimals_token0 for x in TOKEN0_FIELDS},
+            **{x: 10**decimals_token1 for x in TOKEN1_FIELDS},
+            **{x: 10**decimals_contract for x in SHARES_FIELDS},
+        }
+        self.scale_token0 = 10**decimals_token0
+        self.scale_token1 = 10**decimals_token1
+        self.scale_shares = 10**decimals_contract
+
+        self.columns: dict[str, np.ndarray] = {}
+        # fields set by operations ( written back )
+        self._modified: set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._statuses)
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        if field not in self.columns:
+            self.columns[field] = self._load(field)
+        return self.columns[field]
+
+    def __setitem__(self, field: str, values: np.ndarray):
+        self.columns[field] = values
+        self._modified.add(field)
+
+    def _load(self, field: str) -> np.ndarray:
+        """user_status field values to a column"""
+        values = [getattr(x, field) for x in self._statuses]
+        if field in self._scales:
+            return np.array(
+                [self.to_fixed(x, self._scales[field]) for x in values],
+                dtype=object,
+            )
+        elif field in INT_FIELDS:
+            return np.array(values, dtype=np.int64)
+        elif field in STR_FIELDS:
+            return np.array(values, dtype=object)
+        return np.array([float(x) for x in values], dtype=np.float64)
+
+    # conversions
+    @staticmethod
+    def to_fixed(value: Decimal | int | float, scale: int) -> int:
+        """Decimal quantity to fixed point integer"""
+        return int((Decimal(value) * scale).to_integral_value())
+
+    def write(self) -> list:
+        """Write the columns set by operations back to the user_status objects ( as Decimal )
+
+        Returns:
+            list[user_status]: updated statuses
+        """
+        for field in self._modified:
+            values = self.columns[field]
+            if field in self._scales:
+                scale = Decimal(self._scales[field])
+                values = [Decimal(x) / scale for x in values]
+            elif field in INT_FIELDS:
+                values = values.tolist()
+            elif field not in STR_FIELDS:
+                values = [Decimal(repr(x)) for x in values.tolist()]
+            for status, value in zip(self._statuses, values):
+                setattr(status, field, value)
+
+        return self._statuses
+
+    # operations
+    def share_fees(
+        self,
+        fees_token0: int,
+        fees_token1: int,
+        total_shares: int,
+        price_usd_t0: float,
+        price_usd_t1: float,
+    ) -> np.ndarray:
+        """Share collected fees between all accounts, pro rata to their shares
+
+        Args:
+            fees_token0 (int): fees collected ( fixed point )
+            fees_token1 (int): fees collected ( fixed point )
+            total_shares (int): hypervisor shares ( fixed point )
+            price_usd_t0 (float):
+            price_usd_t1 (float):
+
+        Returns:
+            np.ndarray: float64 share of each account
+        """
+        shares = self["shares_qtty"]
+        user_share = (shares / total_shares).astype(np.float64)
+
+        self["fees_collected_token0"] = (
+            self["fees_collected_token0"] + fees_token0 * shares // total_shares
+        )
+        self["fees_collected_token1"] = (
+            self["fees_collected_token1"] + fees_token1 * shares // total_shares
+        )
+        self["total_fees_collected_in_usd"] = (
+            self["total_fees_collected_in_usd"]
+            + (
+                fees_token0 / self.scale_token0 * price_usd_t0
+                + fees_token1 / self.scale_token1 * price_usd_t1
+            )
+            * user_share
+        )
+
+        return user_share
+
+    def add_globals(
+        self,
+        last_timestamps: np.ndarray,
+        price_usd_t0: float,
+        price_usd_t1: float,
+        current_status_data: dict,
+        total_shares: int,
+    ):
+        """Set prices, positions and results of all accounts at the hypervisor status
+            ( columnar version of user_status_hypervisor_builder._add_globals_to_user_status,
+             for accounts with a previous status )
+
+        Args:
+            last_timestamps (np.ndarray): int64 timestamp of each account previous status
+            price_usd_t0 (float):
+            price_usd_t1 (float):
+            current_status_data (dict): hypervisor status ( converted to decimal )
+            total_shares (int): hypervisor shares ( fixed point )
+        """
+        c = self
+        # token1 per token0 and vice versa ( zero when a price is unknown )
+        t1_in_t0 = price_usd_t1 / price_usd_t0 if price_usd_t0 else 0.0
+        t0_in_t1 = price_usd_t0 / price_usd_t1 if price_usd_t1 else 0.0
+
+        # proportional hypervisor quantity ( fixed point ) of each account
+        shares = c["shares_qtty"]
+
+        def _pro_rata(value: Decimal, scale: int) -> np.ndarray:
+            if total_shares == 0:
+                return np.zeros(len(self), dtype=object)
+            return self.to_fixed(value, scale) * shares // total_shares
+
+        def _in_usd(token0: np.ndarray, token1: np.ndarray) -> np.ndarray:
+            return (
+                self._to_float(token0, self.scale_token0) * price_usd_t0
+                + self._to_float(token1, self.scale_token1) * price_usd_t1
+            )
+
+        def _in_token0(token0: np.ndarray, token1: np.ndarray) -> np.ndarray:
+            return (
+                self._to_float(token0, self.scale_token0)
+                + self._to_float(token1, self.scale_token1) * t1_in_t0
+            )
+
+        def _in_token1(token0: np.ndarray, token1: np.ndarray) -> np.ndarray:
+            return (
+                self._to_float(token1, self.scale_token1)
+                + self._to_float(token0, self.scale_token0) * t0_in_t1
+            )
+
+        # prices
+        c["usd_price_token0"] = np.full(len(self), price_usd_t0, dtype=np.float64)
+        c["usd_price_token1"] = np.full(len(self), price_usd_t1, dtype=np.float64)
+
+        # last underlying values
+        c["last_underlying_token0"] = c["underlying_token0"]
+        c["last_underlying_token1"] = c["underlying_token1"]
+        c["last_total_underlying_in_usd"] = c["total_underlying_in_usd"]
+        c["last_total_underlying_in_token0"] = c["total_underlying_in_token0"]
+        c["last_total_underlying_in_token1"] = c["total_underlying_in_token1"]
+
+        c["shares_percent"] = (
+            (shares / total_shares).astype(np.float64)
+            if total_shares
+            else np.zeros(len(self), dtype=np.float64)
+        )
+
+        # uncollected and owed fees
+        c["fees_uncollected_token0"] = _pro_rata(
+            current_status_data["fees_uncollected"]["qtty_token0"], self.scale_token0
+        )
+        c["fees_uncollected_token1"] = _pro_rata(
+            current_status_data["fees_uncollected"]["qtty_token1"], self.scale_token1
+        )
+        c["total_fees_uncollected_in_usd"] = _in_usd(
+            c["fees_uncollected_token0"], c["fees_uncollected_token1"]
+        )
+        c["fees_owed_token0"] = _pro_rata(
+            current_status_data["tvl"]["fees_owed_token0"], self.scale_token0
+        )
+        c["fees_owed_token1"] = _pro_rata(
+            current_status_data["tvl"]["fees_owed_token1"], self.scale_token1
+        )
+        c["total_fees_owed_in_usd"] = _in_usd(
+            c["fees_owed_token0"], c["fees_owed_token1"]
+        )
+
+        # seconds passed since the previous status:
+        #   reports accumulate uncollected fees secs, other operations restart them
+        elapsed = c["timestamp"] - last_timestamps
+        c["fees_uncollected_secPassed"] = np.where(
+            c["topic"] == "report", c["fees_uncollected_secPassed"] + elapsed, elapsed
+        )
+        c["secPassed"] = c["secPassed"] + elapsed
+
+        # total value locked
+        c["tvl_token0"] = _pro_rata(
+            current_status_data["totalAmounts"]["total0"], self.scale_token0
+        )
+        c["tvl_token1"] = _pro_rata(
+            current_status_data["totalAmounts"]["total1"], self.scale_token1
+        )
+        c["total_tvl_in_usd"] = _in_usd(c["tvl_token0"], c["tvl_token1"])
+        c["total_tvl_in_token0"] = _in_token0(c["tvl_token0"], c["tvl_token1"])
+        c["total_tvl_in_token1"] = _in_token1(c["tvl_token0"], c["tvl_token1"])
+
+        # underlying tokens ( tvl + uncollected fees )
+        c["underlying_token0"] = c["tvl_token0"] + c["fees_uncollected_token0"]
+        c["underlying_token1"] = c["tvl_token1"] + c["fees_uncollected_token1"]
+        c["total_underlying_in_usd"] = _in_usd(
+            c["underlying_token0"], c["underlying_token1"]
+        )
+        c["total_underlying_in_token0"] = _in_token0(
+            c["underlying_token0"], c["underlying_token1"]
+        )
+        c["total_underlying_in_token1"] = _in_token1(
+            c["underlying_token0"], c["underlying_token1"]
+        )
+
+        # current absolute result
+        c["current_result_token0"] = (
+            c["underlying_token0"] - c["investment_qtty_token0"]
+        )
+        c["current_result_token1"] = (
+            c["underlying_token1"] - c["investment_qtty_token1"]
+        )
+        c["total_current_result_in_usd"] = (
+            c["total_underlying_in_usd"] - c["total_investment_qtty_in_usd"]
+        )
+        c["total_current_result_in_token0"] = (
+            c["total_underlying_in_token0"] - c["total_investment_qtty_in_token0"]
+        )
+        c["total_current_result_in_token1"] = (
+            c["total_underlying_in_token1"] - c["total_investment_qtty_in_token1"]
+        )
+
+        # comparison results ( impermanent )
+        c["impermanent_lp_vs_hodl_usd"] = (
+            c["total_underlying_in_usd"] - c["total_investment_qtty_in_usd"]
+        )
+        c["impermanent_lp_vs_hodl_token0"] = (
+            c["total_underlying_in_usd"]
+            - c["total_investment_qtty_in_token0"] * price_usd_t0
+        )
+        c["impermanent_lp_vs_hodl_token1"] = (
+            c["total_underlying_in_usd"]
+            - c["total_investment_qtty_in_token1"] * price_usd_t1
+        )
+
+    @staticmethod
+    def _to_float(values: np.ndarray, scale: int) -> np.ndarray:
+        """fixed point column to float64"""
+        return (values / scale).astype(np.float64)
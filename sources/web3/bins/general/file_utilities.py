@@ -4,6 +4,7 @@ import os
 import datetime as dt
 import logging
 import csv
+import functools
 
 from pathlib import Path
 
@@ -46,6 +47,31 @@ def load_json(filename: str, folder_path: str):
     return None
 
 
+@functools.lru_cache(maxsize=None)
+def load_abi(filename: str, folder_path: str) -> list | None:
+    """Load a contract ABI once per process ( plain json decoding: ABIs have no dates )
+
+    Args:
+       filename (str): file name without extension
+       folder_path (str): folder path name
+
+    Returns:
+       list | None: shared ABI ( do not modify ) or None when not found
+    """
+    path_to_file = "{}/{}.json".format(folder_path, filename)  # full filename
+    if os.path.exists(path_to_file):
+        with open(path_to_file, "r") as f:
+            try:
+                return json.load(f)
+            except Exception:
+                logging.getLogger(__name__).exception(
+                    "Unexpected error while loading {} abi file    .error: {}".format(
+                        path_to_file, sys.exc_info()[0]
+                    )
+                )
+    return None
+
+
 def save_json(filename: str, data, folder_path: str) -> bool:
     """Save json to file path
 
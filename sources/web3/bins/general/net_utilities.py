@@ -1,3 +1,4 @@
+import asyncio
 import sys
 import datetime as dt
 import requests
@@ -142,3 +143,24 @@ class rate_limit:
 
         # keep track
         self.hit()
+
+
+class async_rate_limit:
+    def __init__(self, rate_max_sec: float):
+        """Spread async queries so that no more than rate_max_sec start each second
+           ( waiting callers sleep without blocking the event loop )
+
+        Args:
+            rate_max_sec (float): queries per second budget
+        """
+        self.rate_max_sec: float = rate_max_sec
+        # next time a query may start ( monotonic clock )
+        self._next_slot: float = 0.0
+
+    async def continue_when_safe(self):
+        """Wait here till there is budget for one more query"""
+        now = time.monotonic()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + 1 / self.rate_max_sec
+        if slot > now:
+            await asyncio.sleep(slot - now)
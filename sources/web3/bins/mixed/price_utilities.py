@@ -1,13 +1,23 @@
+import asyncio
+import concurrent.futures
 import contextlib
+import functools
 import sys
 import logging
 from sources.web3.bins.cache import cache_utilities
 from sources.web3.bins.apis import thegraph_utilities, coingecko_utilities
 from sources.web3.bins.configuration import CONFIGURATION
 from sources.web3.bins.database.common.db_collections_common import database_global
+from sources.common.database import collection_endpoint
+from sources.subgraph.bins.config import MONGO_DB_URL
 
 LOG_NAME = "price"
 
+# price sources workers: cancelled queries finish in the background without delaying callers
+PRICE_SOURCES_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+    max_workers=32, thread_name_prefix="price_sources"
+)
+
 
 class price_scraper:
     def __init__(
@@ -60,6 +70,38 @@ class price_scraper:
         """
         return: price_usd_token
         """
+        coroutine = self.get_price_async(
+            network=network, token_id=token_id, block=block, of=of
+        )
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coroutine)
+
+        # called from a running event loop: do not block it with a nested loop
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, coroutine).result()
+
+    async def get_price_async(
+        self,
+        network: str,
+        token_id: str,
+        block: int = 0,
+        of: str = "USD",
+        deadline: float | None = None,
+    ) -> float:
+        """Query all candidate thegraph connectors at the same time, returning the first valid price found
+           ( remaining queries are cancelled ) and falling back to coingecko
+
+        Args:
+            network (str):
+            token_id (str): token address
+            block (int, optional): . Defaults to 0 ( current price ).
+            of (str, optional): . Defaults to "USD".
+            deadline (float | None, optional): seconds to wait for thegraph connectors. Defaults to WEB3_PRICE_DEADLINE configuration.
+
+        return: price_usd_token
+        """
 
         # result var
         _price = None
@@ -76,29 +118,14 @@ class price_scraper:
             _price = None
 
         if _price in [None, 0]:
-            # get a list of thegraph_connectors
-            thegraph_connectors = self._get_connector_candidates(
-                network=network, block=block
+            _price = await self._get_price_from_thegraph_connectors(
+                network=network,
+                token_id=token_id,
+                block=block,
+                of=of,
+                deadline=deadline or CONFIGURATION["WEB3_PRICE_DEADLINE"],
             )
 
-            for dex, connector in thegraph_connectors.items():
-                logging.getLogger(LOG_NAME).debug(
-                    f" Trying to get {network}'s token {token_id} price at block {block} from {dex} subgraph"
-                )
-                with contextlib.suppress(Exception):
-                    _price = self._get_price_from_thegraph(
-                        thegraph_connector=connector,
-                        dex=dex,
-                        network=network,
-                        token_id=token_id,
-                        block=block,
-                        of=of,
-                    )
-
-                    if _price not in [None, 0]:
-                        # exit for loop
-                        break
-
         # coingecko
         if (
             self.coingecko
@@ -111,7 +138,14 @@ class price_scraper:
             )
 
             try:
-                _price = self._get_price_from_coingecko(network, token_id, block, of)
+                _price = await asyncio.get_running_loop().run_in_executor(
+                    PRICE_SOURCES_EXECUTOR,
+                    self._get_price_from_coingecko,
+                    network,
+                    token_id,
+                    block,
+                    of,
+                )
             except Exception:
                 logging.getLogger(LOG_NAME).debug(
                     f" Could not get {network}'s token {token_id} price at block {block} from coingecko."
@@ -156,6 +190,320 @@ class price_scraper:
         # return result
         return _price
 
+    def get_prices(
+        self, items: list[tuple[str, str, int]], of: str = "USD"
+    ) -> dict[tuple[str, str, int], float]:
+        """Get multiple token prices at once
+
+        Args:
+            items (list[tuple[str, str, int]]): [(<network>, <token address>, <block>), ...]
+            of (str, optional): . Defaults to "USD".
+
+        Returns:
+            dict[tuple[str, str, int], float]: { (<network>, <lower case token address>, <block>): <price> } of prices found
+        """
+        coroutine = self.get_prices_async(items=items, of=of)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coroutine)
+
+        # called from a running event loop: do not block it with a nested loop
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, coroutine).result()
+
+    async def get_prices_async(
+        self,
+        items: list[tuple[str, str, int]],
+        of: str = "USD",
+        deadline: float | None = None,
+    ) -> dict[tuple[str, str, int], float]:
+        """Get multiple token prices at once, resolving each source's misses with the next one:
+            cache -> one database query -> aliased thegraph queries grouped by block ( one per connector ) -> coingecko
+
+        Args:
+            items (list[tuple[str, str, int]]): [(<network>, <token address>, <block>), ...]  ( block 0 = current price )
+            of (str, optional): . Defaults to "USD".
+            deadline (float | None, optional): seconds to wait for thegraph connectors. Defaults to WEB3_PRICE_DEADLINE configuration.
+
+        Returns:
+            dict[tuple[str, str, int], float]: { (<network>, <lower case token address>, <block>): <price> } of prices found
+        """
+        if of != "USD":
+            raise NotImplementedError(
+                f" Cannot find {of} price method to be gathered from"
+            )
+
+        result = {}
+        missing = []
+        for key in dict.fromkeys((x[0], x[1].lower(), int(x[2])) for x in items):
+            # try return price from cached values
+            try:
+                _price = self.cache.get_data(
+                    chain_id=key[0], address=key[1], block=key[2], key=of
+                )
+            except Exception:
+                _price = None
+            if _price in [None, 0]:
+                missing.append(key)
+            else:
+                result[key] = _price
+
+        cached = set(result)
+
+        # database ( current prices are never saved )
+        if db_items := [(x[0], x[2], x[1]) for x in missing if x[2]]:
+            try:
+                for price in await collection_endpoint.database_global(
+                    mongo_url=MONGO_DB_URL
+                ).get_prices_usd(items=db_items):
+                    result[
+                        (price["network"], price["address"], int(price["block"]))
+                    ] = price["price"]
+            except Exception as e:
+                logging.getLogger(LOG_NAME).debug(
+                    f" Unable to read {len(db_items)} prices from database: {e}"
+                )
+        missing = [x for x in missing if x not in result]
+
+        # thegraph
+        if missing:
+            result.update(
+                await self._get_prices_from_thegraph_connectors(
+                    keys=missing,
+                    deadline=deadline or CONFIGURATION["WEB3_PRICE_DEADLINE"],
+                )
+            )
+            missing = [x for x in missing if x not in result]
+
+        # coingecko
+        if self.coingecko and (
+            missing := [
+                x for x in missing if x[0] in self.coingecko_price_connector.networks
+            ]
+        ):
+            loop = asyncio.get_running_loop()
+            for key, _price in zip(
+                missing,
+                await asyncio.gather(
+                    *[
+                        loop.run_in_executor(
+                            PRICE_SOURCES_EXECUTOR,
+                            self._get_price_from_coingecko,
+                            key[0],
+                            key[1],
+                            key[2],
+                            of,
+                        )
+                        for key in missing
+                    ],
+                    return_exceptions=True,
+                ),
+            ):
+                if type(_price) == dict:
+                    _price = _price.get(key[1], {}).get("usd", 0)
+                if isinstance(_price, (int, float)) and _price > 0:
+                    result[key] = _price
+
+        # SAVE CACHE
+        if self.cache != None:
+            for (network, token_id, block), _price in result.items():
+                if (network, token_id, block) in cached:
+                    continue
+                self.cache.add_data(
+                    chain_id=network,
+                    address=token_id,
+                    block=block,
+                    key=of,
+                    data=_price,
+                    save2file=True,
+                )
+
+        logging.getLogger(LOG_NAME).debug(
+            f" {len(result)} of {len(set(result) | set(missing))} prices found"
+        )
+
+        return result
+
+    async def _get_prices_from_thegraph_connectors(
+        self, keys: list[tuple[str, str, int]], deadline: float
+    ) -> dict[tuple[str, str, int], float]:
+        """Query every thegraph connector of each network concurrently, with one aliased query per block group
+
+        Args:
+            keys (list[tuple[str, str, int]]): [(<network>, <lower case token address>, <block>), ...]
+            deadline (float): seconds to wait for connectors
+
+        Returns:
+            dict[tuple[str, str, int], float]: prices found, preferring the first connector defined
+        """
+        # group tokens by network and block
+        tokens_by_block = {}
+        for network, token_id, block in keys:
+            tokens_by_block.setdefault(network, {}).setdefault(block, []).append(
+                token_id
+            )
+
+        loop = asyncio.get_running_loop()
+        tasks = {
+            loop.run_in_executor(
+                PRICE_SOURCES_EXECUTOR,
+                functools.partial(
+                    self._get_prices_from_connector,
+                    thegraph_connector=connector,
+                    dex=dex,
+                    network=network,
+                    tokens_by_block=network_tokens,
+                ),
+            ): dex
+            for dex, connector in self.thegraph_connectors.items()
+            for network, network_tokens in tokens_by_block.items()
+            if network in connector.networks
+        }
+        if not tasks:
+            return {}
+
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+        # cancel late connectors ( running requests end in their worker threads and are discarded )
+        for task in pending:
+            task.cancel()
+        if pending:
+            logging.getLogger(LOG_NAME).debug(
+                f" thegraph connectors {[tasks[x] for x in pending]} did not return prices within {deadline} seconds"
+            )
+
+        # merge following connectors definition order
+        result = {}
+        dex_order = list(self.thegraph_connectors.keys())
+        for task in sorted(
+            done, key=lambda x: dex_order.index(tasks[x]), reverse=True
+        ):
+            if not task.cancelled() and task.exception() is None:
+                result.update(task.result())
+        return result
+
+    def _get_prices_from_connector(
+        self,
+        thegraph_connector,
+        dex: str,
+        network: str,
+        tokens_by_block: dict[int, list[str]],
+    ) -> dict[tuple[str, str, int], float]:
+        """Get prices from a thegraph connector at the blocks it has indexed
+
+        Returns:
+            dict[tuple[str, str, int], float]: prices found
+        """
+        last_block = thegraph_connector._get_last_block(
+            network=network, query_name="tokens"
+        )
+        tokens_by_block = {
+            block: tokens
+            for block, tokens in tokens_by_block.items()
+            if not block or block <= last_block
+        }
+        if not tokens_by_block:
+            return {}
+
+        logging.getLogger(LOG_NAME).debug(
+            f" Trying to get {network}'s token prices at {len(tokens_by_block)} blocks from {dex} subgraph"
+        )
+        result = {}
+        for block, tokens_data in thegraph_connector.get_tokens_at_blocks(
+            network=network, tokens_by_block=tokens_by_block
+        ).items():
+            for token_data in tokens_data:
+                try:
+                    if _price := self._token_price_usd(token_data):
+                        result[(network, token_data["id"].lower(), block)] = _price
+                except Exception:
+                    logging.getLogger(LOG_NAME).debug(
+                        f" Can't get price of {network}'s token {token_data.get('id')} at block {block} from {dex} subgraph   data:{token_data}"
+                    )
+        return result
+
+    async def _get_price_from_thegraph_connectors(
+        self, network: str, token_id: str, block: int, of: str, deadline: float
+    ) -> float | None:
+        """Query every thegraph connector of the network concurrently
+
+        Returns:
+            float | None: first valid price found before the deadline
+        """
+        loop = asyncio.get_running_loop()
+        tasks = {
+            loop.run_in_executor(
+                PRICE_SOURCES_EXECUTOR,
+                functools.partial(
+                    self._get_price_from_connector,
+                    thegraph_connector=connector,
+                    dex=dex,
+                    network=network,
+                    token_id=token_id,
+                    block=block,
+                    of=of,
+                ),
+            ): dex
+            for dex, connector in self.thegraph_connectors.items()
+            if network in connector.networks
+        }
+
+        _price = None
+        pending = set(tasks)
+        end_time = loop.time() + deadline
+        try:
+            while pending and _price in [None, 0]:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=max(0, end_time - loop.time()),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    logging.getLogger(LOG_NAME).debug(
+                        f" thegraph connectors {[tasks[x] for x in pending]} did not return {network}'s token {token_id} price at block {block} within {deadline} seconds"
+                    )
+                    break
+                for task in done:
+                    if not task.cancelled() and task.exception() is None:
+                        if task.result() not in [None, 0]:
+                            _price = task.result()
+                            break
+        finally:
+            # cancel losers ( running requests end in their worker threads and are discarded )
+            for task in pending:
+                task.cancel()
+
+        return _price
+
+    def _get_price_from_connector(
+        self,
+        thegraph_connector,
+        dex: str,
+        network: str,
+        token_id: str,
+        block: int,
+        of: str,
+    ) -> float:
+        """Get price from a thegraph connector when it has indexed the block"""
+        logging.getLogger(LOG_NAME).debug(
+            f" Trying to get {network}'s token {token_id} price at block {block} from {dex} subgraph"
+        )
+        if (
+            block
+            and thegraph_connector._get_last_block(network=network, query_name="tokens")
+            < block
+        ):
+            return 0
+
+        return self._get_price_from_thegraph(
+            thegraph_connector=thegraph_connector,
+            dex=dex,
+            network=network,
+            token_id=token_id,
+            block=block,
+            of=of,
+        )
+
     def _get_price_from_thegraph(
         self,
         thegraph_connector,
@@ -180,11 +528,12 @@ class price_scraper:
                 query_name="tokens",
                 where=_where_query,
                 block=_block_query,
+                shards=1,
             )
         else:
             # get current block price
             _data = thegraph_connector.get_all_results(
-                network=network, query_name="tokens", where=_where_query
+                network=network, query_name="tokens", where=_where_query, shards=1
             )
 
         # process query
@@ -193,26 +542,7 @@ class price_scraper:
             _data = _data[0]
 
             token_symbol = _data["symbol"]
-            # decide what to use to get to price ( value or volume )
-            if (
-                float(_data["totalValueLockedUSD"]) > 0
-                and float(_data["totalValueLocked"]) > 0
-            ):
-                # get unit usd price from value locked
-                _price = float(_data["totalValueLockedUSD"]) / float(
-                    _data["totalValueLocked"]
-                )
-            elif (
-                "volume" in _data
-                and float(_data["volume"]) > 0
-                and "volumeUSD" in _data
-                and float(_data["volumeUSD"]) > 0
-            ):
-                # get unit usd price from volume
-                _price = float(_data["volumeUSD"]) / float(_data["volume"])
-            else:
-                # no way
-                _price = 0
+            _price = self._token_price_usd(_data)
 
             # TODO: decide on certain circumstances (DAI USDC...)
             # if _price == 0:
@@ -280,6 +610,37 @@ class price_scraper:
         return _price
 
     # HELPERS
+    @staticmethod
+    def _token_price_usd(token_data: dict) -> float:
+        """unit usd price of a thegraph token item
+
+        Args:
+            token_data (dict): thegraph token item
+
+        Returns:
+            float: price ( zero when it can't be calculated )
+        """
+        # decide what to use to get to price ( value or volume )
+        if (
+            float(token_data["totalValueLockedUSD"]) > 0
+            and float(token_data["totalValueLocked"]) > 0
+        ):
+            # get unit usd price from value locked
+            return float(token_data["totalValueLockedUSD"]) / float(
+                token_data["totalValueLocked"]
+            )
+        elif (
+            "volume" in token_data
+            and float(token_data["volume"]) > 0
+            and "volumeUSD" in token_data
+            and float(token_data["volumeUSD"]) > 0
+        ):
+            # get unit usd price from volume
+            return float(token_data["volumeUSD"]) / float(token_data["volume"])
+
+        # no way
+        return 0
+
     def _convert_block_to_timestamp(self, network: str, block: int) -> int:
         # try database
         with contextlib.suppress(Exception):
@@ -293,7 +654,10 @@ class price_scraper:
         # try thegraph
         try:
             block_data = self.thegraph_block_connector.get_all_results(
-                network=network, query_name="blocks", where=f""" number: "{block}" """
+                network=network,
+                query_name="blocks",
+                where=f""" number: "{block}" """,
+                shards=1,
             )[0]
 
             return block_data["timestamp"]
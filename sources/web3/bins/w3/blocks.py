@@ -0,0 +1,330 @@
+import asyncio
+import bisect
+import logging
+import math
+
+from web3 import AsyncWeb3
+
+from sources.common.database.collection_endpoint import database_global
+from sources.subgraph.bins.config import MONGO_DB_URL
+
+
+class block_timestamp_index:
+    """Process-wide block <-> timestamp index.
+
+    Known (block, timestamp) pairs are kept in memory per network, sorted by block
+    ( timestamps never decrease with block numbers, so both lists are sorted ).
+    Lookups use memory first, then the database `blocks` collection and only then the
+    network, interpolating between the closest known blocks. Every block retrieved from
+    the network is kept in memory and saved to the database.
+    """
+
+    def __init__(self, mongo_url: str | None = None) -> None:
+        """
+        Args:
+            mongo_url (str | None, optional): global database url. Defaults to None ( memory and network only ).
+        """
+        self._mongo_url = mongo_url
+        # known blocks and timestamps by network:  { <network>: [<block>, ...] }
+        self._blocks: dict[str, list[int]] = {}
+        self._timestamps: dict[str, list[int]] = {}
+        # database saving tasks ( keep a reference till done )
+        self._tasks: set[asyncio.Task] = set()
+
+    # PUBLIC
+    def add(self, network: str, block: int, timestamp: int) -> bool:
+        """Add a known block to the index
+
+        Returns:
+            bool: False when the block was already known
+        """
+        blocks = self._blocks.setdefault(network, [])
+        timestamps = self._timestamps.setdefault(network, [])
+
+        idx = bisect.bisect_left(blocks, block)
+        if idx < len(blocks) and blocks[idx] == block:
+            return False
+        blocks.insert(idx, block)
+        timestamps.insert(idx, timestamp)
+        return True
+
+    async def timestamp_from_block(self, w3: AsyncWeb3, network: str, block: int) -> int:
+        """Timestamp of a block
+
+        Args:
+            w3 (AsyncWeb3): network connection, used when the block is not known
+            network (str): network name
+            block (int): block number
+
+        Returns:
+            int: timestamp
+        """
+        # memory
+        blocks = self._blocks.get(network, [])
+        idx = bisect.bisect_left(blocks, block)
+        if idx < len(blocks) and blocks[idx] == block:
+            return self._timestamps[network][idx]
+
+        # database
+        if self._mongo_url:
+            try:
+                if items := await database_global(
+                    mongo_url=self._mongo_url
+                ).get_timestamp(network=network, block=block):
+                    self.add(
+                        network=network,
+                        block=block,
+                        timestamp=int(items[0]["timestamp"]),
+                    )
+                    return int(items[0]["timestamp"])
+            except Exception as e:
+                logging.getLogger(__name__).debug(
+                    f" Unable to read {network} block {block} timestamp from database: {e}"
+                )
+
+        # network
+        new_blocks = []
+        block_data = await self._get_block(
+            w3=w3, network=network, block=block, new_blocks=new_blocks
+        )
+        self._save(network=network, blocks=new_blocks)
+        return block_data[1]
+
+    async def block_from_timestamp(
+        self,
+        w3: AsyncWeb3,
+        network: str,
+        timestamp: int,
+        inexact_mode: str = "before",
+        eq_timestamp_position: str = "first",
+    ) -> int:
+        """Block number of a timestamp
+
+        Args:
+            w3 (AsyncWeb3): network connection, used when the index has no close enough blocks
+            network (str): network name
+            timestamp (int): timestamp
+            inexact_mode (str, optional): "before" or "after" -> when no block has the exact timestamp, choose the closest block before or after it. Defaults to "before".
+            eq_timestamp_position (str, optional): "first" or "last" block to choose when a timestamp corresponds to multiple blocks. Defaults to "first".
+
+        Returns:
+            int: block number
+        """
+        if int(timestamp) == 0:
+            raise ValueError("Timestamp cannot be zero!")
+        if inexact_mode not in ("before", "after"):
+            raise ValueError(f" Inexact method chosen is not valid:->  {inexact_mode}")
+
+        new_blocks = []
+        try:
+            # first block with timestamp >= objective
+            first = await self._find_first_block(
+                w3=w3,
+                network=network,
+                timestamp=timestamp,
+                strict=False,
+                new_blocks=new_blocks,
+            )
+            if first is None:
+                # objective is after the last block: return the latest block
+                logging.getLogger(__name__).warning(
+                    f" Timestamp {timestamp} is greater than the last {network} block timestamp"
+                )
+                return self._blocks[network][-1]
+
+            first_timestamp = self._timestamps[network][
+                bisect.bisect_left(self._blocks[network], first)
+            ]
+
+            if first_timestamp != timestamp:
+                # inexact
+                return max(1, first - 1) if inexact_mode == "before" else first
+
+            if eq_timestamp_position == "last":
+                # last block with timestamp == objective
+                after = await self._find_first_block(
+                    w3=w3,
+                    network=network,
+                    timestamp=timestamp,
+                    strict=True,
+                    new_blocks=new_blocks,
+                )
+                return (after - 1) if after else self._blocks[network][-1]
+
+            return first
+
+        finally:
+            self._save(network=network, blocks=new_blocks)
+
+    # SEARCH
+    def _bracket(
+        self, network: str, timestamp: int, strict: bool
+    ) -> tuple[tuple[int, int] | None, tuple[int, int] | None]:
+        """Closest known blocks around a timestamp
+
+        Args:
+            strict (bool): upper block timestamp must be greater than ( instead of greater or equal to ) timestamp
+
+        Returns:
+            tuple[tuple[int, int] | None, tuple[int, int] | None]: lower and upper (block, timestamp)
+        """
+        blocks = self._blocks.get(network, [])
+        timestamps = self._timestamps.get(network, [])
+
+        idx = (bisect.bisect_right if strict else bisect.bisect_left)(
+            timestamps, timestamp
+        )
+        lower = (blocks[idx - 1], timestamps[idx - 1]) if idx > 0 else None
+        upper = (blocks[idx], timestamps[idx]) if idx < len(blocks) else None
+        return lower, upper
+
+    @staticmethod
+    def _is_resolved(
+        lower: tuple[int, int] | None, upper: tuple[int, int] | None
+    ) -> bool:
+        return bool(
+            (lower and upper and upper[0] - lower[0] <= 1)
+            or (upper and upper[0] <= 1)
+        )
+
+    async def _find_first_block(
+        self,
+        w3: AsyncWeb3,
+        network: str,
+        timestamp: int,
+        strict: bool,
+        new_blocks: list[tuple[int, int]],
+    ) -> int | None:
+        """First block with timestamp >= objective ( > when strict )
+
+        Returns:
+            int | None: block number or None when all blocks are lower than the objective
+        """
+
+        def _is_upper(block_timestamp: int) -> bool:
+            return (
+                block_timestamp > timestamp if strict else block_timestamp >= timestamp
+            )
+
+        # memory
+        lower, upper = self._bracket(network=network, timestamp=timestamp, strict=strict)
+
+        # database
+        if not self._is_resolved(lower, upper) and self._mongo_url:
+            await self._load_database_anchors(
+                network=network, timestamp=timestamp, strict=strict
+            )
+            lower, upper = self._bracket(
+                network=network, timestamp=timestamp, strict=strict
+            )
+
+        # network limits
+        if upper is None:
+            latest = await self._get_block(
+                w3=w3, network=network, block="latest", new_blocks=new_blocks
+            )
+            if not _is_upper(latest[1]):
+                return None
+            upper = latest
+        if upper[0] <= 1:
+            return upper[0]
+        if lower is None:
+            first = await self._get_block(
+                w3=w3, network=network, block=1, new_blocks=new_blocks
+            )
+            if _is_upper(first[1]):
+                return 1
+            lower = first
+
+        # network search: interpolate between the known blocks, probing the candidate and its previous block.
+        #   fall back to bisection when interpolation does not halve the range
+        interpolate = True
+        while upper[0] - lower[0] > 1:
+            range_size = upper[0] - lower[0]
+            if interpolate:
+                candidate = lower[0] + math.ceil(
+                    (timestamp - lower[1])
+                    * (upper[0] - lower[0])
+                    / max(1, upper[1] - lower[1])
+                )
+            else:
+                candidate = lower[0] + range_size // 2
+            candidate = min(max(candidate, lower[0] + 1), upper[0] - 1)
+
+            for block_data in await asyncio.gather(
+                *[
+                    self._get_block(
+                        w3=w3, network=network, block=x, new_blocks=new_blocks
+                    )
+                    for x in {max(candidate - 1, lower[0] + 1), candidate}
+                ]
+            ):
+                if _is_upper(block_data[1]):
+                    if block_data[0] < upper[0]:
+                        upper = block_data
+                elif block_data[0] > lower[0]:
+                    lower = block_data
+
+            interpolate = (upper[0] - lower[0]) * 2 <= range_size
+
+        logging.getLogger(__name__).debug(
+            f" Took {len(new_blocks)} on-chain queries to find {network} block {upper[0]} of timestamp {timestamp}"
+        )
+        return upper[0]
+
+    async def _get_block(
+        self,
+        w3: AsyncWeb3,
+        network: str,
+        block: int | str,
+        new_blocks: list[tuple[int, int]],
+    ) -> tuple[int, int]:
+        """Get a block from the network and add it to the index
+
+        Returns:
+            tuple[int, int]: block number and timestamp
+        """
+        block_data = await w3.eth.get_block(block)
+        result = (block_data.number, block_data.timestamp)
+        if self.add(network=network, block=result[0], timestamp=result[1]):
+            new_blocks.append(result)
+        return result
+
+    # DATABASE
+    async def _load_database_anchors(self, network: str, timestamp: int, strict: bool):
+        """Add the database blocks closest to a timestamp to the index"""
+        try:
+            global_db = database_global(mongo_url=self._mongo_url)
+            for items in await asyncio.gather(
+                global_db.get_block_before_timestamp(
+                    network=network, timestamp=timestamp, inclusive=strict
+                ),
+                global_db.get_block_after_timestamp(
+                    network=network, timestamp=timestamp, inclusive=not strict
+                ),
+            ):
+                for item in items:
+                    self.add(
+                        network=network,
+                        block=int(item["block"]),
+                        timestamp=int(item["timestamp"]),
+                    )
+        except Exception as e:
+            logging.getLogger(__name__).debug(
+                f" Unable to read {network} blocks around timestamp {timestamp} from database: {e}"
+            )
+
+    def _save(self, network: str, blocks: list[tuple[int, int]]):
+        """Save blocks to database in the background"""
+        if not blocks or not self._mongo_url:
+            return
+        task = asyncio.create_task(
+            database_global(mongo_url=self._mongo_url).set_blocks(
+                network=network, blocks=blocks
+            )
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+BLOCK_INDEX = block_timestamp_index(mongo_url=MONGO_DB_URL)
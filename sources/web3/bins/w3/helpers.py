@@ -1,4 +1,6 @@
-import random
+import logging
+from typing import Any, Awaitable, Callable
+
 from sources.common.general.enums import Chain, Dex, ChainId
 from sources.mongo.bins.enums import enumsConverter
 
@@ -16,6 +18,7 @@ from sources.web3.bins.w3.objects.rewarders import (
 )
 from sources.web3.bins.w3.objects.basic import erc20
 from sources.web3.bins.configuration import STATIC_REGISTRY_ADDRESSES
+from sources.web3.bins.w3.router import RPC_ROUTER
 
 
 def build_hypervisor(
@@ -104,30 +107,24 @@ async def build_hypervisor_anyRpc(
     Returns:
         gamma_hypervisor:
     """
-    # shuffle the rpc urls
-    random.shuffle(rpcUrls)
-    # loop over the rpc urls
-    hypervisor = None
-    for rpcUrl in rpcUrls:
-        try:
-            # construct hype
-            hypervisor = build_hypervisor(
-                network=network,
-                dex=dex,
-                block=block,
-                hypervisor_address=hypervisor_address,
-                custom_web3Url=rpcUrl,
-            )
-            if test:
-                # working test
-                await hypervisor._contract.functions.fee().call()  # test fee without block
-            # return hype
-            break
-        except Exception as e:
-            # not working hype
-            print(f" error creating hype: {e} -> rpc: {rpcUrl}")
-    # return hype
-    return hypervisor
+
+    async def _build(rpcUrl: str) -> gamma_hypervisor:
+        # construct hype
+        hypervisor = build_hypervisor(
+            network=network,
+            dex=dex,
+            block=block,
+            hypervisor_address=hypervisor_address,
+            custom_web3Url=rpcUrl,
+        )
+        if test:
+            # working test
+            await hypervisor._contract.functions.fee().call()  # test fee without block
+        return hypervisor
+
+    return await _build_anyRpc(
+        build=_build, rpcUrls=rpcUrls, test=test, name="hypervisor"
+    )
 
 
 async def build_hypervisor_registry_anyRpc(
@@ -144,29 +141,23 @@ async def build_hypervisor_registry_anyRpc(
     Returns:
         gamma hype registry:
     """
-    # shuffle the rpc urls
-    random.shuffle(rpcUrls)
-    # loop over the rpc urls
-    registry = None
-    for rpcUrl in rpcUrls:
-        try:
-            # construct hype
-            registry = build_hypervisor_registry(
-                network=network,
-                dex=dex,
-                block=block,
-                custom_web3Url=rpcUrl,
-            )
-            if test:
-                # test its working
-                await registry._contract.functions.counter().call()
-            # return hype
-            break
-        except:
-            # not working hype
-            pass
 
-    return registry
+    async def _build(rpcUrl: str) -> gamma_hypervisor_registry:
+        # construct hype
+        registry = build_hypervisor_registry(
+            network=network,
+            dex=dex,
+            block=block,
+            custom_web3Url=rpcUrl,
+        )
+        if test and registry:
+            # test its working
+            await registry._contract.functions.counter().call()
+        return registry
+
+    return await _build_anyRpc(
+        build=_build, rpcUrls=rpcUrls, test=test, name="hypervisor registry"
+    )
 
 
 async def build_zyberchef_anyRpc(
@@ -180,29 +171,23 @@ async def build_zyberchef_anyRpc(
         test: (bool): if true, test the hype before returning it
 
     """
-    # shuffle the rpc urls
-    random.shuffle(rpcUrls)
-    # loop over the rpc urls
-    result = None
-    for rpcUrl in rpcUrls:
-        try:
-            # construct hype
-            result = zyberswap_masterchef_v1(
-                address=address,
-                network=network,
-                block=block,
-                custom_web3Url=rpcUrl,
-            )
-            if test:
-                # test its working
-                await result.poolLength
-            # return hype
-            break
-        except:
-            # not working hype
-            pass
 
-    return result
+    async def _build(rpcUrl: str) -> zyberswap_masterchef_v1:
+        # construct hype
+        result = zyberswap_masterchef_v1(
+            address=address,
+            network=network,
+            block=block,
+            custom_web3Url=rpcUrl,
+        )
+        if test:
+            # test its working
+            await result.poolLength
+        return result
+
+    return await _build_anyRpc(
+        build=_build, rpcUrls=rpcUrls, test=test, name="zyberswap masterchef"
+    )
 
 
 async def build_thena_voter_anyRpc(
@@ -211,91 +196,95 @@ async def build_thena_voter_anyRpc(
     result = None
     netval = enumsConverter.convert_general_to_local(chain=network).value
     if voter_url := STATIC_REGISTRY_ADDRESSES.get(netval, {}).get("thena_voter", None):
-        # shuffle the rpc urls
-        random.shuffle(rpcUrls)
-        # loop over the rpc urls
-
-        for rpcUrl in rpcUrls:
-            try:
-                # construct hype
-                result = thena_voter_v3(
-                    address=voter_url,
-                    network=netval,
-                    block=block,
-                    custom_web3Url=rpcUrl,
-                )
-                if test:
-                    # test its working
-                    await result.factoryLength
-                # return hype
-                break
-            except Exception as e:
-                # not working hype
-                print(f" error creating hype: {e} -> rpc: {rpcUrl}")
-                pass
-
-    return result
-
-
-async def build_thena_gauge_anyRpc(
-    address: str, network: Chain, block: int, rpcUrls: list[str], test: bool = False
-) -> thena_gauge_V2:
-    result = None
-    netval = enumsConverter.convert_general_to_local(chain=network).value
-    # shuffle the rpc urls
-    random.shuffle(rpcUrls)
-    # loop over the rpc urls
 
-    for rpcUrl in rpcUrls:
-        try:
+        async def _build(rpcUrl: str) -> thena_voter_v3:
             # construct hype
-            result = thena_gauge_V2(
-                address=address,
+            result = thena_voter_v3(
+                address=voter_url,
                 network=netval,
                 block=block,
                 custom_web3Url=rpcUrl,
             )
             if test:
                 # test its working
-                await result.lastUpdateTime
-            # return hype
-            break
-        except Exception as e:
-            # not working hype
-            # TODO: log this
-            print(f" error creating hype: {e} -> rpc: {rpcUrl}")
-            pass
+                await result.factoryLength
+            return result
+
+        result = await _build_anyRpc(
+            build=_build, rpcUrls=rpcUrls, test=test, name="thena voter"
+        )
 
     return result
 
 
+async def build_thena_gauge_anyRpc(
+    address: str, network: Chain, block: int, rpcUrls: list[str], test: bool = False
+) -> thena_gauge_V2:
+    netval = enumsConverter.convert_general_to_local(chain=network).value
+
+    async def _build(rpcUrl: str) -> thena_gauge_V2:
+        # construct hype
+        result = thena_gauge_V2(
+            address=address,
+            network=netval,
+            block=block,
+            custom_web3Url=rpcUrl,
+        )
+        if test:
+            # test its working
+            await result.lastUpdateTime
+        return result
+
+    return await _build_anyRpc(
+        build=_build, rpcUrls=rpcUrls, test=test, name="thena gauge"
+    )
+
+
 async def build_erc20_anyRpc(
     address: str, network: Chain, block: int, rpcUrls: list[str], test: bool = False
 ) -> erc20:
-    result = None
     netval = enumsConverter.convert_general_to_local(chain=network).value
-    # shuffle the rpc urls
-    random.shuffle(rpcUrls)
-    # loop over the rpc urls
 
-    for rpcUrl in rpcUrls:
-        try:
-            # construct hype
-            result = erc20(
-                address=address,
-                network=netval,
-                block=block,
-                custom_web3Url=rpcUrl,
-            )
-            if test:
-                # test its working
-                await result.decimals
-            # return hype
-            break
-        except Exception as e:
-            # not working hype
-            # TODO: log this
-            print(f" error creating erc20: {e} -> rpc: {rpcUrl}")
-            pass
+    async def _build(rpcUrl: str) -> erc20:
+        # construct hype
+        result = erc20(
+            address=address,
+            network=netval,
+            block=block,
+            custom_web3Url=rpcUrl,
+        )
+        if test:
+            # test its working
+            await result.decimals
+        return result
 
-    return result
+    return await _build_anyRpc(build=_build, rpcUrls=rpcUrls, test=test, name="erc20")
+
+
+async def _build_anyRpc(
+    build: Callable[[str], Awaitable[Any]],
+    rpcUrls: list[str],
+    test: bool,
+    name: str,
+) -> Any | None:
+    """build an object using the healthiest of the supplied RPC urls
+
+    Args:
+        build (Callable[[str], Awaitable[Any]]): builds ( and tests ) the object using an rpc url
+        rpcUrls (list[str]): list of RPC urls to be used
+        test (bool): build is testing the object ( rpc calls routed, hedged and health tracked )
+        name (str): object name ( logs )
+
+    Returns:
+        Any | None: object or None when no rpc url worked
+    """
+    try:
+        if test:
+            return await RPC_ROUTER.call(urls=rpcUrls, func=build, name=name)
+        # no rpc calls: use the healthiest url
+        return await build(RPC_ROUTER.order(rpcUrls)[0])
+    except Exception as e:
+        logging.getLogger(__name__).error(
+            f" error creating {name} with any of {len(rpcUrls)} rpc urls: {e}"
+        )
+        return None
@@ -0,0 +1,194 @@
+import asyncio
+import itertools
+import logging
+from typing import Any
+
+from eth_abi.exceptions import DecodingError
+from web3 import AsyncWeb3, Web3
+from web3._utils.abi import get_abi_output_types, map_abi_data
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
+from web3.contract.async_contract import AsyncContractFunction
+from web3.exceptions import BadFunctionCallOutput, ContractLogicError
+
+
+# Multicall3 is deployed at the same address on all supported networks
+MULTICALL3_ADDRESS = Web3.to_checksum_address(
+    "0xcA11bde05977b3631167028862bE2a173976CA11"
+)
+# aggregate3((address,bool,bytes)[]) selector
+MULTICALL3_AGGREGATE3_SELECTOR = bytes.fromhex("82ad56cb")
+# Multicall3 deployment blocks: calls at lower blocks are executed one by one
+MULTICALL3_DEPLOYMENT_BLOCKS = {
+    "ethereum": 14353601,
+    "polygon": 25770160,
+    "optimism": 4286263,
+    "arbitrum": 7654707,
+    "celo": 13112599,
+    "bsc": 15921452,
+    "binance": 15921452,
+    "polygon_zkevm": 57746,
+    "avalanche": 11907934,
+}
+
+
+class multicall_batcher:
+    """Collects the contract view calls issued for the same rpc connection and block
+    during a short time window and executes them as one Multicall3 aggregate3 eth_call.
+
+    Each call is isolated ( allowFailure ): a reverting call raises only for its caller.
+    When the multicall itself fails, pending calls are executed one by one.
+    """
+
+    def __init__(
+        self, w3: AsyncWeb3, network: str, max_calls: int, window: float
+    ) -> None:
+        """
+        Args:
+            w3 (AsyncWeb3): connection used to execute calls
+            network (str): network name
+            max_calls (int): maximum calls per multicall ( <=1 disables batching )
+            window (float): seconds to wait collecting calls before executing them
+        """
+        self._w3 = w3
+        self._network = network
+        self._max_calls = max_calls
+        self._window = window
+        # pending calls by block:  { <block>: [ (<contract function>, <future>), ...] }
+        self._pending: dict[int, list[tuple[AsyncContractFunction, asyncio.Future]]] = {}
+        # running executions ( keep a reference till done )
+        self._tasks: set[asyncio.Task] = set()
+
+    async def call(self, contract_function: AsyncContractFunction, block: int) -> Any:
+        """Queue a contract view call and wait for its result
+
+        Args:
+            contract_function (AsyncContractFunction): like contract.functions.slot0()
+            block (int): block number
+
+        Returns:
+            Any: decoded call result, as contract_function.call would return
+        """
+        if self._max_calls <= 1 or block < MULTICALL3_DEPLOYMENT_BLOCKS.get(
+            self._network, 0
+        ):
+            return await contract_function.call(block_identifier=block)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        if block not in self._pending:
+            self._pending[block] = []
+            loop.call_later(self._window, self._flush, block)
+        self._pending[block].append((contract_function, future))
+
+        if len(self._pending[block]) >= self._max_calls:
+            self._flush(block)
+
+        return await future
+
+    def _flush(self, block: int):
+        """Execute all pending calls of a block ( when not already executed )"""
+        if calls := self._pending.pop(block, None):
+            task = asyncio.create_task(self._execute(calls=calls, block=block))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _execute(
+        self,
+        calls: list[tuple[AsyncContractFunction, asyncio.Future]],
+        block: int,
+    ):
+        try:
+            results = await self._aggregate3(
+                contract_functions=[x[0] for x in calls], block=block
+            )
+        except Exception as e:
+            logging.getLogger(__name__).debug(
+                f" multicall of {len(calls)} calls failed on {self._network} at block {block}. Executing them one by one. error: {e}"
+            )
+            await asyncio.gather(
+                *[self._execute_single(fn, future, block) for fn, future in calls]
+            )
+            return
+
+        for (contract_function, future), (success, return_data) in zip(
+            calls, results
+        ):
+            if future.done():
+                continue
+            if not success:
+                future.set_exception(
+                    ContractLogicError(
+                        f"multicall: {contract_function.fn_name} call reverted at {contract_function.address}"
+                    )
+                )
+                continue
+            try:
+                future.set_result(
+                    self.decode_result(
+                        contract_function=contract_function, return_data=return_data
+                    )
+                )
+            except Exception as e:
+                future.set_exception(e)
+
+    async def _execute_single(
+        self,
+        contract_function: AsyncContractFunction,
+        future: asyncio.Future,
+        block: int,
+    ):
+        try:
+            result = await contract_function.call(block_identifier=block)
+            if not future.done():
+                future.set_result(result)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+
+    async def _aggregate3(
+        self, contract_functions: list[AsyncContractFunction], block: int
+    ) -> list[tuple[bool, bytes]]:
+        """Execute a Multicall3 aggregate3 call allowing each call to fail
+
+        Returns:
+            list[tuple[bool, bytes]]: (success, return data) of each call
+        """
+        calldata = MULTICALL3_AGGREGATE3_SELECTOR + self._w3.codec.encode(
+            ["(address,bool,bytes)[]"],
+            [
+                [
+                    (
+                        fn.address,
+                        True,
+                        bytes.fromhex(fn._encode_transaction_data()[2:]),
+                    )
+                    for fn in contract_functions
+                ]
+            ],
+        )
+        return_data = await self._w3.eth.call(
+            {"to": MULTICALL3_ADDRESS, "data": calldata}, block_identifier=block
+        )
+        return self._w3.codec.decode(["(bool,bytes)[]"], return_data)[0]
+
+    def decode_result(
+        self, contract_function: AsyncContractFunction, return_data: bytes
+    ) -> Any:
+        """Decode a call's return data the same way contract_function.call does"""
+        output_types = get_abi_output_types(contract_function.abi)
+        try:
+            output_data = self._w3.codec.decode(output_types, return_data)
+        except DecodingError as e:
+            raise BadFunctionCallOutput(
+                f"Could not decode contract function call to {contract_function.fn_name} with return data: {str(return_data)}, output_types: {output_types}"
+            ) from e
+
+        normalized_data = map_abi_data(
+            itertools.chain(
+                BASE_RETURN_NORMALIZERS, contract_function._return_data_normalizers
+            ),
+            output_types,
+            output_data,
+        )
+        return normalized_data[0] if len(normalized_data) == 1 else normalized_data
@@ -1,17 +1,16 @@
 import logging
 import math
 import datetime as dt
-import random
 
-from web3 import Web3, exceptions, AsyncWeb3, AsyncHTTPProvider
-from web3.eth import AsyncEth
-from web3.net import AsyncNet
+from web3 import Web3
 from web3.contract import Contract
-from web3.middleware import async_geth_poa_middleware, async_simple_cache_middleware
 
 import asyncio
 
 from sources.web3.bins.configuration import CONFIGURATION
+from sources.web3.bins.w3.blocks import BLOCK_INDEX
+from sources.web3.bins.w3.providers import W3_PROVIDER_POOL
+from sources.web3.bins.w3.router import RPC_ROUTER
 from sources.web3.bins.general import file_utilities
 
 
@@ -54,6 +53,10 @@ class web3wrap:
         self._block_data = await self._w3.eth.get_block(self._block or "latest")
         self.block = self._block_data.number
         self.timestamp = self._block_data.timestamp
+        # feed the block index
+        BLOCK_INDEX.add(
+            network=self._network, block=self._block, timestamp=self._timestamp
+        )
 
         return self._block, self._timestamp
 
@@ -63,37 +66,31 @@ class web3wrap:
             self._abi_filename = abi_filename
         if abi_path != "":
             self._abi_path = abi_path
-        # load abi
-        self._abi = file_utilities.load_json(
+        # load abi ( shared process-wide )
+        self._abi = file_utilities.load_abi(
             filename=self._abi_filename, folder_path=self._abi_path
         )
 
     def setup_w3(self, network: str, web3Url: str | None = None) -> Web3:
-        # setup web3
-        result = AsyncWeb3(
-            AsyncHTTPProvider(
-                web3Url
-                or CONFIGURATION["WEB3_PROVIDER_URLS"].get("public", "private")[
-                    network
-                ],
-                request_kwargs={"timeout": 120},
-            ),
-            modules={"eth": AsyncEth, "net": AsyncNet},
-        )
-
-        # add simple cache module
-        result.middleware_onion.add(async_simple_cache_middleware)
+        # use the process-wide pooled connection of network and url
+        if not web3Url:
+            web3Url = CONFIGURATION["WEB3_PROVIDER_URLS"].get("public", "private")[
+                network
+            ]
+            # configuration holds a list of urls per network
+            if isinstance(web3Url, list):
+                web3Url = web3Url[0]
 
-        # add middleware as needed
-        if network != "ethereum":
-            result.middleware_onion.inject(async_geth_poa_middleware, layer=0)
-
-        return result
+        return W3_PROVIDER_POOL.get_w3(network=network, url=web3Url)
 
     def setup_contract(self, contract_address: str, contract_abi: str):
-        # set contract
-        self._contract = self._w3.eth.contract(
-            address=contract_address, abi=contract_abi
+        # set contract ( cached by connection, abi and address )
+        self._contract = W3_PROVIDER_POOL.get_contract(
+            w3=self._w3,
+            address=contract_address,
+            abi=contract_abi,
+            abi_filename=self._abi_filename,
+            abi_path=self._abi_path,
         )
 
     # CUSTOM PROPERTIES
@@ -160,8 +157,8 @@ class web3wrap:
         inexact_mode="before",
         eq_timestamp_position="first",
     ) -> int:
-        """Will
-           At least 15 queries are needed to come close to a timestamp block number
+        """Block number of a timestamp
+           Uses the process-wide block index ( memory -> database -> network interpolation search )
 
         Args:
            timestamp (dt.datetime.timestamp): _description_
@@ -171,155 +168,27 @@ class web3wrap:
         Returns:
            int: blocknumber
         """
-
-        if int(timestamp) == 0:
-            raise ValueError("Timestamp cannot be zero!")
-
-        # check min timestamp
-        min_block = await self._w3.eth.get_block(1)
-        if min_block.timestamp > timestamp:
-            return 1
-
-        queries_cost = 0
-        found_exact = False
-
-        block_curr = await self._w3.eth.get_block("latest")
-        first_step = math.ceil(block_curr.number * 0.85)
-
-        # make sure we have positive block result
-        while (block_curr.number + first_step) <= 0:
-            first_step -= 1
-        # calc blocks to go up/down closer to goal
-        block_past = await self._w3.eth.get_block(block_curr.number - (first_step))
-        blocks_x_timestamp = (
-            abs(block_curr.timestamp - block_past.timestamp) / first_step
-        )
-
-        block_step = (block_curr.timestamp - timestamp) / blocks_x_timestamp
-        block_step_sign = -1
-
-        _startime = dt.datetime.now(dt.timezone.utc)
-
-        while block_curr.timestamp != timestamp:
-            queries_cost += 1
-
-            # make sure we have positive block result
-            while (block_curr.number + (block_step * block_step_sign)) <= 0:
-                if queries_cost != 1:
-                    # change sign and lower steps
-                    block_step_sign *= -1
-                # first time here, set lower block steps
-                block_step /= 2
-            # go to block
-            try:
-                block_curr = await self._w3.eth.get_block(
-                    math.floor(block_curr.number + (block_step * block_step_sign))
-                )
-            except exceptions.BlockNotFound:
-                # diminish step
-                block_step /= 2
-                continue
-
-            blocks_x_timestamp = (
-                (
-                    abs(block_curr.timestamp - block_past.timestamp)
-                    / abs(block_curr.number - block_past.number)
-                )
-                if abs(block_curr.number - block_past.number) != 0
-                else 0
-            )
-            if blocks_x_timestamp != 0:
-                block_step = math.ceil(
-                    abs(block_curr.timestamp - timestamp) / blocks_x_timestamp
-                )
-
-            if block_curr.timestamp < timestamp:
-                # block should be higher than current
-                block_step_sign = 1
-            elif block_curr.timestamp > timestamp:
-                # block should be lower than current
-                block_step_sign = -1
-            else:
-                # got it
-                found_exact = True
-                # exit loop
-                break
-
-            # set block past
-            block_past = block_curr
-
-            # 15sec while loop safe exit (an eternity to find the block)
-            if (dt.datetime.now(dt.timezone.utc) - _startime).total_seconds() > 15:
-                if inexact_mode == "before":
-                    # select block smaller than objective
-                    while block_curr.timestamp > timestamp:
-                        block_curr = await self._w3.eth.get_block(block_curr.number - 1)
-                elif inexact_mode == "after":
-                    # select block greater than objective
-                    while block_curr.timestamp < timestamp:
-                        block_curr = await self._w3.eth.get_block(block_curr.number + 1)
-                else:
-                    raise ValueError(
-                        f" Inexact method chosen is not valid:->  {inexact_mode}"
-                    )
-                # exit loop
-                break
-
-        # define result
-        result = block_curr.number
-
-        # get blocks with same timestamp
-        sametimestampBlocks = await self.get_sameTimestampBlocks(
-            block_curr, queries_cost
+        return await BLOCK_INDEX.block_from_timestamp(
+            w3=self._w3,
+            network=self._network,
+            timestamp=int(timestamp),
+            inexact_mode=inexact_mode,
+            eq_timestamp_position=eq_timestamp_position,
         )
-        if len(sametimestampBlocks) > 0:
-            if eq_timestamp_position == "first":
-                result = sametimestampBlocks[0]
-            elif eq_timestamp_position == "last":
-                result = sametimestampBlocks[-1]
-
-        # log result
-        if found_exact:
-            logging.getLogger(__name__).debug(
-                f" Took {queries_cost} on-chain queries to find block number {block_curr.number} of timestamp {timestamp}"
-            )
-
-        else:
-            logging.getLogger(__name__).warning(
-                f" Could not find the exact block number from timestamp -> took {queries_cost} on-chain queries to find block number {block_curr.number} ({block_curr.timestamp}) closest to timestamp {timestamp}  -> original-found difference {timestamp - block_curr.timestamp}"
-            )
-
-        # return closest block found
-        return result
 
     async def timestampFromBlockNumber(self, block: int) -> int:
-        block_obj = None
         if block < 1:
             block_obj = await self._w3.eth.get_block("latest")
-        else:
-            block_obj = await self._w3.eth.get_block(block)
-
-        # return closest block found
-        return block_obj.timestamp
+            BLOCK_INDEX.add(
+                network=self._network,
+                block=block_obj.number,
+                timestamp=block_obj.timestamp,
+            )
+            return block_obj.timestamp
 
-    async def get_sameTimestampBlocks(self, block, queries_cost: int):
-        result = []
-        # try go backwards till different timestamp is found
-        curr_block = block
-        while curr_block.timestamp == block.timestamp:
-            if curr_block.number != block.number:
-                result.append(curr_block.number)
-            curr_block = await self._w3.eth.get_block(curr_block.number - 1)
-            queries_cost += 1
-        # try go forward till different timestamp is found
-        curr_block = block
-        while curr_block.timestamp == block.timestamp:
-            if curr_block.number != block.number:
-                result.append(curr_block.number)
-            curr_block = await self._w3.eth.get_block(curr_block.number + 1)
-            queries_cost += 1
-
-        return sorted(result)
+        return await BLOCK_INDEX.timestamp_from_block(
+            w3=self._w3, network=self._network, block=block
+        )
 
     def create_eventFilter_chunks(self, eventfilter: dict, max_blocks=1000) -> list:
         """create a list of event filters
@@ -445,32 +314,39 @@ class web3wrap:
 
     # universal failover execute funcion
     async def call_function(self, function_name: str, rpcUrls: list[str], *args):
-        # loop choose url
-        for rpcUrl in rpcUrls:
-            try:
-                # create web3 conn
-                chain_connection = self.setup_w3(network=self._network, web3Url=rpcUrl)
-                # create contract
-                contract = chain_connection.eth.contract(
-                    address=self._address, abi=self._abi
-                )
-
-                # set root w3 to this chain conn
-                self._w3 = chain_connection
+        async def _call(rpcUrl: str):
+            # pooled web3 conn
+            chain_connection = self.setup_w3(network=self._network, web3Url=rpcUrl)
+            # get contract
+            contract = W3_PROVIDER_POOL.get_contract(
+                w3=chain_connection,
+                address=self._address,
+                abi=self._abi,
+                abi_filename=self._abi_filename,
+                abi_path=self._abi_path,
+            )
 
-                # execute function
-                return await getattr(contract.functions, function_name)(*args).call(
-                    block_identifier=await self.block
-                )
+            # execute function ( batched with other view calls at the same block )
+            result = await W3_PROVIDER_POOL.get_batcher(
+                network=self._network, url=rpcUrl
+            ).call(
+                getattr(contract.functions, function_name)(*args),
+                block=await self.block,
+            )
 
-            except Exception as e:
-                # not working rpc
-                logging.getLogger(__name__).debug(
-                    f" error calling function {function_name} using {rpcUrl} rpc: {e}"
-                )
+            # set root w3 to this chain conn
+            self._w3 = chain_connection
+            return result
 
-        # no rpcUrl worked
-        return None
+        # healthiest rpc urls first
+        try:
+            return await RPC_ROUTER.call(urls=rpcUrls, func=_call, name=function_name)
+        except Exception as e:
+            # no rpcUrl worked
+            logging.getLogger(__name__).debug(
+                f" error calling function {function_name} on {self._network} network: {e}"
+            )
+            return None
 
     async def call_function_autoRpc(
         self,
@@ -494,8 +370,6 @@ class web3wrap:
                 .get(key_name, {})
                 .get(self._network, [])
             ):
-                random.shuffle(rpcUrls)
-
                 result = await self.call_function(function_name, rpcUrls, *args)
                 if not result is None:
                     return result
@@ -1,5 +1,4 @@
 import asyncio
-import contextlib
 import logging
 
 from decimal import Decimal
@@ -893,6 +892,13 @@ class gamma_hypervisor_registry(web3wrap):
         "arbitrum": ["0x38f81e638f9e268e8417F2Ff76C270597fa077A0".lower()],
     }
 
+    # registry entries discovered:  { (network, registry address, block range): {"counter": <last scanned counter>, "entries": { <index>: (address, idx) | None } } }
+    __discovery_cache: dict[tuple[str, str, int], dict] = {}
+    # blocks covered by each discovery cache entry
+    __discovery_block_range = 100000
+    # (network, address) of hypervisors already validated
+    __validated: set[tuple[str, str]] = set()
+
     @property
     async def counter(self) -> int:
         """number of hypervisors indexed, initial being 0  and end the counter value
@@ -931,70 +937,109 @@ class gamma_hypervisor_registry(web3wrap):
         )
 
     # CUSTOM FUNCTIONS
-    async def get_hypervisors(self) -> list[gamma_hypervisor]:
-        """Retrieve hypervisors from registry
+    async def hypesByIndex(
+        self, indexes: list[int]
+    ) -> dict[int, tuple[str, int] | None]:
+        """Retrieve hype addresses and indexes from registry concurrently
+            ( calls at the same block are executed as multicalls )
+
+        Args:
+            indexes (list[int]): index positions of hypes in registry
 
         Returns:
-           gamma_hypervisor
+            dict[int, tuple[str, int] | None]: { <index>: (hype address, index) or None when reverted }
         """
-        hypes_list = []
-        total_qtty = await self.counter + 1  # index positions ini=0 end=counter
-
-        for i in range(total_qtty):
-            try:
-                hypervisor_id, idx = await self.hypeByIndex(index=i)
-
-                # filter blacklisted hypes
-                if idx == 0 or (
-                    self._network in self.__blacklist_addresses
-                    and hypervisor_id.lower()
-                    in self.__blacklist_addresses[self._network]
-                ):
-                    # hypervisor is blacklisted: loop
-                    continue
-
-                # build hypervisor
-                hypervisor = gamma_hypervisor(
-                    address=hypervisor_id,
-                    network=self._network,
-                    block=await self.block,
-                )
-                # check this is actually an hypervisor (erroneous addresses exist like "ethereum":{"0x2260FAC5E5542a773Aa44fBCfeDf7C193bc2C599"})
-                await hypervisor.getTotalAmounts  # test func
-
-                # return correct hypervisor
-                hypes_list.append(hypervisor)
-            except Exception:
-                logging.getLogger(__name__).warning(
-                    f" Hypervisor registry returned the address {hypervisor_id} and may not be an hypervisor ( at web3 chain id: {self._chain_id} )"
-                )
-
-        return hypes_list
+        results = await asyncio.gather(
+            *[self.hypeByIndex(index=i) for i in indexes], return_exceptions=True
+        )
+        return {
+            i: None if isinstance(result, Exception) else result
+            for i, result in zip(indexes, results)
+        }
 
     async def get_hypervisors_addresses(self) -> list[str]:
-        """Retrieve hypervisors all addresses from registry
+        """Retrieve hypervisors all addresses from registry, caching registry entries per (network, registry, block range).
+            Only indexes above the last known counter ( or previously reverted ) are scanned.
 
         Returns:
-           list of addresses
+            list[str]: hypervisor addresses, in registry order
         """
-
         total_qtty = await self.counter + 1  # index positions ini=0 end=counter
 
+        cached = self.__discovery_cache.setdefault(
+            (
+                self._network,
+                self.address.lower(),
+                await self.block // self.__discovery_block_range,
+            ),
+            {"counter": -1, "entries": {}},
+        )
+
+        # scan indexes not already known
+        if indexes := [
+            i
+            for i in range(total_qtty)
+            if i > cached["counter"] or cached["entries"].get(i) is None
+        ]:
+            cached["entries"].update(await self.hypesByIndex(indexes=indexes))
+            cached["counter"] = max(cached["counter"], total_qtty - 1)
+
         result = []
         for i in range(total_qtty):
             # executiuon reverted:  arbitrum and mainnet have diff ways of indexing (+1 or 0)
-            with contextlib.suppress(Exception):
-                hypervisor_id, idx = await self.hypeByIndex(index=i)
+            if not (entry := cached["entries"].get(i)):
+                continue
+            hypervisor_id, idx = entry
 
-                # filter erroneous and blacklisted hypes
-                if idx == 0 or (
-                    self._network in self.__blacklist_addresses
-                    and hypervisor_id.lower()
-                    in self.__blacklist_addresses[self._network]
-                ):
-                    # hypervisor is blacklisted: loop
-                    continue
+            # filter erroneous and blacklisted hypes
+            if idx == 0 or (
+                self._network in self.__blacklist_addresses
+                and hypervisor_id.lower() in self.__blacklist_addresses[self._network]
+            ):
+                # hypervisor is blacklisted: loop
+                continue
 
-                result.append(hypervisor_id)
+            result.append(hypervisor_id)
 
         return result
+
+    async def get_hypervisors(self, max_concurrency: int = 20) -> list[gamma_hypervisor]:
+        """Retrieve hypervisors from registry
+
+        Args:
+            max_concurrency (int, optional): maximum hypervisors validated at the same time. Defaults to 20.
+
+        Returns:
+           gamma_hypervisor
+        """
+        block = await self.block
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _build_hypervisor(hypervisor_id: str) -> gamma_hypervisor | None:
+            async with semaphore:
+                try:
+                    # build hypervisor
+                    hypervisor = gamma_hypervisor(
+                        address=hypervisor_id,
+                        network=self._network,
+                        block=block,
+                    )
+                    # check this is actually an hypervisor (erroneous addresses exist like "ethereum":{"0x2260FAC5E5542a773Aa44fBCfeDf7C193bc2C599"})
+                    if (self._network, hypervisor_id.lower()) not in self.__validated:
+                        await hypervisor.getTotalAmounts  # test func
+                        self.__validated.add((self._network, hypervisor_id.lower()))
+
+                    # return correct hypervisor
+                    return hypervisor
+                except Exception:
+                    logging.getLogger(__name__).warning(
+                        f" Hypervisor registry returned the address {hypervisor_id} and may not be an hypervisor ( at web3 chain id: {self._chain_id} )"
+                    )
+
+        hypes_list = await asyncio.gather(
+            *[
+                _build_hypervisor(hypervisor_id)
+                for hypervisor_id in await self.get_hypervisors_addresses()
+            ]
+        )
+        return [x for x in hypes_list if x]
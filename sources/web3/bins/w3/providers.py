@@ -0,0 +1,191 @@
+import asyncio
+import logging
+import weakref
+from typing import Any
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+from web3 import AsyncWeb3, AsyncHTTPProvider
+from web3.contract import AsyncContract
+from web3.eth import AsyncEth
+from web3.net import AsyncNet
+from web3.middleware import async_geth_poa_middleware, async_simple_cache_middleware
+from web3.types import RPCEndpoint, RPCResponse
+
+from sources.web3.bins.configuration import CONFIGURATION
+from sources.web3.bins.w3.multicall import multicall_batcher
+
+
+class pooled_http_provider(AsyncHTTPProvider):
+    """AsyncHTTPProvider posting through the pool's shared keep-alive aiohttp session"""
+
+    def __init__(
+        self,
+        endpoint_uri: str,
+        pool: "web3_provider_pool",
+        request_kwargs: Any | None = None,
+    ) -> None:
+        self._pool = pool
+        super().__init__(endpoint_uri=endpoint_uri, request_kwargs=request_kwargs)
+
+    async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        self.logger.debug(
+            f"Making request HTTP. URI: {self.endpoint_uri}, Method: {method}"
+        )
+        request_data = self.encode_rpc_request(method, params)
+        session = await self._pool.get_session()
+        async with session.post(
+            self.endpoint_uri, data=request_data, **self.get_request_kwargs()
+        ) as response:
+            response.raise_for_status()
+            raw_response = await response.read()
+        return self.decode_rpc_response(raw_response)
+
+
+class web3_provider_pool:
+    """Process-wide AsyncWeb3 connections, one per (network, rpc url).
+
+    All providers share one aiohttp session per event loop, with keep-alive
+    connections limited per rpc host.
+    """
+
+    def __init__(
+        self,
+        timeout: int,
+        connections_per_host: int,
+        multicall_max_calls: int,
+        multicall_window: float,
+    ) -> None:
+        self._timeout = timeout
+        self._connections_per_host = connections_per_host
+        self._multicall_max_calls = multicall_max_calls
+        self._multicall_window = multicall_window
+
+        self._w3s: dict[tuple[str, str], AsyncWeb3] = {}
+        self._batchers: dict[tuple[str, str], multicall_batcher] = {}
+        self._session: ClientSession | None = None
+        # contract factories and contracts by connection ( pooled or custom ):
+        #   { <w3>: { (<abi path>, <abi filename>): <factory> , (<abi path>, <abi filename>, <address>): <contract> } }
+        self._contracts: weakref.WeakKeyDictionary[
+            AsyncWeb3, dict[tuple, type[AsyncContract] | AsyncContract]
+        ] = weakref.WeakKeyDictionary()
+
+    def get_w3(self, network: str, url: str) -> AsyncWeb3:
+        """Return the shared AsyncWeb3 of network and rpc url
+
+        Args:
+            network (str): network name
+            url (str): rpc url
+
+        Returns:
+            AsyncWeb3:
+        """
+        key = (network, url)
+        if key not in self._w3s:
+            self._w3s[key] = self._create_w3(network=network, url=url)
+        return self._w3s[key]
+
+    def get_batcher(self, network: str, url: str) -> multicall_batcher:
+        """Return the view calls batcher of network and rpc url
+
+        Args:
+            network (str): network name
+            url (str): rpc url
+
+        Returns:
+            multicall_batcher:
+        """
+        key = (network, url)
+        if key not in self._batchers:
+            self._batchers[key] = multicall_batcher(
+                w3=self.get_w3(network=network, url=url),
+                network=network,
+                max_calls=self._multicall_max_calls,
+                window=self._multicall_window,
+            )
+        return self._batchers[key]
+
+    def get_contract(
+        self,
+        w3: AsyncWeb3,
+        address: str,
+        abi: list,
+        abi_filename: str,
+        abi_path: str,
+    ) -> AsyncContract:
+        """Return the contract of an address and ABI using a connection.
+            Contract factories are built once per ( ABI, connection ) and contracts once per address.
+
+        Args:
+            w3 (AsyncWeb3): network connection
+            address (str): checksum contract address
+            abi (list): contract ABI ( identified by its file )
+            abi_filename (str): ABI file name
+            abi_path (str): ABI folder
+
+        Returns:
+            AsyncContract:
+        """
+        contracts = self._contracts.setdefault(w3, {})
+
+        key = (abi_path, abi_filename, address)
+        if key not in contracts:
+            factory_key = (abi_path, abi_filename)
+            if factory_key not in contracts:
+                contracts[factory_key] = w3.eth.contract(abi=abi)
+            contracts[key] = contracts[factory_key](address=address)
+        return contracts[key]
+
+    def _create_w3(self, network: str, url: str) -> AsyncWeb3:
+        result = AsyncWeb3(
+            pooled_http_provider(
+                endpoint_uri=url,
+                pool=self,
+                request_kwargs={"timeout": ClientTimeout(total=self._timeout)},
+            ),
+            modules={"eth": AsyncEth, "net": AsyncNet},
+        )
+
+        # add simple cache module
+        result.middleware_onion.add(async_simple_cache_middleware)
+
+        # add middleware as needed
+        if network != "ethereum":
+            result.middleware_onion.inject(async_geth_poa_middleware, layer=0)
+
+        return result
+
+    async def get_session(self) -> ClientSession:
+        """Return the shared aiohttp session of the running event loop"""
+        loop = asyncio.get_running_loop()
+        if (
+            self._session is None
+            or self._session.closed
+            or self._session._loop is not loop
+        ):
+            # sessions are bound to the loop that created them
+            self._session = ClientSession(
+                connector=TCPConnector(
+                    limit=0, limit_per_host=self._connections_per_host
+                ),
+                raise_for_status=True,
+            )
+        return self._session
+
+    async def close(self):
+        """Close the shared session"""
+        if self._session and not self._session.closed:
+            try:
+                await self._session.close()
+            except Exception as e:
+                logging.getLogger(__name__).warning(
+                    f" Error closing web3 provider session  err:{e}"
+                )
+        self._session = None
+
+
+W3_PROVIDER_POOL = web3_provider_pool(
+    timeout=CONFIGURATION["WEB3_PROVIDER_TIMEOUT"],
+    connections_per_host=CONFIGURATION["WEB3_PROVIDER_CONNECTIONS_PER_HOST"],
+    multicall_max_calls=CONFIGURATION["WEB3_MULTICALL_MAX_CALLS"],
+    multicall_window=CONFIGURATION["WEB3_MULTICALL_WINDOW_MS"] / 1000,
+)
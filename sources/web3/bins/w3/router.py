@@ -0,0 +1,319 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable
+
+from aiohttp import ClientError, ClientResponseError
+from eth_abi.exceptions import DecodingError
+from web3.exceptions import (
+    ABIFunctionNotFound,
+    BadFunctionCallOutput,
+    BadResponseFormat,
+    CannotHandleRequest,
+    ContractLogicError,
+    MismatchedABI,
+    NoABIFunctionsFound,
+    TooManyRequests,
+    Web3ValidationError,
+)
+
+from sources.web3.bins.configuration import CONFIGURATION
+
+# the call itself fails ( reverts, missing functions, wrong abi or arguments ): any endpoint fails the same way
+CONTRACT_ERRORS = (
+    ContractLogicError,
+    BadFunctionCallOutput,
+    DecodingError,
+    ABIFunctionNotFound,
+    MismatchedABI,
+    NoABIFunctionsFound,
+    Web3ValidationError,
+)
+# the endpoint fails ( transport, timeouts and http errors ): the only errors counted in its health
+ENDPOINT_ERRORS = (
+    ClientError,
+    asyncio.TimeoutError,
+    OSError,
+    TooManyRequests,
+    CannotHandleRequest,
+    BadResponseFormat,
+)
+
+
+class rpc_endpoint_health:
+    """Health of an rpc endpoint:  latency and error rate moving averages and circuit breaker state"""
+
+    def __init__(self, alpha: float):
+        self._alpha = alpha
+        # exponentially weighted moving averages ( None till the first call )
+        self.latency: float | None = None
+        self.error_rate: float = 0.0
+        # counters
+        self.calls: int = 0
+        self.errors: int = 0
+        self.rate_limited: int = 0
+        self.hedged: int = 0
+        # circuit breaker:  closed -> open ( after consecutive failures ) -> half_open ( one probe after cooldown ) -> closed
+        self.consecutive_failures: int = 0
+        self.state: str = "closed"
+        self.opened_at: float = 0.0
+        self.probing: bool = False
+
+    def record_success(self, latency: float):
+        self.calls += 1
+        self.latency = (
+            latency
+            if self.latency is None
+            else self._alpha * latency + (1 - self._alpha) * self.latency
+        )
+        self.error_rate = (1 - self._alpha) * self.error_rate
+        self.consecutive_failures = 0
+        self.state = "closed"
+        self.probing = False
+
+    def record_unfinished(self, latency: float):
+        """failed or cancelled ( slower than a hedged call ) calls weigh at least their duration in latency"""
+        self.latency = (
+            latency
+            if self.latency is None
+            else self._alpha * max(latency, self.latency)
+            + (1 - self._alpha) * self.latency
+        )
+        self.probing = False
+
+    def record_error(self, latency: float, rate_limited: bool, open_after: int):
+        self.calls += 1
+        self.errors += 1
+        self.record_unfinished(latency=latency)
+        self.error_rate = self._alpha + (1 - self._alpha) * self.error_rate
+        self.consecutive_failures += 1
+        if rate_limited:
+            self.rate_limited += 1
+        # rate limits, failed probes and repeated failures open the circuit
+        if rate_limited or self.state == "half_open" or (
+            self.consecutive_failures >= open_after
+        ):
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def as_dict(self) -> dict:
+        return {
+            "state": self.state,
+            "latency": self.latency,
+            "error_rate": self.error_rate,
+            "calls": self.calls,
+            "errors": self.errors,
+            "rate_limited": self.rate_limited,
+            "hedged": self.hedged,
+            "consecutive_failures": self.consecutive_failures,
+        }
+
+
+class rpc_router:
+    """Process-wide rpc endpoint router.
+
+    Endpoints are tried from the healthiest ( lowest latency moving average penalized by its error rate ).
+    Endpoints failing repeatedly or rate limited are skipped ( open circuit ) till a cooldown passes, when
+    a single probe call is allowed ( half open ). When a call takes longer than the hedge threshold, the next
+    endpoint is called concurrently and the first successful result is returned.
+    Contract errors ( CONTRACT_ERRORS ) are raised right away and only endpoint errors ( ENDPOINT_ERRORS )
+    count in the endpoint health. Any other error fails over to the next endpoint.
+    """
+
+    def __init__(
+        self,
+        hedge_after: float,
+        open_after: int,
+        cooldown: float,
+        alpha: float = 0.2,
+        stats_log_every: float = 0,
+    ):
+        """
+        Args:
+            hedge_after (float): seconds to wait for a call before calling the next endpoint too ( 0 disables hedging )
+            open_after (int): consecutive failures opening an endpoint circuit
+            cooldown (float): seconds an open circuit waits before a probe call
+            alpha (float, optional): moving averages weight of new calls. Defaults to 0.2.
+            stats_log_every (float, optional): seconds between endpoint stats log lines ( 0 disables them ). Defaults to 0.
+        """
+        self._hedge_after = hedge_after
+        self._open_after = open_after
+        self._cooldown = cooldown
+        self._alpha = alpha
+        self._stats_log_every = stats_log_every
+        self._stats_logged_at = time.monotonic()
+        # health by endpoint url
+        self._endpoints: dict[str, rpc_endpoint_health] = {}
+
+    def _health(self, url: str) -> rpc_endpoint_health:
+        if url not in self._endpoints:
+            self._endpoints[url] = rpc_endpoint_health(alpha=self._alpha)
+        return self._endpoints[url]
+
+    def stats(self) -> dict[str, dict]:
+        """Health of every endpoint used:  state, latency, error rate and counters"""
+        return {url: health.as_dict() for url, health in self._endpoints.items()}
+
+    def _log_stats(self):
+        """log endpoint stats when the log interval passed"""
+        if (
+            not self._stats_log_every
+            or time.monotonic() - self._stats_logged_at < self._stats_log_every
+        ):
+            return
+        self._stats_logged_at = time.monotonic()
+        logging.getLogger(__name__).info(
+            " rpc endpoints stats: {}".format(
+                ", ".join(
+                    f"{url} {x['state']} latency {x['latency'] or 0:,.3f}s error rate {x['error_rate']:.2f} calls {x['calls']} errors {x['errors']} rate limited {x['rate_limited']} hedged {x['hedged']}"
+                    for url, x in self.stats().items()
+                )
+            )
+        )
+
+    # ROUTING
+    def order(self, urls: list[str]) -> list[str]:
+        """Endpoints sorted by health ( a new list: urls is not modified ).
+            Open circuits are left out, unless their cooldown passed ( one probe ) or all of them are open.
+
+        Args:
+            urls (list[str]): rpc urls
+
+        Returns:
+            list[str]: urls to try, in order
+        """
+        now = time.monotonic()
+        available = []
+        unavailable = []
+        for url in dict.fromkeys(urls):
+            health = self._health(url)
+            if health.state == "closed":
+                available.append(url)
+            elif (
+                not health.probing and now - health.opened_at >= self._cooldown
+            ):
+                # half open: allow one probe call
+                health.state = "half_open"
+                available.append(url)
+            else:
+                unavailable.append(url)
+
+        # unknown endpoints first ( to learn their health ), then by latency penalized by errors
+        available.sort(key=self._score)
+        if not available:
+            # all circuits open: try the ones opened first
+            return sorted(unavailable, key=lambda x: self._endpoints[x].opened_at)
+        return available
+
+    def _score(self, url: str) -> float:
+        health = self._endpoints[url]
+        if health.latency is None:
+            return 0.0
+        # errors cost at least a second: fast failing endpoints are not preferred
+        return health.latency * (1 + 10 * health.error_rate) + health.error_rate
+
+    async def call(
+        self,
+        urls: list[str],
+        func: Callable[[str], Awaitable[Any]],
+        name: str = "",
+    ) -> Any:
+        """Call func with the healthiest endpoint, hedging slow calls and failing over on errors
+
+        Args:
+            urls (list[str]): rpc urls
+            func (Callable[[str], Awaitable[Any]]): coroutine function receiving the rpc url to use
+            name (str, optional): call name ( logs ). Defaults to "".
+
+        Returns:
+            Any: first successful func result
+
+        Raises:
+            Exception: contract errors ( CONTRACT_ERRORS ) as they happen,
+                        last endpoint error when all of them fail ( ValueError when there are no urls )
+        """
+        self._log_stats()
+
+        pending_urls = self.order(urls)
+        if not pending_urls:
+            raise ValueError(f" No rpc urls to call {name}")
+
+        running: dict[asyncio.Task, tuple[str, float]] = {}
+        last_error: Exception | None = None
+
+        def _start_next():
+            url = pending_urls.pop(0)
+            health = self._health(url)
+            if health.state == "half_open":
+                health.probing = True
+            if running:
+                health.hedged += 1
+            running[asyncio.create_task(func(url))] = (url, time.monotonic())
+
+        _start_next()
+        try:
+            while running:
+                done, _ = await asyncio.wait(
+                    running,
+                    timeout=(self._hedge_after or None) if pending_urls else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    # slow call: hedge with the next endpoint
+                    _start_next()
+                    continue
+
+                for task in done:
+                    url, started = running.pop(task)
+                    latency = time.monotonic() - started
+                    if (error := task.exception()) is None:
+                        self._health(url).record_success(latency=latency)
+                        return task.result()
+
+                    if isinstance(error, CONTRACT_ERRORS):
+                        # not an endpoint failure: do not fail over
+                        self._health(url).probing = False
+                        raise error
+
+                    last_error = error
+                    if isinstance(error, ENDPOINT_ERRORS):
+                        self._health(url).record_error(
+                            latency=latency,
+                            rate_limited=self._is_rate_limit(error),
+                            open_after=self._open_after,
+                        )
+                    else:
+                        # rpc error responses ( ie. pruned state ): try the next endpoint, not counted as errors
+                        self._health(url).record_unfinished(latency=latency)
+                    logging.getLogger(__name__).debug(
+                        f" error calling {name} using {url} rpc: {error}"
+                    )
+
+                # failed call: fail over to the next endpoint
+                if pending_urls:
+                    _start_next()
+        finally:
+            # cancel hedged calls still running
+            for task, (url, started) in running.items():
+                task.cancel()
+                self._health(url).record_unfinished(
+                    latency=time.monotonic() - started
+                )
+
+        raise last_error
+
+    @staticmethod
+    def _is_rate_limit(error: Exception) -> bool:
+        if isinstance(error, TooManyRequests):
+            return True
+        if isinstance(error, ClientResponseError):
+            return error.status == 429
+        return "429" in str(error) or "rate limit" in str(error).lower()
+
+
+RPC_ROUTER = rpc_router(
+    hedge_after=CONFIGURATION["WEB3_RPC_HEDGE_AFTER_MS"] / 1000,
+    open_after=CONFIGURATION["WEB3_RPC_CIRCUIT_FAILURES"],
+    cooldown=CONFIGURATION["WEB3_RPC_CIRCUIT_COOLDOWN"],
+    stats_log_every=CONFIGURATION["WEB3_RPC_STATS_LOG_SECS"],
+)
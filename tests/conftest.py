@@ -0,0 +1,4 @@
+from sources.web3.bins.configuration import CONFIGURATION
+
+# web3 scripts load the logs configuration from their config file
+CONFIGURATION.setdefault("logs", {"log_execution_time": False})
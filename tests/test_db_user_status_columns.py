@@ -0,0 +1,197 @@
+"""Parity of the columnar user status engine with the Decimal one.
+
+Both engines replay the same fee collections and reports on the same ledger.
+Tolerances:
+    token and share quantities: 2 raw units ( columnar fixed point amounts are
+        floored once per pro rata share, underlying and results add two of them )
+    usd and in token values: the value of those 2 raw units plus 1e-9 relative
+        ( float64 arithmetic )
+    any other field, and fields not recalculated: exact
+"""
+import random
+from decimal import Decimal
+
+import pytest
+
+from sources.web3.bins.database import db_user_status
+from sources.web3.bins.database.db_user_status_columns import (
+    SHARES_FIELDS,
+    TOKEN0_FIELDS,
+    TOKEN1_FIELDS,
+)
+
+DECIMALS_TOKEN0 = 6
+DECIMALS_TOKEN1 = 18
+DECIMALS_CONTRACT = 18
+PRICE_USD_T0 = Decimal("1.0001")
+PRICE_USD_T1 = Decimal("1850.25")
+
+# carried over values with more digits than float64 holds
+CARRIED_FIELDS = {
+    "total_investment_qtty_in_usd": Decimal("123.4567890123456789012345678"),
+    "total_investment_qtty_in_token0": Decimal("1.500000000000000000000000001"),
+    "total_investment_qtty_in_token1": Decimal("0.000810713416835843837343131"),
+    "total_closed_investment_return_in_usd": Decimal("-7.123456789012345678901234"),
+}
+
+OPERATIONS = [
+    {"topic": "zeroBurn", "blockNumber": 100, "logIndex": 3},
+    {"topic": "report", "blockNumber": 101, "logIndex": 0},
+    {"topic": "rebalance", "blockNumber": 102, "logIndex": 7},
+]
+
+
+def _hypervisor_status(total_supply: Decimal, seed: int) -> dict:
+    rnd = random.Random(seed)
+    return {
+        "fees_uncollected": {
+            "qtty_token0": Decimal(rnd.randint(1, 10**12)) / 10**DECIMALS_TOKEN0,
+            "qtty_token1": Decimal(rnd.randint(1, 10**20)) / 10**DECIMALS_TOKEN1,
+        },
+        "tvl": {
+            "fees_owed_token0": Decimal(rnd.randint(1, 10**9)) / 10**DECIMALS_TOKEN0,
+            "fees_owed_token1": Decimal(rnd.randint(1, 10**18)) / 10**DECIMALS_TOKEN1,
+        },
+        "totalAmounts": {
+            "total0": Decimal(rnd.randint(1, 10**14)) / 10**DECIMALS_TOKEN0,
+            "total1": Decimal(rnd.randint(1, 10**23)) / 10**DECIMALS_TOKEN1,
+        },
+        "totalSupply": total_supply,
+    }
+
+
+def _builder(engine: str) -> db_user_status.user_status_hypervisor_builder:
+    """builder with an in memory ledger, hypervisor status and prices ( no database )"""
+    builder = db_user_status.user_status_hypervisor_builder.__new__(
+        db_user_status.user_status_hypervisor_builder
+    )
+    builder._engine = engine
+    builder._hypervisor_address = "0xhypervisor"
+    builder._network = "ethereum"
+    builder._protocol = "gamma"
+    builder._user_status_hypervisor_builder__blacklist_addresses = [
+        "0x0000000000000000000000000000000000000000"
+    ]
+    builder._static = {
+        "pool": {"token0": {"address": "0xtoken0"}, "token1": {"address": "0xtoken1"}}
+    }
+    builder._pending_user_status = []
+    builder.convert_user_status_toDb = lambda status: status
+    builder.get_price = lambda block, address: (
+        PRICE_USD_T0 if address == "0xtoken0" else PRICE_USD_T1
+    )
+
+    rnd = random.Random(1)
+    states = []
+    for i in range(60):
+        status = db_user_status.user_status(
+            timestamp=1000 + i,
+            block=90,
+            logIndex=1,
+            topic="deposit",
+            address=f"0x{i + 1:040x}",
+            hypervisor_address="0xhypervisor",
+        )
+        status.shares_qtty = Decimal(rnd.randint(1, 10**21)) / 10**DECIMALS_CONTRACT
+        status.investment_qtty_token0 = (
+            Decimal(rnd.randint(1, 10**10)) / 10**DECIMALS_TOKEN0
+        )
+        status.investment_qtty_token1 = (
+            Decimal(rnd.randint(1, 10**19)) / 10**DECIMALS_TOKEN1
+        )
+        for field, value in CARRIED_FIELDS.items():
+            setattr(status, field, value)
+        states.append(status)
+    builder._set_ledger(states)
+
+    total_supply = builder._ledger_total_shares()
+    builder._hypervisor_status = {
+        x["blockNumber"]: _hypervisor_status(total_supply, seed=x["blockNumber"])
+        for x in OPERATIONS
+    }
+    # fee collections are not the last operation of their block ( ledger shares )
+    builder._last_logIndex = {x["blockNumber"]: x["logIndex"] + 2 for x in OPERATIONS}
+    return builder
+
+
+def _operation(step: dict) -> dict:
+    return {
+        **step,
+        "timestamp": 5000 + step["blockNumber"],
+        "id": f"operation_{step['blockNumber']}",
+        "address": "0xhypervisor",
+        "qtty_token0": "123456789",
+        "qtty_token1": "98765432109876543210",
+        "decimals_token0": DECIMALS_TOKEN0,
+        "decimals_token1": DECIMALS_TOKEN1,
+        "decimals_contract": DECIMALS_CONTRACT,
+    }
+
+
+def _replay(engine: str) -> list[list[db_user_status.user_status]]:
+    """ledger after each operation"""
+    builder = _builder(engine)
+    ledgers = []
+    for step in OPERATIONS:
+        operation = _operation(step)
+        if operation["topic"] == "report":
+            builder._process_topic_report(operation)
+        else:
+            builder._share_fees_with_acounts(operation)
+        ledgers.append(
+            sorted(builder._account_states.values(), key=lambda x: x.address)
+        )
+    return ledgers
+
+
+def _tolerance(field: str, value: Decimal) -> Decimal:
+    unit0 = Decimal(1) / 10**DECIMALS_TOKEN0
+    unit1 = Decimal(1) / 10**DECIMALS_TOKEN1
+    if field in TOKEN0_FIELDS:
+        return 2 * unit0
+    if field in TOKEN1_FIELDS:
+        return 2 * unit1
+    if field in SHARES_FIELDS:
+        return 2 / Decimal(10**DECIMALS_CONTRACT)
+
+    if field.endswith("_usd"):
+        unit = unit0 * PRICE_USD_T0 + unit1 * PRICE_USD_T1
+    elif field.endswith("_token0"):
+        unit = unit0 + unit1 * PRICE_USD_T1 / PRICE_USD_T0
+    elif field.endswith("_token1"):
+        unit = unit1 + unit0 * PRICE_USD_T0 / PRICE_USD_T1
+    else:
+        unit = Decimal(0)
+    return 2 * unit + Decimal("1e-9") * max(Decimal(1), abs(value))
+
+
+@pytest.fixture(scope="module")
+def ledgers() -> dict[str, list]:
+    return {engine: _replay(engine) for engine in ("decimal", "columnar")}
+
+
+@pytest.mark.parametrize("step", range(len(OPERATIONS)))
+def test_columnar_matches_decimal(ledgers, step):
+    decimal_ledger = ledgers["decimal"][step]
+    columnar_ledger = ledgers["columnar"][step]
+    assert [x.address for x in decimal_ledger] == [x.address for x in columnar_ledger]
+
+    for expected, result in zip(decimal_ledger, columnar_ledger):
+        # every account got a new status
+        assert result.topic == OPERATIONS[step]["topic"]
+        for field in db_user_status.user_status.__slots__:
+            expected_value = getattr(expected, field)
+            value = getattr(result, field)
+            if isinstance(expected_value, Decimal):
+                assert abs(expected_value - value) <= _tolerance(
+                    field, expected_value
+                ), f"{OPERATIONS[step]['topic']} {expected.address} {field}"
+            else:
+                assert expected_value == value, f"{expected.address} {field}"
+
+
+def test_carried_over_fields_are_exact(ledgers):
+    for engine, engine_ledgers in ledgers.items():
+        for status in engine_ledgers[-1]:
+            for field, value in CARRIED_FIELDS.items():
+                assert getattr(status, field) == value, f"{engine} {field}"
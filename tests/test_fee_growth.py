@@ -0,0 +1,161 @@
+"""Exactness of the wide integer fee growth kernel against the scalar Fees path."""
+import random
+
+import numpy as np
+import pytest
+
+from sources.subgraph.bins.enums import Chain, PositionType, Protocol
+from sources.subgraph.bins.hype_fees.fee_growth import (
+    UINT128_LIMBS,
+    UINT256_LIMBS,
+    from_limbs,
+    to_limbs,
+    uncollected_fees_x128,
+)
+from sources.subgraph.bins.hype_fees.fees import (
+    Fees,
+    fee_amounts_batch,
+    total_fee_amounts_batch,
+)
+from sources.subgraph.bins.hype_fees.schema import FeesData
+
+PROTOCOL = Protocol.UNISWAP
+CHAIN = Chain.MAINNET
+MAX_UINT256 = 2**256 - 1
+MAX_UINT128 = 2**128 - 1
+MAX_TICK = 887272
+
+
+def _uint256(rnd: random.Random) -> int:
+    return rnd.choice([0, MAX_UINT256, rnd.randrange(2**256), rnd.randrange(2**140)])
+
+
+def _fees_data(rnd: random.Random, **overrides) -> FeesData:
+    values = {
+        "block": 1,
+        "timestamp": 1,
+        "hypervisor": "0xhypervisor",
+        "symbol": "T0-T1",
+        "current_tick": rnd.randint(-MAX_TICK, MAX_TICK),
+        "fee": 500,
+        "tvl_usd": 1.0,
+        "price0": 1.0001,
+        "price1": 1850.25,
+        "decimals0": 6,
+        "decimals1": 18,
+        "tvl0": 1,
+        "tvl1": 1,
+        "fee_growth_global0": _uint256(rnd),
+        "fee_growth_global1": _uint256(rnd),
+    }
+    for position in ("base", "limit"):
+        values[f"liquidity_{position}"] = rnd.choice(
+            [0, MAX_UINT128, rnd.randrange(2**128)]
+        )
+        values[f"tick_index_lower_{position}"] = rnd.randint(-MAX_TICK, MAX_TICK)
+        values[f"tick_index_upper_{position}"] = rnd.randint(-MAX_TICK, MAX_TICK)
+        for name in (
+            "tokens_owed_{}",
+            "fee_growth_inside_{}",
+            "fee_growth_outside_lower_{}",
+            "fee_growth_outside_upper_{}",
+        ):
+            for token in (0, 1):
+                values[f"{name.format(position)}{token}"] = _uint256(rnd)
+    values.update(overrides)
+    return FeesData(**values)
+
+
+@pytest.fixture(scope="module")
+def data() -> list[FeesData]:
+    rnd = random.Random(256)
+    items = [_fees_data(rnd) for _ in range(3000)]
+    # values out of the kernel range use the scalar path
+    items.append(_fees_data(rnd, liquidity_base=2**130))
+    items.append(_fees_data(rnd, fee_growth_global0=2**256))
+    items.append(_fees_data(rnd, fee_growth_inside_limit1=-1))
+    return items
+
+
+def test_limbs_roundtrip():
+    values = [0, 1, MAX_UINT256, 2**255, 2**32 - 1, 2**32]
+    limbs, valid = to_limbs(values, UINT256_LIMBS)
+    assert valid.all()
+    assert from_limbs(limbs) == values
+
+    _, valid = to_limbs([2**256, -1, None, 5], UINT256_LIMBS)
+    assert valid.tolist() == [False, False, False, True]
+
+
+def _uint256_limbs(values: list[int]) -> np.ndarray:
+    return to_limbs(values, UINT256_LIMBS)[0]
+
+
+def test_uncollected_fees_x128_matches_scalar(data):
+    items = data[:3000]
+    for position_type in (PositionType.BASE, PositionType.LIMIT):
+        positions = [
+            x.base_position if position_type == PositionType.BASE else x.limit_position
+            for x in items
+        ]
+        for token in (0, 1):
+            value = f"value{token}"
+            result = uncollected_fees_x128(
+                current_tick=np.array([x.current_tick for x in items]),
+                tick_lower=np.array([x.tick_lower.tick_index for x in positions]),
+                tick_upper=np.array([x.tick_upper.tick_index for x in positions]),
+                fee_growth_global=_uint256_limbs(
+                    [getattr(x.fee_growth_global, value) for x in items]
+                ),
+                fee_growth_outside_lower=_uint256_limbs(
+                    [getattr(x.tick_lower.fee_growth_outside, value) for x in positions]
+                ),
+                fee_growth_outside_upper=_uint256_limbs(
+                    [getattr(x.tick_upper.fee_growth_outside, value) for x in positions]
+                ),
+                fee_growth_inside=_uint256_limbs(
+                    [getattr(x.fee_growth_inside, value) for x in positions]
+                ),
+                liquidity=to_limbs([x.liquidity for x in positions], UINT128_LIMBS)[0],
+            )
+            expected = [
+                getattr(
+                    Fees(x, PROTOCOL, CHAIN)._calc_position_fees(position_type), value
+                ).raw
+                for x in items
+            ]
+            assert from_limbs(result) == expected
+
+
+def _fee_amounts_values(fee_amounts) -> tuple:
+    return tuple(
+        getattr(getattr(getattr(fee_amounts, position), kind).amount_x128, value).raw
+        for position in ("base", "limit")
+        for kind in ("fees", "owed")
+        for value in ("value0", "value1")
+    ) + (
+        fee_amounts.total.amount.value0,
+        fee_amounts.total.amount.value1,
+        fee_amounts.total.usd.value0,
+        fee_amounts.total.usd.value1,
+    )
+
+
+def test_fee_amounts_batch_matches_scalar(data):
+    expected = [Fees(x, PROTOCOL, CHAIN).fee_amounts() for x in data]
+    result = fee_amounts_batch(data, PROTOCOL, CHAIN)
+    assert [_fee_amounts_values(x) for x in result] == [
+        _fee_amounts_values(x) for x in expected
+    ]
+
+
+def test_total_fee_amounts_batch_matches_scalar(data):
+    expected = [Fees(x, PROTOCOL, CHAIN).fee_amounts().total.amount for x in data]
+    assert total_fee_amounts_batch(data, PROTOCOL, CHAIN) == [
+        (x.value0, x.value1) for x in expected
+    ]
+
+
+def test_empty_batch():
+    assert fee_amounts_batch([], PROTOCOL, CHAIN) == []
+    assert total_fee_amounts_batch([], PROTOCOL, CHAIN) == []
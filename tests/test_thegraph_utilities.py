@@ -0,0 +1,37 @@
+import asyncio
+
+from sources.web3.bins.apis.thegraph_utilities import thegraph_scraper_helper
+
+
+def _shards_queried(**kwargs) -> list:
+    helper = thegraph_scraper_helper(cache=False)
+    queried = []
+
+    async def _query_shard(session, queue, network, query_name, lower, upper, **kw):
+        queried.append((lower, upper))
+        await queue.put([{"id": f"{lower}"}])
+        await queue.put(None)
+
+    helper._query_shard = _query_shard
+
+    async def _consume():
+        return [
+            page
+            async for page in helper.iterate_results(
+                network="ethereum", query_name="tokens", **kwargs
+            )
+        ]
+
+    pages = asyncio.run(_consume())
+    assert len(pages) == len(queried)
+    return queried
+
+
+def test_single_id_queries_use_one_shard():
+    assert _shards_queried(where=' id: "0xabc" ') == [(None, None)]
+    assert _shards_queried(where=' number: "1" ', shards=1) == [(None, None)]
+
+
+def test_scans_are_sharded():
+    assert len(_shards_queried(where=' pool: "0xabc" ', shards=4)) == 4
+    assert len(_shards_queried(where=' id_gt: "0xabc" ', shards=4)) == 4